@@ -0,0 +1,183 @@
+# benchmarks/import_time.py - Import-time report for the add-on's startup path
+#
+# Imports the modules setup_plugin() and setup_editor_button() load in a fresh
+# interpreter under `python -X importtime`, prints the cumulative import time
+# of each add-on module and fails if the startup path went over budget or
+# pulled in a dependency that should only load on first use.
+#
+# Usage (from the repository root, with Anki's Python environment):
+#     python benchmarks/import_time.py [--json report.json] [--budget-ms 150]
+#
+# The `src` package is registered without running src/__init__.py, so the
+# report also works where aqt cannot create a Qt application. A startup
+# module that cannot be imported (e.g. aqt without a display) is not measured,
+# so it fails the run unless --allow-skipped is given.
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules imported while Anki loads the add-on and builds the editor toolbar
+STARTUP_MODULES = [
+    "src.config",
+    "src.config.config",
+    "src.state",
+    "src.translator",
+    "src.metrics",
+    "src.activity",
+    "src.hooks",
+    "src.prefetch",
+    "src.ui.status_bar",
+]
+
+# Must not be imported until the user searches or opens a picker. requests and
+# QtWebEngine are not listed: aqt itself imports them before any add-on loads.
+DEFERRED_MODULES = [
+    "bs4",
+    "filetype",
+    "src.image_search",
+    "src.ui.browser_picker",
+    "src.ui.grid_picker",
+    "src.ui.web_pool",
+]
+
+DEFAULT_BUDGET_MS = 150.0
+
+# Already imported by Anki when add-ons load
+BASELINE_MODULES = ["aqt", "aqt.qt", "aqt.editor", "aqt.utils"]
+
+# Runs in the child interpreter; prints a JSON summary on the last line
+CHILD_SCRIPT = """
+import json, sys, types
+# Anki has loaded these before any add-on; keep them out of the add-on's times
+for name in {baseline!r}:
+    try:
+        __import__(name)
+    except Exception:
+        pass
+pkg = types.ModuleType("src")
+pkg.__path__ = [{src_dir!r}]
+sys.modules["src"] = pkg
+skipped = {{}}
+for name in {modules!r}:
+    try:
+        __import__(name)  # import statements are what -X importtime logs
+    except Exception as e:
+        skipped[name] = f"{{type(e).__name__}}: {{e}}"
+loaded = [name for name in {deferred!r} if name in sys.modules]
+print(json.dumps({{"skipped": skipped, "deferred_loaded": loaded}}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict[str, dict[str, int]]:
+    """Parse `-X importtime` output into {module: {self_us, cumulative_us}}"""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:") :].split("|")
+            timings[name.strip()] = {
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+            }
+        except ValueError:
+            continue
+    return timings
+
+
+def measure(modules: list[str]) -> dict:
+    """Import modules in a fresh interpreter and collect the timings"""
+    script = CHILD_SCRIPT.format(
+        src_dir=str(REPO_ROOT / "src"),
+        baseline=BASELINE_MODULES,
+        modules=modules,
+        deferred=DEFERRED_MODULES,
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        check=True,
+    )
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    timings = parse_importtime(result.stderr)
+
+    # Each startup module is logged once, by whichever of them imported it
+    # first, so summing their cumulative times does not double count
+    total_us = sum(
+        timings[name]["cumulative_us"]
+        for name in modules
+        if name in timings and name not in summary["skipped"]
+    )
+    return {
+        "python": sys.version.split()[0],
+        "modules": {
+            name: timings[name]
+            for name in sorted(timings, key=lambda n: -timings[n]["cumulative_us"])
+            if name.startswith("src.") and name not in summary["skipped"]
+        },
+        "total_ms": total_us / 1000,
+        "skipped": summary["skipped"],
+        "deferred_loaded": summary["deferred_loaded"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Import-time report for the add-on's startup path"
+    )
+    parser.add_argument("--json", type=Path, help="write the report to this file")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"startup import budget (default {DEFAULT_BUDGET_MS:.0f}ms)",
+    )
+    parser.add_argument(
+        "--allow-skipped",
+        action="store_true",
+        help="only warn when a startup module cannot be imported",
+    )
+    args = parser.parse_args()
+
+    report = measure(STARTUP_MODULES)
+    report["budget_ms"] = args.budget_ms
+
+    print(f"{'module':<32} {'self ms':>9} {'cumulative ms':>14}")
+    for name, timing in report["modules"].items():
+        print(
+            f"{name:<32} {timing['self_us'] / 1000:>9.2f} "
+            f"{timing['cumulative_us'] / 1000:>14.2f}"
+        )
+    for name, error in report["skipped"].items():
+        print(f"skipped {name}: {error}")
+    print(f"startup imports: {report['total_ms']:.1f}ms (budget {args.budget_ms}ms)")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    failed = False
+    if report["skipped"]:
+        skipped = ", ".join(report["skipped"])
+        if args.allow_skipped:
+            print(f"WARNING: not measured, could not be imported: {skipped}")
+        else:
+            print(f"FAIL: startup modules could not be imported: {skipped}")
+            failed = True
+    if report["deferred_loaded"]:
+        print(f"FAIL: loaded at startup: {', '.join(report['deferred_loaded'])}")
+        failed = True
+    if report["total_ms"] > args.budget_ms:
+        print("FAIL: startup imports over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+# benchmarks/load_test.py - End-to-end fill throughput against a mock server
+#
+# Fills the image field of thousands of synthetic notes in a temporary Anki
+# collection, running the add-on's pipeline for every note:
+#   search       GoogleImageSearch.search() against mock_google_server.py,
+#                bypassing the search cache
+#   download     fetch_image(), trying the first LUCKY_CANDIDATES results
+#   convert      prepare_image() (ffmpeg conversion with --convert)
+#   media_write  col.media.write_data()
+#   note_update  appending the <img> tag and col.update_note()
+# with 1, 2, 4, ... worker threads, and reports notes per minute, per-note
+# latency percentiles, peak RSS, the peak of the in-flight image memory
+# budget and the CPU time spent in each stage.
+#
+# Usage (from the repository root, with Anki's Python environment):
+#     python benchmarks/load_test.py [--notes 2000] [--workers 1 2 4 8 16]
+#                                    [--latency-ms 20] [--image-bytes 102400]
+#                                    [--convert webp] [--json load.json]
+#                                    [--server-url http://127.0.0.1:8765]
+#
+# The mock server runs in this process by default, so its CPU counts towards
+# process_cpu_s and competes for the GIL; start mock_google_server.py
+# separately and pass --server-url for cleaner numbers.
+#
+# aqt's main window is not created: like Anki's main thread, a single lock
+# serializes collection access, and media writes and note updates are timed
+# with the same span() stages the add-on records.
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# pipeline.py puts the repository root (mock_google_server.py) on sys.path
+from pipeline import git_commit, load_addon
+
+from mock_google_server import MockConfig, MockGoogleServer
+
+SEARCH_FIELD = "Front"
+TARGET_FIELD = "Back"
+DEFAULT_WORKERS = [1, 2, 4, 8]
+RSS_SAMPLE_INTERVAL = 0.02  # seconds
+# A run is saturated once doubling the workers gains less than this
+SATURATION_GAIN = 0.10
+PERCENTILES = (50, 95, 99)
+
+
+def current_rss() -> int | None:
+    """Resident set size of this process in bytes (Linux), else None"""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def max_rss() -> int | None:
+    """Lifetime peak RSS in bytes, where the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Samples RSS in a background thread and keeps the peak"""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def percentile(ordered: list[float], p: float) -> float | None:
+    if not ordered:
+        return None
+    return ordered[max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))]
+
+
+class FillRun:
+    """One fill of `notes` notes with `workers` threads in a fresh collection"""
+
+    def __init__(self, image_search, workers: int, notes: int, tmp: Path):
+        from anki.collection import Collection
+
+        self.image_search = image_search
+        self.workers = workers
+        self.col = Collection(str(tmp / "collection.anki2"))
+        self.col_lock = threading.Lock()  # stands in for Anki's main thread
+        self.note_ids = self._add_notes(notes)
+
+    def _add_notes(self, count: int) -> list[int]:
+        notetype = self.col.models.by_name("Basic")
+        deck_id = self.col.decks.id("Default")
+        note_ids = []
+        for i in range(count):
+            note = self.col.new_note(notetype)
+            note[SEARCH_FIELD] = f"word {i}"
+            self.col.add_note(note, deck_id)
+            note_ids.append(note.id)
+        return note_ids
+
+    def fill_note(self, note_id: int) -> float | None:
+        """Run the whole pipeline for one note; seconds taken, or None"""
+        from src.config.constants import LUCKY_CANDIDATES
+        from src.metrics import span
+
+        image_search = self.image_search
+        start = time.perf_counter()
+        with self.col_lock:
+            query = self.col.get_note(note_id)[SEARCH_FIELD]
+
+        # Always hit the server: a cached search would hide its cost
+        results = image_search.get_searcher().search(query)
+        fetched = None
+        for result in results[:LUCKY_CANDIDATES]:
+            fetched = image_search.get_searcher().fetch_image(result["url"])
+            if fetched:
+                url = result["url"]
+                break
+        if fetched is None:
+            return None
+
+        # The image counts against the memory budget until it is written;
+        # once prepared, only the converted bytes are held
+        image_data, reservation = fetched
+        with reservation:
+            filename, data = image_search.prepare_image(image_data, url, reservation)
+            del image_data
+            with self.col_lock:
+                with span("media_write"):
+                    filename = self.col.media.write_data(filename, data)
+                with span("note_update"):
+                    note = self.col.get_note(note_id)
+                    note[TARGET_FIELD] += f'<img src="{filename}">'
+                    self.col.update_note(note)
+        return time.perf_counter() - start
+
+    def run(self) -> dict:
+        from src.memory_budget import get_memory_budget
+        from src.metrics import children_cpu_time, get_metrics
+
+        metrics = get_metrics()
+        metrics.clear()
+        budget = get_memory_budget()
+        budget.reset_peak()
+        budget_before = budget.stats()
+        # Includes ffmpeg, which runs as a child process
+        cpu_start = time.process_time() + children_cpu_time()
+        start = time.perf_counter()
+        with RssSampler() as rss, ThreadPoolExecutor(self.workers) as pool:
+            latencies = list(pool.map(self.fill_note, self.note_ids))
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() + children_cpu_time() - cpu_start
+
+        done = sorted(t for t in latencies if t is not None)
+        stages = {
+            stage: {
+                "count": summary["count"],
+                "errors": summary["errors"],
+                "cpu_total_ms": summary["cpu_total_ms"],
+                "cpu_per_call_ms": round(summary["cpu_total_ms"] / summary["window"], 3)
+                if summary["window"]
+                else None,
+                "wall_p50_ms": summary["wall_p50_ms"],
+                "wall_p95_ms": summary["wall_p95_ms"],
+            }
+            for stage, summary in metrics.summary().items()
+        }
+        budget_after = budget.stats()
+        self.col.close()
+        return {
+            "workers": self.workers,
+            "notes": len(self.note_ids),
+            "filled": len(done),
+            "failed": len(self.note_ids) - len(done),
+            "elapsed_s": round(elapsed, 3),
+            "notes_per_minute": round(len(done) / elapsed * 60, 1),
+            "process_cpu_s": round(cpu, 3),
+            **{
+                f"latency_p{p}_ms": None
+                if not done
+                else round(percentile(done, p) * 1000, 2)
+                for p in PERCENTILES
+            },
+            "peak_rss_mb": None if rss.peak is None else round(rss.peak / 2**20, 1),
+            # Image bytes held from download to media write (src/memory_budget.py)
+            "budget_peak_mb": round(budget_after["peak"] / 2**20, 1),
+            "budget_waits": budget_after["waits"] - budget_before["waits"],
+            "spills": budget_after["spills"] - budget_before["spills"],
+            "stages": stages,
+        }
+
+
+def configure_convert(fmt: str | None):
+    """Turn on format conversion in the add-on's (in-memory) config"""
+    if fmt is None:
+        return
+    from dataclasses import replace
+
+    import src.state
+    from src.config.enums import ImageFormat
+    from src.ffmpeg_utils import get_converter
+
+    if not get_converter().is_available():
+        raise SystemExit("--convert needs ffmpeg on PATH")
+    state = src.state.get_app_state()
+    state.config = replace(
+        state.config, convert_format=True, output_format=ImageFormat(fmt)
+    )
+
+
+class ExternalServer:
+    """A mock_google_server.py started separately, e.g. on another machine"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.search_url = f"{self.base_url}/search"
+
+    def stats(self) -> dict:
+        with urllib.request.urlopen(f"{self.base_url}/stats", timeout=10) as resp:
+            return json.load(resp)
+
+
+def mark_saturation(runs: list[dict]):
+    """Add speedup over the first run and flag where more workers stop paying"""
+    base = runs[0]["notes_per_minute"] or None
+    previous = None
+    for run in runs:
+        rate = run["notes_per_minute"]
+        run["speedup"] = round(rate / base, 2) if base else None
+        run["saturated"] = bool(
+            previous
+            and previous["notes_per_minute"]
+            and rate / previous["notes_per_minute"] - 1 < SATURATION_GAIN
+        )
+        previous = run
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="End-to-end fill throughput against a mock server"
+    )
+    parser.add_argument("--notes", type=int, default=1000, help="notes per run")
+    parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--image-bytes", type=int, default=100 * 1024)
+    parser.add_argument(
+        "--convert",
+        choices=["webp", "png", "jpg"],
+        help="convert every image with ffmpeg (needs ffmpeg on PATH)",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        help="in-flight image bytes allowed (default: DOWNLOAD_MEMORY_BUDGET)",
+    )
+    parser.add_argument(
+        "--server-url",
+        help="use an already running mock_google_server.py (e.g. "
+        "http://127.0.0.1:8765) instead of one in this process",
+    )
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    args = parser.parse_args()
+
+    mock_config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        image_bytes=args.image_bytes,
+        # Decodable images for ffmpeg; png is real without ffmpeg too
+        image_format="png" if args.convert else "jpg",
+    )
+    if args.server_url:
+        # The mock options are the external server's; don't report ours
+        mock_config = None
+        server = contextlib.nullcontext(ExternalServer(args.server_url))
+    else:
+        server = MockGoogleServer(mock_config)
+
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp, server as server:
+        os.environ["GOOGLE_IMAGE_SEARCH_URL"] = server.search_url
+        image_search = load_addon(Path(tmp))
+        import src.metrics
+
+        if not image_search.dependencies_available():
+            raise SystemExit("requests, bs4 and filetype are required")
+        configure_convert(args.convert)
+        if args.memory_budget:
+            import src.memory_budget
+
+            src.memory_budget._memory_budget = src.memory_budget.MemoryBudget(
+                args.memory_budget
+            )
+        # Keep every sample of a run (retries included) for the CPU totals
+        src.metrics._metrics = src.metrics.MetricsStore(
+            Path(tmp) / "metrics.json", args.notes * 4
+        )
+
+        for workers in args.workers:
+            run_dir = Path(tmp) / f"workers-{workers}"
+            run_dir.mkdir()
+            fill = FillRun(image_search, workers, args.notes, run_dir)
+            result = fill.run()
+            shutil.rmtree(run_dir, ignore_errors=True)
+            runs.append(result)
+            print(
+                f"{workers:>3} workers  {result['notes_per_minute']:>9.1f} notes/min  "
+                f"p50 {result['latency_p50_ms']} ms  p95 {result['latency_p95_ms']} ms"
+                f"  failed {result['failed']}  peak RSS {result['peak_rss_mb']} MB"
+                f"  image bytes peak {result['budget_peak_mb']} MB"
+                f" ({result['budget_waits']} waits)"
+            )
+        server_stats = server.stats()
+
+    mark_saturation(runs)
+    saturated = next((run["workers"] for run in runs if run["saturated"]), None)
+    if saturated is not None:
+        print(f"Throughput stops scaling at {saturated} workers")
+
+    print("\nCPU time per stage (last run; convert includes ffmpeg):")
+    for stage, stats in runs[-1]["stages"].items():
+        print(
+            f"  {stage:<12} {stats['cpu_total_ms']:>10.1f} ms total  "
+            f"{stats['cpu_per_call_ms']} ms/call  ({stats['count']} calls)"
+        )
+
+    if args.json:
+        report = {
+            "commit": git_commit(),
+            "created_at": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mock": None if mock_config is None else vars(mock_config),
+            "server_url": args.server_url,
+            "convert": args.convert,
+            "max_rss_mb": None if max_rss() is None else round(max_rss() / 2**20, 1),
+            "runs": runs,
+            "server": server_stats,
+        }
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
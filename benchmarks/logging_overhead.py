@@ -0,0 +1,115 @@
+# benchmarks/logging_overhead.py - Cost of a diagnostic line: print vs logger
+#
+# Times one typical hot-path diagnostic (a download progress line with a few
+# interpolated values) written as:
+#   print        f-string print to stdout, as the add-on used to do
+#   disabled     log.debug() with %-style arguments while the level is INFO
+#   enabled      log.debug() at DEBUG level, console and rotating file
+#
+# Usage (from the repository root):
+#     python benchmarks/logging_overhead.py [--number 200000] [--json out.json]
+#
+# The log file goes to a temporary directory, not the add-on's user_files.
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import timeit
+import types
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_logger(log_dir: Path):
+    """Import src.log without running src/__init__.py (which needs Anki)"""
+    pkg = types.ModuleType("src")
+    pkg.__path__ = [str(REPO_ROOT / "src")]
+    sys.modules["src"] = pkg
+
+    import src.log
+
+    # Handlers are attached on first use; then swap the rotating file
+    # handler for one writing to log_dir
+    src.log.get_logger("Benchmark")
+    root = src.log.logging.getLogger(src.log.LOGGER_NAME)
+    for handler in list(root.handlers):
+        if isinstance(handler, src.log.logging.handlers.RotatingFileHandler):
+            root.removeHandler(handler)
+            handler.close()
+            file_handler = src.log.logging.handlers.RotatingFileHandler(
+                log_dir / "image_search.log",
+                maxBytes=handler.maxBytes,
+                backupCount=handler.backupCount,
+                encoding="utf-8",
+                delay=True,
+            )
+            file_handler.setFormatter(handler.formatter)
+            for log_filter in handler.filters:
+                file_handler.addFilter(log_filter)
+            root.addHandler(file_handler)
+    return src.log
+
+
+def run(number: int) -> dict[str, float]:
+    """Return nanoseconds per diagnostic line for each variant"""
+    url = "https://example.com/images/" + "a" * 80 + ".jpg"
+    size = 123456
+    status = 200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_module = load_logger(Path(tmp))
+        log = log_module.get_logger("Benchmark")
+        sink = io.StringIO()
+
+        def print_line():
+            print(f"[ImageSearch] 下载完成: {url[:100]} ({status}), 大小: {size} 字节")
+
+        def log_line():
+            log.debug("下载完成: %s (%s), 大小: %s 字节", url[:100], status, size)
+
+        results = {}
+        with contextlib.redirect_stdout(sink):
+            results["print"] = timeit.timeit(print_line, number=number)
+
+            log_module.set_log_level("info")
+            results["disabled"] = timeit.timeit(log_line, number=number)
+
+            # The console handler holds the real stdout; point it at the sink
+            for handler in log_module.logging.getLogger("image_search").handlers:
+                if isinstance(handler, log_module.logging.StreamHandler) and not (
+                    isinstance(handler, log_module.logging.FileHandler)
+                ):
+                    handler.setStream(sink)
+            log_module.set_log_level("debug")
+            results["enabled"] = timeit.timeit(log_line, number=number)
+
+        log_module.logging.shutdown()
+
+    return {name: seconds / number * 1e9 for name, seconds in results.items()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Cost of a diagnostic line: print vs logger"
+    )
+    parser.add_argument("--number", type=int, default=200_000)
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.number)
+    baseline = results["print"]
+    for name, ns in results.items():
+        print(f"{name:<10} {ns:>10.0f} ns/line  ({ns / baseline:>6.2f}x print)")
+
+    if args.json:
+        report = {"number": args.number, "ns_per_line": results}
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+# benchmarks/pipeline.py - Offline benchmarks of the search/download/convert pipeline
+#
+# Times the add-on's own code without Anki or network access:
+#   parse      parse_search_results() on debug_google_response.html and on
+#              synthetic enlargements of it (the result grid repeated)
+#   filename   prepare_image() choosing a media filename, from the URL's
+#              extension or from the image's magic bytes
+#   detect     _detect_image_format() for each supported format
+#   convert    FFmpegConverter.convert_image() across sizes and formats
+#   search     GoogleImageSearch.search() end to end against
+#              mock_google_server.py (via GOOGLE_IMAGE_SEARCH_URL)
+#   download   GoogleImageSearch.download_image() from the mock server with
+#              injected latency; the 2048KB case is past
+#              DOWNLOAD_SPOOL_THRESHOLD and is buffered on disk
+#
+# Usage (from the repository root):
+#     python benchmarks/pipeline.py [--json results.json] [--compare old.json]
+#                                   [--group parse --group download] [--runs 20]
+#
+# Results are machine-readable (--json) and keyed by case name, so runs from
+# two commits can be compared with --compare, which exits with an error if a
+# case got slower than --threshold. Cases whose dependencies are missing
+# (ffmpeg, filetype, requests/bs4) are reported as skipped. Logs and timing
+# metrics go to a temporary directory, not the add-on's user_files.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from collections.abc import Callable
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+FIXTURE = REPO_ROOT / "debug_google_response.html"
+
+sys.path.insert(0, str(REPO_ROOT))
+from mock_google_server import (  # noqa: E402
+    MockConfig,
+    MockGoogleServer,
+    make_payload,
+    make_png,
+)
+
+GROUPS = ["parse", "filename", "detect", "convert", "search", "download"]
+ENLARGEMENTS = [1, 5, 25]  # copies of the fixture's result grid
+CONVERT_SIZES = [256, 1024]  # square source images, in pixels
+CONVERT_FORMATS = ["webp", "jpg", "png"]
+DOWNLOAD_SIZES = [16 * 1024, 256 * 1024, 2 * 1024 * 1024]  # bytes
+DEFAULT_LATENCY_MS = 20.0
+DEFAULT_THRESHOLD = 0.10  # allowed median slowdown in --compare
+MIN_DELTA_MS = 0.05  # smaller median changes are timer noise, never flagged
+
+# Grid markers in the fixture: results are <td class="e3goi"> cells of this table
+GRID_START = '<table class="GpQGbf">'
+GRID_END = "</table></div><table"
+
+
+def load_addon(tmp: Path):
+    """Import the add-on modules without src/__init__.py (which needs Anki)"""
+    pkg = types.ModuleType("src")
+    pkg.__path__ = [str(REPO_ROOT / "src")]
+    sys.modules["src"] = pkg
+
+    import src.config.constants as constants
+    import src.log
+    import src.metrics
+    import src.state
+    from src.config.types import AppConfig
+
+    # Everything the add-on writes goes to tmp, not its real user_files.
+    # The handlers were attached on import; attach them again with the new
+    # log path (the file is only created once something is logged).
+    constants.LOG_FILE_PATH = tmp / constants.LOG_FILE_PATH.name
+    constants.THUMBNAIL_CACHE_DIR = tmp / constants.THUMBNAIL_CACHE_DIR.name
+    constants.WEB_PROFILE_DIR = tmp / constants.WEB_PROFILE_DIR.name
+    root = src.log.logging.getLogger(src.log.LOGGER_NAME)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    src.log._configure()
+
+    # Default settings; the mtime of any existing config.json is taken as
+    # already loaded so that the user's own config is not read
+    src.state._app_state = src.state.AppState(AppConfig(), src.state._config_mtime())
+    # Warnings and up: timing the pipeline, not the logger
+    src.log.set_log_level("warning")
+    src.metrics._metrics = src.metrics.MetricsStore(tmp / "metrics.json")
+
+    import src.image_search
+
+    return src.image_search
+
+
+def enlarge_page(html: str, copies: int) -> str:
+    """Repeat the result grid of a results page `copies` times"""
+    start = html.index(GRID_START) + len(GRID_START)
+    end = html.index(GRID_END, start)
+    return html[:start] + html[start:end] * copies + html[end:]
+
+
+# Measurement
+
+
+def measure(func: Callable[[], object], runs: int, unit_bytes: int = 0) -> dict:
+    """Run func once to warm up, then `runs` times; summarize in milliseconds"""
+    func()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    ordered = sorted(samples)
+    p95 = ordered[max(0, round(0.95 * len(ordered)) - 1)]
+    result = {
+        "runs": runs,
+        "min_ms": round(ordered[0] * 1000, 4),
+        "median_ms": round(statistics.median(samples) * 1000, 4),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 4),
+        "p95_ms": round(p95 * 1000, 4),
+    }
+    if unit_bytes:
+        result["mb_per_s"] = round(
+            unit_bytes / statistics.median(samples) / 1024 / 1024, 2
+        )
+    return result
+
+
+def bench_parse(image_search, runs: int) -> dict:
+    html = FIXTURE.read_text(encoding="utf-8")
+    cases = {}
+    for copies in ENLARGEMENTS:
+        page = enlarge_page(html, copies)
+        max_results = 20 * copies
+        found = len(image_search.parse_search_results(page, max_results))
+        result = measure(
+            lambda page=page, n=max_results: image_search.parse_search_results(page, n),
+            runs,
+            len(page.encode()),
+        )
+        result.update(page_bytes=len(page.encode()), results=found)
+        cases[f"parse/x{copies}"] = result
+    return cases
+
+
+def bench_filename(image_search, runs: int) -> dict:
+    data = make_payload("png", 64 * 1024)
+    urls = {
+        "url_extension": "https://example.com/images/photo.png",
+        "magic_bytes": "https://example.com/images/photo?id=123",
+    }
+    cases = {}
+    for label, url in urls.items():
+        filename, _data = image_search.prepare_image(data, url)
+        result = measure(lambda url=url: image_search.prepare_image(data, url), runs)
+        result["filename"] = filename
+        cases[f"filename/{label}"] = result
+    return cases
+
+
+def bench_detect(image_search, runs: int) -> dict:
+    import filetype  # noqa: F401  (skip the group when it is missing)
+
+    cases = {}
+    for fmt in ("png", "jpg", "gif", "webp"):
+        data = make_payload(fmt, 64 * 1024)
+        result = measure(
+            lambda data=data: image_search._detect_image_format(data), runs
+        )
+        result["detected"] = image_search._detect_image_format(data)
+        cases[f"detect/{fmt}"] = result
+    return cases
+
+
+def bench_convert(image_search, runs: int) -> dict:
+    from src.ffmpeg_utils import get_converter
+
+    converter = get_converter()
+    if not converter.is_available():
+        raise RuntimeError("ffmpeg not found in PATH")
+
+    cases = {}
+    for size in CONVERT_SIZES:
+        source = make_png(size)
+        for fmt in CONVERT_FORMATS:
+            output, error = converter.convert_image(source, fmt, 80)
+            if output is None:
+                raise RuntimeError(f"{fmt}: {error}")
+            result = measure(
+                lambda source=source, fmt=fmt: converter.convert_image(source, fmt, 80),
+                runs,
+                len(source),
+            )
+            result.update(input_bytes=len(source), output_bytes=len(output))
+            cases[f"convert/{size}px_png_to_{fmt}"] = result
+    return cases
+
+
+def bench_search(image_search, runs: int, server: MockGoogleServer) -> dict:
+    if not image_search.dependencies_available():
+        raise RuntimeError("requests, bs4 or filetype not installed")
+
+    searcher = image_search.GoogleImageSearch()
+    found = len(searcher.search("benchmark"))
+    if not found:
+        raise RuntimeError(f"no results from {server.search_url}")
+    result = measure(lambda: searcher.search("benchmark"), runs)
+    result.update(latency_ms=server.config.latency_ms, results=found)
+    return {"search/mock_server": result}
+
+
+def bench_download(image_search, runs: int, server: MockGoogleServer) -> dict:
+    if not image_search.dependencies_available():
+        raise RuntimeError("requests, bs4 or filetype not installed")
+
+    searcher = image_search.GoogleImageSearch()
+    cases = {}
+    for size in DOWNLOAD_SIZES:
+        # PNGs are generated the same way with or without ffmpeg
+        url = f"{server.base_url}/img/benchmark.png?bytes={size}"
+        data = searcher.download_image(url)
+        if data is None:
+            raise RuntimeError(f"download of {url} failed")
+        result = measure(lambda url=url: searcher.download_image(url), runs, len(data))
+        result.update(latency_ms=server.config.latency_ms, bytes=len(data))
+        cases[f"download/{size // 1024}KB"] = result
+    return cases
+
+
+def run(groups: list[str], runs: int, latency_ms: float) -> dict:
+    """Run the selected groups; returns the report written by --json"""
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        MockGoogleServer(MockConfig(latency_ms=latency_ms)) as server,
+    ):
+        # Read by the add-on's constants on import
+        os.environ["GOOGLE_IMAGE_SEARCH_URL"] = server.search_url
+        image_search = load_addon(Path(tmp))
+        benches = {
+            "parse": lambda: bench_parse(image_search, runs),
+            "filename": lambda: bench_filename(image_search, runs),
+            "detect": lambda: bench_detect(image_search, runs),
+            "convert": lambda: bench_convert(image_search, max(runs // 4, 3)),
+            "search": lambda: bench_search(image_search, runs, server),
+            "download": lambda: bench_download(image_search, runs, server),
+        }
+        cases, skipped = {}, {}
+        for group in groups:
+            try:
+                cases.update(benches[group]())
+            except Exception as e:
+                skipped[group] = f"{type(e).__name__}: {e}"
+
+    return {
+        "commit": git_commit(),
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": cases,
+        "skipped": skipped,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print median changes against baseline; return the cases that regressed"""
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    regressed = []
+    for name, result in report["cases"].items():
+        old = baseline.get("cases", {}).get(name)
+        if old is None:
+            continue
+        change = result["median_ms"] / old["median_ms"] - 1 if old["median_ms"] else 0
+        significant = abs(result["median_ms"] - old["median_ms"]) >= MIN_DELTA_MS
+        marker = ""
+        if significant and change > threshold:
+            marker = "  SLOWER"
+            regressed.append(name)
+        elif significant and change < -threshold:
+            marker = "  faster"
+        print(
+            f"  {name:<32} {old['median_ms']:>10.3f} -> "
+            f"{result['median_ms']:>10.3f} ms  ({change:+.1%}){marker}"
+        )
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks of the search/download/convert pipeline"
+    )
+    parser.add_argument(
+        "--group",
+        action="append",
+        choices=GROUPS,
+        help="run only this group (repeatable; default: all)",
+    )
+    parser.add_argument("--runs", type=int, default=20, help="timed runs per case")
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=DEFAULT_LATENCY_MS,
+        help="delay before the mock server answers a request",
+    )
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    parser.add_argument(
+        "--compare", type=Path, help="results of an earlier run to compare with"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="median slowdown that counts as a regression (0.10 = 10%%)",
+    )
+    args = parser.parse_args()
+
+    report = run(args.group or GROUPS, args.runs, args.latency_ms)
+
+    for name, result in report["cases"].items():
+        throughput = (
+            f"  {result['mb_per_s']:>8.2f} MB/s" if "mb_per_s" in result else ""
+        )
+        print(
+            f"{name:<32} median {result['median_ms']:>10.3f} ms  "
+            f"p95 {result['p95_ms']:>10.3f} ms{throughput}"
+        )
+    for group, reason in report["skipped"].items():
+        print(f"{group:<32} skipped ({reason})")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressed = compare(report, baseline, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} case(s) slower than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
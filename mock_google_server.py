@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+本地模拟 Google 图片搜索服务器，用于离线、可重复的吞吐量/重试/缓存测试
+
+Serves results pages with the same structure the add-on parses (img.DS1iW
+inside links carrying imgurl=), plus generated images, with configurable
+latency, server errors, 429 throttling and CAPTCHA interstitials. Only the
+standard library is used.
+
+Usage:
+    python mock_google_server.py --port 8765 --latency-ms 50 --error-rate 0.05
+
+Then point the add-on (or test_image_search.py) at it:
+    GOOGLE_IMAGE_SEARCH_URL=http://127.0.0.1:8765/search anki
+
+Endpoints:
+    /search?q=...        results page (udm=2 layout)
+    /img/<id>.<fmt>      full-size image; ?bytes=N overrides the size
+    /thumb/<id>.<fmt>    thumbnail
+    /sorry/index         CAPTCHA page (429), where throttled searches redirect
+    /stats               JSON request counters
+
+As a library (e.g. from a load test):
+    with MockGoogleServer(MockConfig(latency_ms=20)) as server:
+        os.environ["GOOGLE_IMAGE_SEARCH_URL"] = server.search_url
+"""
+
+import argparse
+import hashlib
+import html
+import http.server
+import json
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import zlib
+from collections import Counter, deque
+from dataclasses import dataclass
+from pathlib import Path
+
+IMAGE_FORMATS = ("png", "jpg", "gif", "webp")
+CONTENT_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+}
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of the mock server; may be changed while it runs"""
+
+    results: int = 20  # images per results page
+    image_bytes: int = 200 * 1024  # size of full images
+    thumbnail_bytes: int = 8 * 1024
+    image_format: str = "jpg"  # one of IMAGE_FORMATS, or "mixed"
+    latency_ms: float = 0.0  # added before every response
+    jitter_ms: float = 0.0  # uniform extra latency, 0..jitter_ms
+    error_rate: float = 0.0  # fraction of requests answered with 500/503
+    rate_limit: float = 0.0  # searches per second before 429s (0 = off)
+    throttle_rate: float = 0.0  # fraction of searches answered with 429
+    captcha_rate: float = 0.0  # fraction of searches redirected to a CAPTCHA
+    seed: int = 0  # makes fault injection and page contents repeatable
+
+
+# Generated images
+
+
+def make_png(size: int, seed: int = 0) -> bytes:
+    """A size x size RGB PNG of seeded noise (about 3 bytes per pixel)"""
+    rng = random.Random(seed)
+    row = size * 3
+    raw = b"".join(b"\x00" + rng.randbytes(row) for _ in range(size))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw, 1))
+        + chunk(b"IEND", b"")
+    )
+
+
+def make_payload(fmt: str, nbytes: int, seed: int = 0) -> bytes:
+    """
+    Bytes of roughly nbytes with the magic header of fmt
+
+    Enough for content sniffing and transfer tests, but only decodable for
+    png; see make_image() for real images in the other formats.
+    """
+    headers = {
+        "png": b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR",
+        "jpg": b"\xff\xd8\xff\xe0\x00\x10JFIF\x00",
+        "gif": b"GIF89a",
+        "webp": b"RIFF" + struct.pack("<I", max(nbytes - 8, 4)) + b"WEBPVP8 ",
+    }
+    header = headers[fmt]
+    return header + random.Random(seed).randbytes(max(nbytes - len(header), 0))
+
+
+def make_image(fmt: str, nbytes: int, seed: int = 0) -> bytes:
+    """
+    An image of about nbytes in fmt
+
+    PNGs are real noise images. Other formats are converted from one with
+    ffmpeg when it is on PATH (their size then depends on the encoder);
+    without ffmpeg they fall back to make_payload().
+    """
+    side = max(1, int((nbytes / 3) ** 0.5))
+    png = make_png(side, seed)
+    if fmt == "png":
+        return png
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return make_payload(fmt, nbytes, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "source.png"
+        target = Path(tmp) / f"image.{fmt}"
+        source.write_bytes(png)
+        result = subprocess.run(
+            [ffmpeg, "-loglevel", "error", "-i", str(source), "-y", str(target)],
+            capture_output=True,
+        )
+        if result.returncode != 0 or not target.exists():
+            return make_payload(fmt, nbytes, seed)
+        return target.read_bytes()
+
+
+# Pages
+
+
+PAGE_TEMPLATE = (
+    "<!DOCTYPE html>\n"
+    '<html lang="en"><head><meta charset="UTF-8"/>'
+    "<title>{query} - Google Search</title></head>\n"
+    '<body><div class="n692Zd"><div class="BnJWBc"><a class="lXLRf" href="/">'
+    '<img class="kgJEQe" src="/images/branding/searchlogo/1x/'
+    'googlelogo_desk_heirloom_color_150x55dp.gif" alt="Google"/></a></div></div>\n'
+    '<div><table class="GpQGbf">{rows}</table></div>\n'
+    '<table class="uZgmoc"><tbody><td><a class="frGj1b" '
+    'href="/search?q={query_param}&amp;udm=2&amp;start={next_start}">'
+    "Next &gt;</a></td></tbody></table>\n"
+    "</body></html>\n"
+)
+
+CELL_TEMPLATE = (
+    '<td class="e3goi" align="center"><div class="jjVJ4e"><div class="lIMUZd">'
+    '<table class="RntSmf"><tr><td><a href="{href}"><div class="kCmkOe">'
+    '<img class="DS1iW" alt="{title}" src="{thumbnail}"/></div></a></td></tr>'
+    '<tr><td><a href="{href}"><div class="AlD19d">'
+    '<span class="qXLe6d x3G5ab"><span class="fYyStc">{title}</span></span>'
+    '<span class="qXLe6d F9iS2e"><span class="fYyStc">{host}</span></span>'
+    "</div></a></td></tr></table></div></div></td>"
+)
+
+CAPTCHA_PAGE = (
+    "<!DOCTYPE html>\n"
+    "<html><head><title>https://www.google.com/search</title></head>\n"
+    '<body><div id="recaptcha" class="g-recaptcha"></div>\n'
+    '<form id="captcha-form" action="index" method="post">'
+    '<input type="hidden" name="continue" value="{continue_url}"/></form>\n'
+    "<div>Our systems have detected unusual traffic from your computer network.\n"
+    "This page checks to see if it's really you sending the requests, "
+    "and not a robot.</div>\n"
+    "</body></html>\n"
+)
+
+COLUMNS = 4  # results per table row, as on the real page
+
+
+def results_page(base_url: str, query: str, config: MockConfig) -> str:
+    """Render a results page whose images point back at this server"""
+    digest = hashlib.sha1(f"{config.seed}:{query}".encode()).hexdigest()[:10]
+    cells = []
+    for i in range(config.results):
+        fmt = (
+            IMAGE_FORMATS[i % len(IMAGE_FORMATS)]
+            if config.image_format == "mixed"
+            else config.image_format
+        )
+        image_id = f"{digest}-{i}"
+        full_url = f"{base_url}/img/{image_id}.{fmt}"
+        page_url = f"https://example.com/{urllib.parse.quote(query)}/{i}"
+        href = "/imgres?" + urllib.parse.urlencode(
+            {"imgurl": full_url, "imgrefurl": page_url}
+        )
+        cells.append(
+            CELL_TEMPLATE.format(
+                href=html.escape(href),
+                title=html.escape(f"{query} {i + 1}"),
+                thumbnail=html.escape(f"{base_url}/thumb/{image_id}.jpg"),
+                host="example.com",
+            )
+        )
+
+    rows = "".join(
+        "<tr>" + "".join(cells[i : i + COLUMNS]) + "</tr>"
+        for i in range(0, len(cells), COLUMNS)
+    )
+    return PAGE_TEMPLATE.format(
+        query=html.escape(query),
+        query_param=urllib.parse.quote_plus(query),
+        rows=rows,
+        next_start=config.results,
+    )
+
+
+# Server
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    server: "MockGoogleServer"
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real service
+    # Headers and body are written separately; without this, Nagle's
+    # algorithm and delayed ACKs add ~40ms to small responses
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        params = urllib.parse.parse_qs(url.query)
+        path = url.path
+        if path == "/stats":
+            self._send(200, "application/json", json.dumps(self.server.stats()))
+            return
+
+        self.server.count("requests_" + (path.split("/")[1] or "root"))
+        self.server.delay()
+        if self.server.chance("error_rate"):
+            self.server.count("served_5xx")
+            self._send(self.server.pick((500, 503)), "text/plain", "server error")
+            return
+
+        if path == "/search":
+            self._search(params)
+        elif path == "/sorry/index":
+            continue_url = params.get("continue", [""])[0]
+            page = CAPTCHA_PAGE.format(continue_url=html.escape(continue_url))
+            self._send(429, "text/html; charset=UTF-8", page)
+        elif path.startswith(("/img/", "/thumb/")):
+            self._image(path, params)
+        else:
+            self._send(404, "text/plain", "not found")
+
+    def _search(self, params: dict[str, list[str]]):
+        query = params.get("q", [""])[0]
+        if not query:
+            self._send(400, "text/plain", "missing q")
+            return
+
+        if self.server.over_rate_limit() or self.server.chance("throttle_rate"):
+            self.server.count("served_429")
+            self._send(429, "text/plain", "too many requests", {"Retry-After": "1"})
+            return
+        if self.server.chance("captcha_rate"):
+            self.server.count("served_captcha")
+            sorry = "/sorry/index?" + urllib.parse.urlencode({"continue": self.path})
+            self._send(302, "text/plain", "", {"Location": sorry})
+            return
+
+        page = results_page(self.server.base_url, query, self.server.config)
+        self._send(200, "text/html; charset=UTF-8", page)
+
+    def _image(self, path: str, params: dict[str, list[str]]):
+        kind, _slash, name = path[1:].partition("/")
+        fmt = name.rpartition(".")[2].lower()
+        if fmt not in CONTENT_TYPES:
+            self._send(404, "text/plain", "unknown format")
+            return
+
+        config = self.server.config
+        default = config.image_bytes if kind == "img" else config.thumbnail_bytes
+        try:
+            nbytes = int(params.get("bytes", [default])[0])
+        except ValueError:
+            self._send(400, "text/plain", "bad bytes")
+            return
+        self._send(200, CONTENT_TYPES[fmt], self.server.image(fmt, nbytes))
+
+    def _send(
+        self,
+        status: int,
+        content_type: str,
+        body: str | bytes,
+        headers: dict[str, str] | None = None,
+    ):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.count_bytes(len(data))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class MockGoogleServer(http.server.ThreadingHTTPServer):
+    """Mock Google Images service running in a background thread"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        config: MockConfig | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        verbose: bool = False,
+    ):
+        super().__init__((host, port), _Handler)
+        self.config = config or MockConfig()
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._counters: Counter[str] = Counter()
+        self._searches: deque[float] = deque()
+        self._images: dict[tuple[str, int], bytes] = {}
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self) -> str:
+        """Value for the GOOGLE_IMAGE_SEARCH_URL environment variable"""
+        return f"{self.base_url}/search"
+
+    def start(self) -> "MockGoogleServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "MockGoogleServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Called from request threads
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(0, self.config.jitter_ms)
+        seconds = (self.config.latency_ms + jitter) / 1000
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def chance(self, field_name: str) -> bool:
+        rate = getattr(self.config, field_name)
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def pick(self, choices):
+        with self._lock:
+            return self._rng.choice(choices)
+
+    def over_rate_limit(self) -> bool:
+        """Sliding one-second window over accepted searches"""
+        if self.config.rate_limit <= 0:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            while self._searches and now - self._searches[0] > 1.0:
+                self._searches.popleft()
+            if len(self._searches) >= self.config.rate_limit:
+                return True
+            self._searches.append(now)
+            return False
+
+    def image(self, fmt: str, nbytes: int) -> bytes:
+        key = (fmt, nbytes)
+        with self._lock:
+            data = self._images.get(key)
+        if data is None:
+            data = make_image(fmt, nbytes, self.config.seed)
+            with self._lock:
+                self._images[key] = data
+        return data
+
+    def count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def count_bytes(self, nbytes: int):
+        with self._lock:
+            self._counters["bytes_sent"] += nbytes
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset_stats(self):
+        with self._lock:
+            self._counters.clear()
+
+
+def main() -> int:
+    defaults = MockConfig()
+    parser = argparse.ArgumentParser(description="Mock Google Images server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--results", type=int, default=defaults.results)
+    parser.add_argument("--image-bytes", type=int, default=defaults.image_bytes)
+    parser.add_argument("--thumbnail-bytes", type=int, default=defaults.thumbnail_bytes)
+    parser.add_argument(
+        "--image-format",
+        choices=(*IMAGE_FORMATS, "mixed"),
+        default=defaults.image_format,
+    )
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction of 500/503 answers"
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0, help="searches per second (0 = off)"
+    )
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="fraction of 429 answers"
+    )
+    parser.add_argument(
+        "--captcha-rate",
+        type=float,
+        default=0.0,
+        help="fraction of searches redirected to a CAPTCHA page",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        results=args.results,
+        image_bytes=args.image_bytes,
+        thumbnail_bytes=args.thumbnail_bytes,
+        image_format=args.image_format,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        throttle_rate=args.throttle_rate,
+        captcha_rate=args.captcha_rate,
+        seed=args.seed,
+    )
+    server = MockGoogleServer(config, args.host, args.port, args.verbose)
+    print(f"Mock Google Images server on {server.base_url}")
+    print(f"GOOGLE_IMAGE_SEARCH_URL={server.search_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -70,10 +70,32 @@ def setup_plugin():
         sys.path.insert(0, str(vendor_dir))
 
     from .hooks import setup_editor_button
+    from .prefetch import on_editor_did_load_note
 
     # Setup editor button
     gui_hooks.editor_did_init_buttons.append(setup_editor_button)
 
+    # Prefetch search results for the note being edited (opt-in)
+    gui_hooks.editor_did_load_note.append(on_editor_did_load_note)
+
+    # Write any debounced config change and timings before the profile goes away
+    from .config.config import flush_config
+    from .metrics import flush_metrics
+
+    gui_hooks.profile_will_close.append(flush_config)
+    gui_hooks.profile_will_close.append(flush_metrics)
+    gui_hooks.profile_will_close.append(close_picker_view)
+
+    # Pre-create the picker's browser view once Anki has settled
+    from .config.constants import WEB_WARMUP_DELAY_MS
+
+    mw.progress.single_shot(WEB_WARMUP_DELAY_MS, warm_up_picker_view, False)
+
+    # Background work indicator in the main window (opt-in)
+    from .ui.status_bar import update_status_indicator
+
+    update_status_indicator()
+
     # Add menu item
     add_menu_item()
 
@@ -84,6 +106,40 @@ if __name__ != "__main__":
     mw.progress.single_shot(100, setup_plugin, False)  # Run once after 100ms delay
 
 
+def warm_up_picker_view():
+    """Pre-create the picker's browser view if the browser picker is in use
+
+    Only once the picker has been opened before (its profile directory
+    exists); otherwise the web stack stays unloaded until first use.
+    """
+    from .config.constants import WEB_PROFILE_DIR
+    from .config.enums import PickerMode
+    from .state import get_config
+
+    config = get_config()
+    if not config.enabled or not config.reuse_browser_view:
+        return
+    if config.picker_mode != PickerMode.BROWSER:
+        return
+    if not WEB_PROFILE_DIR.exists():
+        return
+
+    # QtWebEngine is only imported once the view is actually wanted
+    from .ui.web_pool import get_web_view_pool
+
+    get_web_view_pool().warm_up()
+
+
+def close_picker_view():
+    """Delete the pooled browser view while its profile still exists"""
+    import sys
+
+    # Nothing to do (and QtWebEngine not to import) if no picker was opened
+    web_pool = sys.modules.get(f"{__name__}.ui.web_pool")
+    if web_pool is not None:
+        web_pool.get_web_view_pool().close()
+
+
 def add_menu_item():
     """Add menu item to Tools menu"""
     from .translator import _
@@ -91,8 +147,12 @@ def add_menu_item():
     action = QAction(_("图片搜索设置..."), mw)
     action.triggered.connect(show_config_dialog)
 
+    export_action = QAction(_("导出图片搜索性能统计..."), mw)
+    export_action.triggered.connect(export_metrics)
+
     if hasattr(mw, "form") and hasattr(mw.form, "menuTools"):
         mw.form.menuTools.addAction(action)
+        mw.form.menuTools.addAction(export_action)
     else:
         from aqt.utils import tooltip
 
@@ -101,11 +161,35 @@ def add_menu_item():
 
 def show_config_dialog():
     """Show the configuration dialog."""
-    from .state import get_app_state
+    from .state import get_config
     from .ui.config.dialog import ConfigDialog
+    from .ui.status_bar import update_status_indicator
 
-    app_state = get_app_state()
-    dialog = ConfigDialog(config=app_state.config)
+    dialog = ConfigDialog(config=get_config())
     if dialog.exec():
         # Config is saved within the dialog
-        pass
+        update_status_indicator()
+
+
+def export_metrics():
+    """Export per-stage timing percentiles to a JSON file chosen by the user"""
+    from pathlib import Path
+
+    from aqt.qt import QFileDialog
+    from aqt.utils import showWarning, tooltip
+
+    from .metrics import get_metrics
+    from .translator import _
+
+    path, _filter = QFileDialog.getSaveFileName(
+        mw, _("导出性能统计"), "image_search_metrics.json", "JSON (*.json)"
+    )
+    if not path:
+        return
+
+    try:
+        get_metrics().export_json(Path(path))
+    except OSError as e:
+        showWarning(_("导出失败: {}").format(e))
+        return
+    tooltip(_("性能统计已导出"))
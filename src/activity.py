@@ -0,0 +1,218 @@
+# activity.py - Live counters of background image work for the status bar
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from .config.constants import ACTIVITY_WINDOW
+from .config.enums import StatusBarFormat
+from .translator import _
+
+# Stages from metrics.span() shown separately in the status bar
+DOWNLOAD_STAGE = "download"
+THUMBNAIL_DOWNLOAD_STAGE = "thumbnail_download"
+CONVERT_STAGE = "convert"
+# Both count as downloads in the status bar
+DOWNLOAD_STAGES = (DOWNLOAD_STAGE, THUMBNAIL_DOWNLOAD_STAGE)
+
+
+@dataclass
+class ActivitySnapshot:
+    """Counters at one point in time, as shown in the status bar"""
+
+    queued: int
+    downloads: int
+    conversions: int
+    other: int  # other stages in flight (search, media write, insert)
+    downloads_per_minute: float
+    bytes_per_second: float
+    cache_hit_ratio: float | None  # None until the caches saw a lookup
+    images: int  # images downloaded this session
+    errors: int  # failed stages this session
+    memory: dict | None = None  # MemoryBudget.stats(), once downloads started
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.queued or self.downloads or self.conversions or self.other)
+
+    def status_text(self) -> str:
+        """One-line summary for the status bar"""
+        if not self.busy:
+            status = _("空闲")
+        else:
+            status = _("队列 {} · 下载 {} · 转换 {}").format(
+                self.queued, self.downloads, self.conversions
+            )
+        if self.downloads_per_minute:
+            status += _(" · {:.0f} 张/分").format(self.downloads_per_minute)
+        if self.cache_hit_ratio is not None:
+            status += _(" · 缓存命中 {:.0%}").format(self.cache_hit_ratio)
+        return status
+
+    def format(self, fmt: StatusBarFormat) -> str:
+        """Fill a StatusBarFormat template"""
+        icon = "⏳" if self.busy else "🖼"
+        return fmt.value.format(icon=icon, status=self.status_text(), count=self.images)
+
+    def details(self) -> str:
+        """Multi-line description for the tooltip"""
+        hit_ratio = (
+            "-" if self.cache_hit_ratio is None else f"{self.cache_hit_ratio:.0%}"
+        )
+        lines = [
+            _("图片搜索后台任务"),
+            _("排队: {}").format(self.queued),
+            _("下载中: {}").format(self.downloads),
+            _("转换中: {}").format(self.conversions),
+            _("其他进行中: {}").format(self.other),
+            _("吞吐量: {:.1f} 张/分, {:.0f} KB/s").format(
+                self.downloads_per_minute, self.bytes_per_second / 1024
+            ),
+            _("缓存命中率: {}").format(hit_ratio),
+            _("本次已下载: {} 张, 失败: {}").format(self.images, self.errors),
+        ]
+        if self.memory is not None:
+            mb = 1024 * 1024
+            lines.append(
+                _("图片内存: {:.1f} / {:.0f} MB, 峰值 {:.1f} MB").format(
+                    self.memory["in_use"] / mb,
+                    self.memory["limit"] / mb,
+                    self.memory["peak"] / mb,
+                )
+            )
+            lines.append(
+                _("内存等待: {} 次, 写入磁盘: {} 次").format(
+                    self.memory["waits"], self.memory["spills"]
+                )
+            )
+        return "\n".join(lines)
+
+
+class ActivityTracker:
+    """Thread-safe counts of queued and running background work
+
+    Queue depth comes from run_in_background(); stages in flight and
+    completions come from metrics.span(). Throughput covers the last
+    ACTIVITY_WINDOW seconds.
+    """
+
+    def __init__(self, window: float = ACTIVITY_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._in_flight: dict[str, int] = {}
+        # (finish time, bytes) of recent successful downloads
+        self._downloads: deque[tuple[float, int]] = deque()
+        self.images = 0
+        self.errors = 0
+
+    def task_queued(self):
+        with self._lock:
+            self._queued += 1
+
+    def task_started(self):
+        with self._lock:
+            self._queued = max(0, self._queued - 1)
+
+    def stage_started(self, stage: str):
+        with self._lock:
+            self._in_flight[stage] = self._in_flight.get(stage, 0) + 1
+
+    def stage_finished(self, stage: str, ok: bool = True, nbytes: int = 0):
+        with self._lock:
+            self._in_flight[stage] = max(0, self._in_flight.get(stage, 0) - 1)
+            if not ok:
+                self.errors += 1
+            elif stage in DOWNLOAD_STAGES:
+                self.images += 1
+                self._downloads.append((time.monotonic(), nbytes))
+
+    def snapshot(self) -> ActivitySnapshot:
+        now = time.monotonic()
+        with self._lock:
+            while self._downloads and now - self._downloads[0][0] > self.window:
+                self._downloads.popleft()
+            recent = len(self._downloads)
+            recent_bytes = sum(nbytes for _t, nbytes in self._downloads)
+            downloads = sum(self._in_flight.get(s, 0) for s in DOWNLOAD_STAGES)
+            conversions = self._in_flight.get(CONVERT_STAGE, 0)
+            other = sum(self._in_flight.values()) - downloads - conversions
+            snapshot = ActivitySnapshot(
+                queued=self._queued,
+                downloads=downloads,
+                conversions=conversions,
+                other=other,
+                downloads_per_minute=recent * 60 / self.window,
+                bytes_per_second=recent_bytes / self.window,
+                cache_hit_ratio=None,
+                images=self.images,
+                errors=self.errors,
+            )
+        snapshot.cache_hit_ratio = cache_hit_ratio()
+        snapshot.memory = memory_stats()
+        return snapshot
+
+
+def cache_hit_ratio() -> float | None:
+    """Combined hit ratio of the search and thumbnail caches created so far"""
+    from . import search_cache, thumbnail_cache
+
+    hits = lookups = 0
+    # Only read caches that exist; creating one here would touch the disk
+    if search_cache._search_cache is not None:
+        stats = search_cache._search_cache.stats()
+        hits += stats["hits"]
+        lookups += stats["hits"] + stats["misses"]
+    if thumbnail_cache._thumbnail_cache is not None:
+        stats = thumbnail_cache._thumbnail_cache.stats()
+        for tier in ("memory", "disk"):
+            hits += stats[f"{tier}_hits"]
+            lookups += stats[f"{tier}_hits"] + stats[f"{tier}_misses"]
+    return hits / lookups if lookups else None
+
+
+def memory_stats() -> dict | None:
+    """Stats of the in-flight image memory budget, if it was created"""
+    from . import memory_budget
+
+    if memory_budget._memory_budget is None:
+        return None
+    return memory_budget._memory_budget.stats()
+
+
+# Global instance
+_activity = None
+
+
+def get_activity() -> ActivityTracker:
+    """Get or create global ActivityTracker instance"""
+    global _activity
+    if _activity is None:
+        _activity = ActivityTracker()
+    return _activity
+
+
+def run_in_background(
+    task: Callable[[], Any],
+    on_done: Callable[[Any], None] | None = None,
+    uses_collection: bool = False,
+):
+    """mw.taskman.run_in_background, counted in the queue depth until it starts
+
+    Pass uses_collection=True for tasks that touch mw.col (e.g. media
+    writes); Anki then runs them on its collection executor, serialized
+    with its own collection work, instead of the parallel network pool.
+    """
+    from aqt import mw
+
+    tracker = get_activity()
+    tracker.task_queued()
+
+    def run():
+        tracker.task_started()
+        return task()
+
+    mw.taskman.run_in_background(run, on_done, uses_collection=uses_collection)
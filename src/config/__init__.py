@@ -1,6 +1,6 @@
 # config/__init__.py
 
-from .config import load_config, save_config
+from .config import flush_config, load_config, save_config
 from .types import AppConfig
 
-__all__ = ["AppConfig", "load_config", "save_config"]
+__all__ = ["AppConfig", "flush_config", "load_config", "save_config"]
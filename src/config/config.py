@@ -1,11 +1,17 @@
 # config/config.py - Configuration Management
 
+import contextlib
 import json
-from pathlib import Path
+import os
+import shutil
+import threading
 
-from .constants import CONFIG_FILE_PATH, USER_FILES_DIR
+from ..log import get_logger
+from .constants import CONFIG_FILE_PATH, CONFIG_SAVE_DELAY, USER_FILES_DIR
 from .types import AppConfig
 
+log = get_logger("Config")
+
 
 def load_config() -> AppConfig:
     """Load configuration from file or return default"""
@@ -15,25 +21,141 @@ def load_config() -> AppConfig:
     if not CONFIG_FILE_PATH.exists():
         # Create default config
         config = AppConfig()
-        save_config(config)
+        write_config_file(config)
         return config
 
     try:
-        with open(CONFIG_FILE_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return AppConfig.from_dict(data)
-    except (json.JSONDecodeError, ValueError, KeyError) as e:
-        # If config is corrupted, return default
-        print(f"Error loading config: {e}")
+        return read_config_file()
+    except ValueError as e:
+        # If config is corrupted, keep a copy for the user and return default
+        log.warning("Error loading config: %s", e)
+        backup_path = CONFIG_FILE_PATH.with_suffix(".json.corrupt")
+        try:
+            shutil.copyfile(CONFIG_FILE_PATH, backup_path)
+            log.warning("Corrupted config saved as %s", backup_path.name)
+        except OSError:
+            pass
         return AppConfig()
 
 
-def save_config(config: AppConfig):
-    """Save configuration to file"""
+def read_config_file() -> AppConfig:
+    """
+    Parse the configuration file
+
+    Raises:
+        OSError: The file could not be read
+        ValueError: The file does not hold a valid configuration
+    """
+    with open(CONFIG_FILE_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"Config is not a JSON object: {type(data).__name__}")
+    try:
+        return AppConfig.from_dict(data)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid config: {e!r}") from e
+
+
+def write_config_file(config: AppConfig):
+    """
+    Write configuration to file atomically
+
+    The JSON goes to a temporary file in the same directory, is fsynced and
+    then renamed over config.json, so a crash leaves either the old or the
+    new file, never a truncated one.
+    """
     USER_FILES_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = CONFIG_FILE_PATH.with_suffix(f".json.{os.getpid()}.tmp")
 
     try:
-        with open(CONFIG_FILE_PATH, "w", encoding="utf-8") as f:
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(config.to_dict(), f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CONFIG_FILE_PATH)
     except Exception as e:
-        print(f"Error saving config: {e}")
+        log.warning("Error saving config: %s", e)
+        with contextlib.suppress(OSError):
+            tmp_path.unlink()
+
+
+class ConfigWriter:
+    """Coalesces config saves and writes them off the calling thread
+
+    save() only records the latest config and (re)starts a short timer;
+    the write happens on the timer's thread once no further save arrives
+    within the delay. flush() writes a pending config immediately.
+    """
+
+    def __init__(self, delay: float = CONFIG_SAVE_DELAY):
+        self.delay = delay
+        self._pending: AppConfig | None = None
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+        # Serializes writes between the timer thread and flush()
+        self._write_lock = threading.Lock()
+        self.last_written_mtime: int | None = None
+        self.writes = 0
+        self.coalesced = 0
+
+    @property
+    def pending(self) -> bool:
+        with self._lock:
+            return self._pending is not None
+
+    def save(self, config: AppConfig):
+        """Schedule config to be written after the debounce delay"""
+        with self._lock:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = config
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write the pending config now, if there is one"""
+        with self._write_lock:
+            with self._lock:
+                config, self._pending = self._pending, None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if config is None:
+                return
+
+            write_config_file(config)
+            try:
+                self.last_written_mtime = CONFIG_FILE_PATH.stat().st_mtime_ns
+            except OSError:
+                self.last_written_mtime = None
+            self.writes += 1
+
+
+# Global instance
+_config_writer = None
+
+
+def get_config_writer() -> ConfigWriter:
+    """Get or create global ConfigWriter instance"""
+    global _config_writer
+    if _config_writer is None:
+        _config_writer = ConfigWriter()
+    return _config_writer
+
+
+def save_config(config: AppConfig):
+    """Save configuration to file (debounced, off the calling thread)"""
+    get_config_writer().save(config)
+
+
+def flush_config():
+    """Write any pending configuration change immediately"""
+    writer = get_config_writer()
+    if writer.pending:
+        writer.flush()
+        log.info(
+            "配置已写入 (%s 次写入, 合并 %s 次保存)", writer.writes, writer.coalesced
+        )
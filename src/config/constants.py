@@ -1,11 +1,18 @@
 # config/constants.py - Constants
 
+import os
 from pathlib import Path
 
 # File paths
 CONFIG_FILE_NAME = "config.json"
 USER_FILES_DIR = Path(__file__).parent.parent / "user_files"
 CONFIG_FILE_PATH = USER_FILES_DIR / CONFIG_FILE_NAME
+CONFIG_RELOAD_CHECK_INTERVAL = 1.0  # seconds between config file mtime checks
+CONFIG_SAVE_DELAY = 0.5  # seconds; saves within this window are coalesced
+THUMBNAIL_CACHE_DIR = USER_FILES_DIR / "thumbnails"
+WEB_PROFILE_DIR = USER_FILES_DIR / "web_profile"
+METRICS_FILE_PATH = USER_FILES_DIR / "metrics.json"
+LOG_FILE_PATH = USER_FILES_DIR / "image_search.log"
 
 # Default values
 DEFAULT_SEARCH_FIELD = "Word"
@@ -15,13 +22,63 @@ DEFAULT_IMAGE_QUALITY = "medium"
 DEFAULT_IMAGE_FORMAT = "original"
 DEFAULT_CONVERT_FORMAT = False
 DEFAULT_FFMPEG_QUALITY = 80  # Quality for lossy formats (0-100)
+DEFAULT_PREFETCH_ENABLED = False
+DEFAULT_PREFETCH_THUMBNAILS = 6
+DEFAULT_PICKER_MODE = "browser"
+DEFAULT_REUSE_BROWSER_VIEW = True
+DEFAULT_BLOCK_RESOURCES = True
+DEFAULT_SPECULATIVE_DOWNLOAD = True
+DEFAULT_INCREMENTAL_FIELD_UPDATE = True
+DEFAULT_THUMBNAIL_FIRST = False
+DEFAULT_REPLAY_CACHED_PAGES = True
+DEFAULT_LOG_LEVEL = "info"
+DEFAULT_STATUS_BAR_ENABLED = False
+DEFAULT_STATUS_BAR_FORMAT = "{icon} {status}"
+# Request types the embedded browser does not need for picking an image
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("font", "ping", "prefetch", "media", "csp_report")
+DEFAULT_BLOCKED_HOSTS = (
+    "doubleclick.net",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "ogs.google.com",
+)
+DEFAULT_BLOCKED_URL_PATTERNS = ("/gen_204", "/client_204", "/log?format=")
 
 # Image search
-GOOGLE_IMAGE_SEARCH_URL = "https://www.google.com/search"
+# The environment variable points the add-on at a local stand-in such as
+# mock_google_server.py; it is read once, when the add-on loads
+GOOGLE_IMAGE_SEARCH_URL = os.environ.get(
+    "GOOGLE_IMAGE_SEARCH_URL", "https://www.google.com/search"
+)
 # Simplified USER_AGENT works better with Google Images udm=2 API
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 REQUEST_TIMEOUT = 10  # seconds
 
+# Retry policy (total deadline per operation, not per attempt)
+SEARCH_DEADLINE = 20  # seconds
+DOWNLOAD_DEADLINE = 30  # seconds
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # bytes read between cancellation checks
+# Image bytes held between download and media write; new downloads wait beyond
+DOWNLOAD_MEMORY_BUDGET = 32 * 1024 * 1024
+# Bodies larger than this are buffered on disk while they download
+DOWNLOAD_SPOOL_THRESHOLD = 1024 * 1024
+RETRY_MAX_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.25  # seconds, doubled after every attempt
+RETRY_MAX_DELAY = 4.0  # seconds, cap for a single backoff sleep
+RETRYABLE_STATUS_CODES = (408, 425, 429, 500, 502, 503, 504)
+
+# Search result cache and prefetching
+SEARCH_CACHE_SIZE = 32  # queries kept in memory
+SEARCH_CACHE_TTL = 15 * 60  # seconds
+PREFETCH_DELAY_MS = 500  # wait this long on a note before prefetching
+
+# "I'm feeling lucky" insert
+LUCKY_DEADLINE = 8  # seconds for the whole search/download/insert
+LUCKY_CANDIDATES = 3  # results tried before giving up
+LUCKY_LATENCY_TARGET_MS = 1000
+
 # Image processing
 MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
 SUPPORTED_IMAGE_FORMATS = [".jpg", ".jpeg", ".png", ".gif", ".webp"]
@@ -31,7 +88,37 @@ THUMBNAIL_SIZE = (200, 200)
 IMAGE_PICKER_WIDTH = 800
 IMAGE_PICKER_HEIGHT = 600
 GRID_COLUMNS = 4
+THUMBNAIL_WORKERS = 4  # background threads loading picker thumbnails
+THUMBNAIL_MEMORY_BUDGET = 32 * 1024 * 1024  # decoded pixmaps, in bytes
+THUMBNAIL_DISK_BUDGET = 64 * 1024 * 1024  # compressed thumbnails, in bytes
+
+# Embedded browser
+WEB_PROFILE_NAME = "anki_image_search"
+WEB_CACHE_SIZE = 100 * 1024 * 1024  # bytes of HTTP disk cache
+WEB_WARMUP_DELAY_MS = 5000  # pre-create the picker view this long after startup
+EXTRACT_BYTES_TIMEOUT_MS = 1500  # wait for in-page image extraction
+
+# Replay of recently rendered result pages
+PAGE_CACHE_SIZE = 8  # queries kept in memory
+PAGE_CACHE_MAX_BYTES = 12 * 1024 * 1024  # total HTML kept
+# setHtml() cannot display more than 2 MB once percent-encoded
+PAGE_CACHE_MAX_PAGE_BYTES = 1536 * 1024
+PAGE_CACHE_TTL = 30 * 60  # seconds
+PAGE_REFRESH_AGE = 5 * 60  # refresh replayed pages older than this (seconds)
+PAGE_CAPTURE_DELAY_MS = 2000  # let the page render thumbnails before capturing
 
 # FFmpeg
 FFMPEG_TIMEOUT = 30  # seconds for conversion
 FFMPEG_COMMAND = "ffmpeg"  # Command to check/use ffmpeg
+
+# Timing metrics
+METRICS_WINDOW = 500  # most recent samples kept per stage
+METRICS_SAVE_DELAY = 5.0  # seconds between a recorded span and the disk write
+
+# Status bar indicator
+STATUS_BAR_REFRESH_MS = 1000  # how often the indicator re-reads the counters
+ACTIVITY_WINDOW = 60.0  # seconds of completed downloads used for throughput
+
+# Logging
+LOG_MAX_BYTES = 1024 * 1024  # rotate the log file at this size
+LOG_BACKUP_COUNT = 3  # rotated log files kept
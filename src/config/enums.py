@@ -27,6 +27,28 @@ class ImageFormat(str, Enum):
         return self.value
 
 
+class PickerMode(str, Enum):
+    """Image picker dialog implementation"""
+
+    BROWSER = "browser"  # Google Images in an embedded browser
+    NATIVE = "native"  # Thumbnail grid built from search() results
+
+    def __str__(self):
+        return self.value
+
+
+class LogLevel(str, Enum):
+    """Minimum level of diagnostics written to the console and log file"""
+
+    DEBUG = "debug"
+    INFO = "info"
+    WARNING = "warning"
+    ERROR = "error"
+
+    def __str__(self):
+        return self.value
+
+
 class StatusBarFormat(str, Enum):
     """Status bar display format"""
 
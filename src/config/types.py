@@ -3,15 +3,36 @@
 from dataclasses import dataclass, field
 
 from .constants import (
+    DEFAULT_BLOCK_RESOURCES,
+    DEFAULT_BLOCKED_HOSTS,
+    DEFAULT_BLOCKED_RESOURCE_TYPES,
+    DEFAULT_BLOCKED_URL_PATTERNS,
     DEFAULT_CONVERT_FORMAT,
     DEFAULT_FFMPEG_QUALITY,
     DEFAULT_IMAGE_FORMAT,
     DEFAULT_IMAGE_QUALITY,
+    DEFAULT_INCREMENTAL_FIELD_UPDATE,
+    DEFAULT_LOG_LEVEL,
     DEFAULT_MAX_RESULTS,
+    DEFAULT_PICKER_MODE,
+    DEFAULT_PREFETCH_ENABLED,
+    DEFAULT_PREFETCH_THUMBNAILS,
+    DEFAULT_REPLAY_CACHED_PAGES,
+    DEFAULT_REUSE_BROWSER_VIEW,
     DEFAULT_SEARCH_FIELD,
+    DEFAULT_SPECULATIVE_DOWNLOAD,
+    DEFAULT_STATUS_BAR_ENABLED,
+    DEFAULT_STATUS_BAR_FORMAT,
     DEFAULT_TARGET_FIELD,
+    DEFAULT_THUMBNAIL_FIRST,
+)
+from .enums import (
+    ImageFormat,
+    ImageQuality,
+    LogLevel,
+    PickerMode,
+    StatusBarFormat,
 )
-from .enums import ImageFormat, ImageQuality
 from .languages import LanguageCode
 
 
@@ -23,11 +44,14 @@ class NoteTypeTemplate:
     search_field: str
     target_field: str
     enabled: bool = True
+    # Stable across note type renames; None for templates saved before ids
+    note_type_id: int | None = None
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization"""
         return {
             "note_type_name": self.note_type_name,
+            "note_type_id": self.note_type_id,
             "search_field": self.search_field,
             "target_field": self.target_field,
             "enabled": self.enabled,
@@ -41,6 +65,7 @@ class NoteTypeTemplate:
             search_field=data.get("search_field", DEFAULT_SEARCH_FIELD),
             target_field=data.get("target_field", DEFAULT_TARGET_FIELD),
             enabled=data.get("enabled", True),
+            note_type_id=data.get("note_type_id"),
         )
 
 
@@ -63,13 +88,46 @@ class AppConfig:
     # Search settings
     max_results: int = DEFAULT_MAX_RESULTS
     auto_download: bool = True
+    # Update only the target field in the editor instead of reloading the note
+    incremental_field_update: bool = DEFAULT_INCREMENTAL_FIELD_UPDATE
+    # Insert the thumbnail at once and swap in the original in the background
+    thumbnail_first: bool = DEFAULT_THUMBNAIL_FIRST
     image_quality: ImageQuality = ImageQuality.MEDIUM
+    picker_mode: PickerMode = PickerMode.BROWSER
+    reuse_browser_view: bool = DEFAULT_REUSE_BROWSER_VIEW
+    # Start fetching an image as soon as it is clicked in the picker
+    speculative_download: bool = DEFAULT_SPECULATIVE_DOWNLOAD
+    # Show the last rendered result page at once when a query is reopened
+    replay_cached_pages: bool = DEFAULT_REPLAY_CACHED_PAGES
+
+    # Request filtering in the embedded browser
+    block_resources: bool = DEFAULT_BLOCK_RESOURCES
+    blocked_resource_types: list[str] = field(
+        default_factory=lambda: list(DEFAULT_BLOCKED_RESOURCE_TYPES)
+    )
+    blocked_hosts: list[str] = field(
+        default_factory=lambda: list(DEFAULT_BLOCKED_HOSTS)
+    )
+    blocked_url_patterns: list[str] = field(
+        default_factory=lambda: list(DEFAULT_BLOCKED_URL_PATTERNS)
+    )
+    allowed_url_patterns: list[str] = field(default_factory=list)
+
+    # Prefetch search results when a note is loaded in the editor
+    prefetch_enabled: bool = DEFAULT_PREFETCH_ENABLED
+    prefetch_thumbnails: int = DEFAULT_PREFETCH_THUMBNAILS
 
     # Format conversion settings
     convert_format: bool = DEFAULT_CONVERT_FORMAT
     output_format: ImageFormat = ImageFormat.ORIGINAL
     ffmpeg_quality: int = DEFAULT_FFMPEG_QUALITY
 
+    # Diagnostics
+    log_level: LogLevel = LogLevel.INFO
+    # Live indicator of background work in the main window's status bar
+    status_bar_enabled: bool = DEFAULT_STATUS_BAR_ENABLED
+    status_bar_format: StatusBarFormat = StatusBarFormat.ICON_STATUS
+
     def to_dict(self) -> dict:
         """Convert config to dictionary for JSON serialization"""
         return {
@@ -81,10 +139,26 @@ class AppConfig:
             "use_note_type_templates": self.use_note_type_templates,
             "max_results": self.max_results,
             "auto_download": self.auto_download,
+            "incremental_field_update": self.incremental_field_update,
+            "thumbnail_first": self.thumbnail_first,
             "image_quality": self.image_quality.value,
+            "picker_mode": self.picker_mode.value,
+            "reuse_browser_view": self.reuse_browser_view,
+            "speculative_download": self.speculative_download,
+            "replay_cached_pages": self.replay_cached_pages,
+            "block_resources": self.block_resources,
+            "blocked_resource_types": self.blocked_resource_types,
+            "blocked_hosts": self.blocked_hosts,
+            "blocked_url_patterns": self.blocked_url_patterns,
+            "allowed_url_patterns": self.allowed_url_patterns,
+            "prefetch_enabled": self.prefetch_enabled,
+            "prefetch_thumbnails": self.prefetch_thumbnails,
             "convert_format": self.convert_format,
             "output_format": self.output_format.value,
             "ffmpeg_quality": self.ffmpeg_quality,
+            "log_level": self.log_level.value,
+            "status_bar_enabled": self.status_bar_enabled,
+            "status_bar_format": self.status_bar_format.value,
         }
 
     @classmethod
@@ -103,29 +177,97 @@ class AppConfig:
             use_note_type_templates=data.get("use_note_type_templates", True),
             max_results=data.get("max_results", DEFAULT_MAX_RESULTS),
             auto_download=data.get("auto_download", True),
+            incremental_field_update=data.get(
+                "incremental_field_update", DEFAULT_INCREMENTAL_FIELD_UPDATE
+            ),
+            thumbnail_first=data.get("thumbnail_first", DEFAULT_THUMBNAIL_FIRST),
             image_quality=ImageQuality(
                 data.get("image_quality", DEFAULT_IMAGE_QUALITY)
             ),
+            picker_mode=PickerMode(data.get("picker_mode", DEFAULT_PICKER_MODE)),
+            reuse_browser_view=data.get(
+                "reuse_browser_view", DEFAULT_REUSE_BROWSER_VIEW
+            ),
+            speculative_download=data.get(
+                "speculative_download", DEFAULT_SPECULATIVE_DOWNLOAD
+            ),
+            replay_cached_pages=data.get(
+                "replay_cached_pages", DEFAULT_REPLAY_CACHED_PAGES
+            ),
+            block_resources=data.get("block_resources", DEFAULT_BLOCK_RESOURCES),
+            blocked_resource_types=data.get(
+                "blocked_resource_types", list(DEFAULT_BLOCKED_RESOURCE_TYPES)
+            ),
+            blocked_hosts=data.get("blocked_hosts", list(DEFAULT_BLOCKED_HOSTS)),
+            blocked_url_patterns=data.get(
+                "blocked_url_patterns", list(DEFAULT_BLOCKED_URL_PATTERNS)
+            ),
+            allowed_url_patterns=data.get("allowed_url_patterns", []),
+            prefetch_enabled=data.get("prefetch_enabled", DEFAULT_PREFETCH_ENABLED),
+            prefetch_thumbnails=data.get(
+                "prefetch_thumbnails", DEFAULT_PREFETCH_THUMBNAILS
+            ),
             convert_format=data.get("convert_format", DEFAULT_CONVERT_FORMAT),
             output_format=ImageFormat(data.get("output_format", DEFAULT_IMAGE_FORMAT)),
             ffmpeg_quality=data.get("ffmpeg_quality", DEFAULT_FFMPEG_QUALITY),
+            log_level=LogLevel(data.get("log_level", DEFAULT_LOG_LEVEL)),
+            status_bar_enabled=data.get(
+                "status_bar_enabled", DEFAULT_STATUS_BAR_ENABLED
+            ),
+            status_bar_format=StatusBarFormat(
+                data.get("status_bar_format", DEFAULT_STATUS_BAR_FORMAT)
+            ),
         )
 
-    def get_fields_for_note_type(self, note_type_name: str) -> tuple[str, str]:
+    def build_field_index(self) -> dict[int | str, tuple[str, str]]:
+        """
+        Map note type ids and names to (search_field, target_field)
+
+        Only enabled templates are indexed; the first template for a note
+        type wins, as with a linear scan.
+        """
+        index: dict[int | str, tuple[str, str]] = {}
+        if self.use_note_type_templates:
+            for template in self.note_type_templates:
+                if not template.enabled:
+                    continue
+                fields = (template.search_field, template.target_field)
+                if template.note_type_id is not None:
+                    index.setdefault(template.note_type_id, fields)
+                index.setdefault(template.note_type_name, fields)
+        return index
+
+    def fields_from_index(
+        self,
+        index: dict[int | str, tuple[str, str]],
+        note_type_name: str,
+        note_type_id: int | None = None,
+    ) -> tuple[str, str]:
+        """Look up fields in an index from build_field_index (id before name)"""
+        if note_type_id is not None and note_type_id in index:
+            return index[note_type_id]
+        if note_type_name in index:
+            return index[note_type_name]
+
+        # Fallback to default fields
+        return (self.search_field, self.target_field)
+
+    def get_fields_for_note_type(
+        self, note_type_name: str, note_type_id: int | None = None
+    ) -> tuple[str, str]:
         """
         Get search and target fields for a specific note type
 
+        Builds the index on every call; state.get_fields_for_note_type
+        uses a cached one.
+
         Args:
             note_type_name: Name of the note type
+            note_type_id: Id of the note type, matched before the name
 
         Returns:
             Tuple of (search_field, target_field)
         """
-        if self.use_note_type_templates:
-            # Look for matching template
-            for template in self.note_type_templates:
-                if template.enabled and template.note_type_name == note_type_name:
-                    return (template.search_field, template.target_field)
-
-        # Fallback to default fields
-        return (self.search_field, self.target_field)
+        return self.fields_from_index(
+            self.build_field_index(), note_type_name, note_type_id
+        )
@@ -7,6 +7,9 @@ from pathlib import Path
 from typing import Tuple
 
 from .config.constants import FFMPEG_COMMAND, FFMPEG_TIMEOUT
+from .log import get_logger
+
+log = get_logger("FFmpeg")
 
 
 class FFmpegConverter:
@@ -42,7 +45,7 @@ class FFmpegConverter:
                 # Extract first line which contains version
                 return result.stdout.split("\n")[0]
         except Exception as e:
-            print(f"Error getting ffmpeg version: {e}")
+            log.warning("Error getting ffmpeg version: %s", e)
 
         return None
 
@@ -143,7 +146,7 @@ class FFmpegConverter:
 
                     shutil.rmtree(temp_dir, ignore_errors=True)
                 except Exception as e:
-                    print(f"Error cleaning up temp directory: {e}")
+                    log.warning("Error cleaning up temp directory: %s", e)
 
     def get_format_extension(self, format_name: str) -> str:
         """
@@ -2,11 +2,14 @@
 
 from aqt.editor import Editor
 
-from .state import get_config
+from .log import get_logger
+from .state import get_config, get_fields_for_note_type
+
+log = get_logger("Hooks")
 
 
 def setup_editor_button(buttons: list[str], editor: Editor):
-    """Add image search button to editor toolbar"""
+    """Add image search buttons to editor toolbar"""
     config = get_config()
 
     if not config.enabled:
@@ -21,60 +24,108 @@ def setup_editor_button(buttons: list[str], editor: Editor):
         keys="Ctrl+Shift+I",
         label="🔍",
     )
-
     buttons.append(button)
+
+    # Insert the best result directly, without the picker
+    lucky_button = editor.addButton(
+        icon=None,
+        cmd="image_search_lucky",
+        func=lambda e: on_lucky_insert_clicked(e),
+        tip="Insert the top image result (Ctrl+Shift+J)",
+        keys="Ctrl+Shift+J",
+        label="🍀",
+    )
+    buttons.append(lucky_button)
+
     return buttons
 
 
-def on_image_search_clicked(editor: Editor):
-    """Handle image search button click"""
-    print("[Hooks] 图片搜索按钮被点击")
+def resolve_search(editor: Editor) -> tuple[str, str] | None:
+    """
+    Get the cleaned search query and target field for the editor's note
+
+    Shows a tooltip and returns None if the note cannot be searched.
+
+    Returns:
+        Tuple of (search_query, target_field)
+    """
     from aqt import mw
     from aqt.utils import tooltip
 
     from .translator import _
-    from .ui.browser_picker import show_browser_image_picker
-
-    config = get_config()
-    print(f"[Hooks] 配置加载完成")
 
     # Get current note
     note = editor.note
     if not note:
-        print("[Hooks] 错误：未找到笔记")
+        log.warning("错误：未找到笔记")
         tooltip(_("请先选择一个笔记"))
-        return
+        return None
 
-    print(f"[Hooks] 当前笔记ID: {note.id}")
+    log.debug("当前笔记ID: %s", note.id)
 
     # Get note type name
     note_type = note.note_type()
     note_type_name = note_type["name"] if note_type else ""
-    print(f"[Hooks] 笔记类型: {note_type_name}")
+    log.debug("笔记类型: %s", note_type_name)
 
     # Get fields for this note type
-    search_field, target_field = config.get_fields_for_note_type(note_type_name)
-    print(f"[Hooks] 搜索字段: {search_field}, 目标字段: {target_field}")
+    search_field, target_field = get_fields_for_note_type(note_type)
+    log.debug("搜索字段: %s, 目标字段: %s", search_field, target_field)
 
     # Validate search field exists
     if search_field not in note:
-        print(f"[Hooks] 错误：搜索字段 '{search_field}' 不存在")
+        log.warning("错误：搜索字段 '%s' 不存在", search_field)
         tooltip(_("搜索字段 '{}' 不存在").format(search_field))
-        return
+        return None
 
     # Get search query
     search_query = note[search_field]
-    print(f"[Hooks] 原始搜索内容: {search_query[:100] if search_query else '(空)'}")
+    log.debug("原始搜索内容: %s", search_query[:100] if search_query else "(空)")
 
     if not search_query or not search_query.strip():
-        print("[Hooks] 错误：搜索字段为空")
+        log.warning("错误：搜索字段为空")
         tooltip(_("搜索字段为空"))
-        return
+        return None
 
     # Strip HTML tags from search query
     search_query = mw.col.media.strip(search_query)
-    print(f"[Hooks] 清理后的搜索词: {search_query}")
+    log.debug("清理后的搜索词: %s", search_query)
+
+    return search_query, target_field
+
+
+def on_image_search_clicked(editor: Editor):
+    """Handle image search button click"""
+    log.debug("图片搜索按钮被点击")
+    from .config.enums import PickerMode
+
+    resolved = resolve_search(editor)
+    if not resolved:
+        return
+    search_query, target_field = resolved
+
+    if get_config().picker_mode == PickerMode.NATIVE:
+        from .ui.grid_picker import show_grid_image_picker
+
+        log.debug("调用 show_grid_image_picker")
+        show_grid_image_picker(editor, search_query, target_field)
+        return
+
+    from .ui.browser_picker import show_browser_image_picker
 
     # Show browser-based image picker dialog
-    print("[Hooks] 调用 show_browser_image_picker")
+    log.debug("调用 show_browser_image_picker")
     show_browser_image_picker(editor, search_query, target_field)
+
+
+def on_lucky_insert_clicked(editor: Editor):
+    """Handle "I'm feeling lucky" button click"""
+    log.debug("快速插入按钮被点击")
+    from .lucky import lucky_insert
+
+    resolved = resolve_search(editor)
+    if not resolved:
+        return
+    search_query, target_field = resolved
+
+    lucky_insert(editor, search_query, target_field)
@@ -1,28 +1,61 @@
 # image_search.py - Google Image Search and Download
 
 import hashlib
+import json
 import mimetypes
 import re
+import tempfile
+import time
 import urllib.parse
 from pathlib import Path
 from typing import Any
 
-try:
-    import requests
-    from bs4 import BeautifulSoup
-    import filetype
-
-    DEPENDENCIES_AVAILABLE = True
-except ImportError:
-    DEPENDENCIES_AVAILABLE = False
-
+from .activity import DOWNLOAD_STAGE
 from .config.constants import (
+    DOWNLOAD_CHUNK_SIZE,
+    DOWNLOAD_DEADLINE,
+    DOWNLOAD_SPOOL_THRESHOLD,
     GOOGLE_IMAGE_SEARCH_URL,
     MAX_IMAGE_SIZE,
-    REQUEST_TIMEOUT,
+    SEARCH_DEADLINE,
     SUPPORTED_IMAGE_FORMATS,
     USER_AGENT,
 )
+from .config.enums import ImageQuality
+from .log import get_logger
+from .memory_budget import BudgetTimeout, Reservation, get_memory_budget
+from .metrics import get_metrics, span
+from .retry import (
+    CancelToken,
+    NonRetryableError,
+    OperationCancelled,
+    RetryPolicy,
+    RetryReport,
+    run_with_retry,
+)
+
+log = get_logger("ImageSearch")
+insert_log = get_logger("InsertImage")
+save_log = get_logger("SaveImage")
+
+# requests, bs4 and filetype are imported on first use, not at add-on load
+_dependencies_available: bool | None = None
+
+
+def dependencies_available() -> bool:
+    """Import the search dependencies once and report whether they loaded"""
+    global _dependencies_available
+    if _dependencies_available is None:
+        try:
+            import bs4  # noqa: F401
+            import filetype  # noqa: F401
+            import requests  # noqa: F401
+
+            _dependencies_available = True
+        except ImportError as e:
+            log.warning("依赖导入失败: %s", e)
+            _dependencies_available = False
+    return _dependencies_available
 
 
 class GoogleImageSearch:
@@ -30,155 +63,371 @@ class GoogleImageSearch:
 
     def __init__(self):
         self.session = None
-        if DEPENDENCIES_AVAILABLE:
+        # Retry report of the most recent search/download, for diagnostics
+        self.last_report: RetryReport | None = None
+        if dependencies_available():
             import requests
 
             self.session = requests.Session()
             self.session.headers.update({"User-Agent": USER_AGENT})
 
-    def search(self, query: str, max_results: int = 20) -> list[dict[str, Any]]:
+    def search(
+        self,
+        query: str,
+        max_results: int = 20,
+        cancel: CancelToken | None = None,
+        deadline: float = SEARCH_DEADLINE,
+    ) -> list[dict[str, Any]]:
         """
-        Search Google Images for the given query
+        Search Google Images for the given query, retrying until the deadline
+
+        No further attempts are started once the cancel token is set.
 
         Returns:
             List of dicts with keys: url, thumbnail, title, source
         """
-        if not DEPENDENCIES_AVAILABLE:
+        if not dependencies_available():
             return []
 
-        try:
-            # Build search URL with udm=2 for image search
-            params = {
-                "q": query,
-                "udm": "2",  # Image search mode (unified display mode)
-            }
+        # Build search URL with udm=2 for image search
+        params = {
+            "q": query,
+            "udm": "2",  # Image search mode (unified display mode)
+        }
+        url = f"{GOOGLE_IMAGE_SEARCH_URL}?{urllib.parse.urlencode(params)}"
 
-            import urllib.parse
+        def fetch(timeout: float) -> str:
+            response = self.session.get(url, timeout=timeout)
+            response.raise_for_status()
+            return response.text
+
+        with span("search") as current:
+            html, report = run_with_retry(
+                fetch, RetryPolicy(deadline=deadline), "search", cancel
+            )
+            self.last_report = report
+            log.debug("%s", report.summary())
+
+            if html is None:
+                log.warning("Error searching images: %s", report.error)
+                current.fail()
+                return []
+
+            try:
+                return parse_search_results(html, max_results)
+            except Exception as e:
+                log.warning("Error searching images: %s", e)
+                current.fail()
+                return []
+
+    def download_image(
+        self,
+        url: str,
+        deadline: float = DOWNLOAD_DEADLINE,
+        cancel: CancelToken | None = None,
+        stage: str = DOWNLOAD_STAGE,
+    ) -> bytes | None:
+        """
+        Download image from URL, retrying until the deadline (seconds)
 
-            url = f"{GOOGLE_IMAGE_SEARCH_URL}?{urllib.parse.urlencode(params)}"
+        The returned bytes no longer count against the memory budget; use
+        fetch_image() for images that are kept until the media write.
+        stage names the timing span; thumbnails use THUMBNAIL_DOWNLOAD_STAGE.
+        """
+        fetched = self.fetch_image(url, deadline, cancel, stage)
+        if fetched is None:
+            return None
+        image_data, reservation = fetched
+        reservation.release()
+        return image_data
+
+    def fetch_image(
+        self,
+        url: str,
+        deadline: float = DOWNLOAD_DEADLINE,
+        cancel: CancelToken | None = None,
+        stage: str = DOWNLOAD_STAGE,
+    ) -> tuple[bytes, Reservation] | None:
+        """
+        Download image from URL, retrying until the deadline (seconds)
 
-            # Make request
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
+        Waits while the in-flight image bytes are over the memory budget.
+        If a cancel token is given, the download stops as soon as it is set.
 
-            # Parse HTML
-            from bs4 import BeautifulSoup
-
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Extract image data - Google Images with udm=2 uses img tags with class DS1iW
-            results = []
-
-            # Find all image result containers (divs that contain the images)
-            # Google's structure: div containers with img.DS1iW inside
-            image_tags = soup.find_all("img", class_="DS1iW")
-
-            for img_tag in image_tags[:max_results]:
-                try:
-                    # Get image URL from src attribute
-                    img_url = img_tag.get("src")
-
-                    if (
-                        not img_url
-                        or img_url.startswith("data:")
-                        or img_url.startswith("/images/branding")
-                    ):
-                        # Skip base64 thumbnails and Google logos
-                        continue
-
-                    # For Google Images, the src is already a valid thumbnail URL
-                    thumbnail_url = img_url
-
-                    # Get title/alt text
-                    title = img_tag.get("alt", "")
-
-                    # Try to find the parent link to get source URL
-                    parent_link = img_tag.find_parent("a")
-                    source_url = ""
-                    if parent_link:
-                        href = parent_link.get("href", "")
-                        # Extract the actual image URL from Google's redirect link
-                        if href and "imgurl=" in href:
-                            # Parse the imgurl parameter from Google's link
-
-                            parsed = urllib.parse.parse_qs(
-                                urllib.parse.urlparse(href).query
-                            )
-                            if "imgurl" in parsed:
-                                source_url = parsed["imgurl"][0]
-                        else:
-                            source_url = href
-
-                    # Use the high-res source URL if available, otherwise use thumbnail
-                    final_url = (
-                        source_url
-                        if source_url and source_url.startswith("http")
-                        else img_url
-                    )
+        Returns:
+            Tuple of (image bytes, their memory budget reservation), or None
+            if failed. The caller releases the reservation once the bytes
+            are written or dropped (write_prepared_image() does this).
+        """
+        log.debug("开始下载图片: %s", url[:100])
+        if url.startswith("data:"):
+            # Inline image: nothing to download
+            image_data = decode_data_uri(url)
+            if image_data is None:
+                return None
+            return image_data, get_memory_budget().track(len(image_data))
+
+        if not dependencies_available():
+            log.warning("依赖不可用")
+            return None
 
-                    results.append(
-                        {
-                            "url": final_url,
-                            "thumbnail": thumbnail_url,
-                            "title": title or "Image",
-                            "source": source_url,
-                        }
+        # New downloads wait here while the in-flight image bytes are at the
+        # budget; the wait comes out of the download deadline
+        wait_start = time.monotonic()
+        try:
+            reservation = get_memory_budget().reserve(
+                DOWNLOAD_SPOOL_THRESHOLD, cancel, deadline
+            )
+        except (BudgetTimeout, OperationCancelled) as e:
+            log.warning("下载未开始: %s", e)
+            return None
+        deadline -= time.monotonic() - wait_start
+        deadline_at = time.monotonic() + deadline
+
+        def fetch(timeout: float) -> bytes:
+            import requests
+
+            log.debug("发送HTTP请求...")
+            # Closing the response releases the connection on every exit
+            with self.session.get(url, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                log.debug("HTTP状态码: %s", response.status_code)
+
+                # Check content type
+                content_type = response.headers.get("content-type", "")
+                log.debug("Content-Type: %s", content_type)
+                if not content_type.startswith("image/"):
+                    raise NonRetryableError(f"无效的Content-Type: {content_type}")
+
+                # Check file size
+                content_length = response.headers.get("content-length")
+                if content_length:
+                    log.debug("Content-Length: %s 字节", content_length)
+                    if int(content_length) > MAX_IMAGE_SIZE:
+                        raise NonRetryableError(f"图片太大: {content_length} 字节")
+                    reservation.resize(
+                        min(int(content_length), DOWNLOAD_SPOOL_THRESHOLD)
                     )
-                except Exception as e:
-                    print(f"Error parsing image element: {e}")
-                    continue
 
-            return results
+                # Download image; bodies past the threshold are buffered on disk
+                log.debug("正在读取图片数据...")
+                with tempfile.SpooledTemporaryFile(DOWNLOAD_SPOOL_THRESHOLD) as body:
+                    size = 0
+                    for chunk in iter_body(response, DOWNLOAD_CHUNK_SIZE):
+                        if cancel is not None:
+                            cancel.raise_if_cancelled()
+                        # The timeout is per socket read; a trickling body must
+                        # still stop at the overall deadline
+                        if time.monotonic() > deadline_at:
+                            raise requests.Timeout(f"下载超时: 已读取 {size} 字节")
+                        body.write(chunk)
+                        size += len(chunk)
+                        if size > MAX_IMAGE_SIZE:
+                            raise NonRetryableError(f"下载的图片太大: {size} 字节")
+                    if size > DOWNLOAD_SPOOL_THRESHOLD:
+                        get_memory_budget().record_spill()
+                    # The whole body is about to be in memory
+                    reservation.resize(size)
+                    body.seek(0)
+                    image_data = body.read()
+                log.debug("下载完成，大小: %s 字节", len(image_data))
+
+                return image_data
+
+        with span(stage) as current:
+            try:
+                image_data, report = run_with_retry(
+                    fetch, RetryPolicy(deadline=deadline), "download", cancel
+                )
+            except BaseException:
+                reservation.release()
+                raise
+            self.last_report = report
+            log.debug("%s", report.summary())
+
+            if image_data is None:
+                log.warning("下载失败: %s", report.error)
+                current.fail()
+                reservation.release()
+                return None
+            current.nbytes = len(image_data)
 
-        except Exception as e:
-            print(f"Error searching images: {e}")
-            return []
+        return image_data, reservation
 
-    def download_image(self, url: str) -> bytes | None:
-        """Download image from URL"""
-        print(f"[ImageSearch] 开始下载图片: {url[:100]}")
-        if not DEPENDENCIES_AVAILABLE:
-            print("[ImageSearch] 依赖不可用")
-            return None
 
+def order_candidates(
+    full_url: str | None, thumbnail_url: str | None, quality: ImageQuality
+) -> list[str]:
+    """
+    Order the full-resolution and thumbnail URLs of one image by preference
+
+    Low quality prefers the (already loaded) thumbnail; medium and high
+    prefer the original. The other URL is kept as a fallback.
+    """
+    urls = [full_url, thumbnail_url]
+    if quality == ImageQuality.LOW:
+        urls.reverse()
+    # Drop missing and duplicate URLs while keeping order
+    return list(dict.fromkeys(u for u in urls if u))
+
+
+def iter_body(response, chunk_size: int):
+    """
+    Yield a streamed response body as it arrives
+
+    iter_content() blocks until chunk_size bytes are in, so a trickling
+    body would never reach the caller's deadline check; urllib3 2's
+    read1() returns whatever has arrived instead.
+    """
+    raw = response.raw
+    if not hasattr(raw, "read1"):
+        yield from response.iter_content(chunk_size)
+        return
+
+    import requests
+    from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+    while True:
+        # Same exception mapping as iter_content(), so retries still apply
         try:
-            print("[ImageSearch] 发送HTTP请求...")
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT, stream=True)
-            response.raise_for_status()
-            print(f"[ImageSearch] HTTP状态码: {response.status_code}")
+            chunk = raw.read1(chunk_size, decode_content=True)
+        except ReadTimeoutError as e:
+            raise requests.ConnectionError(e) from e
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e) from e
+        if not chunk:
+            return
+        yield chunk
 
-            # Check content type
-            content_type = response.headers.get("content-type", "")
-            print(f"[ImageSearch] Content-Type: {content_type}")
-            if not content_type.startswith("image/"):
-                print(f"[ImageSearch] 错误：无效的Content-Type: {content_type}")
-                return None
 
-            # Check file size
-            content_length = response.headers.get("content-length")
-            if content_length:
-                print(f"[ImageSearch] Content-Length: {content_length} 字节")
-                if int(content_length) > MAX_IMAGE_SIZE:
-                    print(f"[ImageSearch] 错误：图片太大: {content_length} 字节")
-                    return None
-
-            # Download image
-            print("[ImageSearch] 正在读取图片数据...")
-            image_data = response.content
-            print(f"[ImageSearch] 下载完成，大小: {len(image_data)} 字节")
-
-            if len(image_data) > MAX_IMAGE_SIZE:
-                print(f"[ImageSearch] 错误：下载的图片太大: {len(image_data)} 字节")
-                return None
+def decode_data_uri(uri: str) -> bytes | None:
+    """
+    Decode a data: URI (base64 or percent-encoded) to bytes
+
+    Returns:
+        The decoded bytes, or None if uri is not a valid data: URI or too large
+    """
+    if not uri.startswith("data:") or "," not in uri:
+        return None
+
+    header, payload = uri[5:].split(",", 1)
+    try:
+        if header.endswith(";base64"):
+            import base64
+
+            data = base64.b64decode(payload, validate=False)
+        else:
+            data = urllib.parse.unquote_to_bytes(payload)
+    except ValueError as e:
+        log.warning("data: URI 解码失败: %s", e)
+        return None
+
+    if not data or len(data) > MAX_IMAGE_SIZE:
+        return None
+    return data
+
+
+# Global instance
+_searcher = None
+
+
+def get_searcher() -> GoogleImageSearch:
+    """Get or create the shared GoogleImageSearch instance (pooled connections)"""
+    global _searcher
+    if _searcher is None:
+        _searcher = GoogleImageSearch()
+    return _searcher
+
+
+def search_cached(
+    query: str,
+    max_results: int = 20,
+    cancel: CancelToken | None = None,
+    deadline: float = SEARCH_DEADLINE,
+) -> list[dict[str, Any]]:
+    """Search through the shared result cache"""
+    from .search_cache import get_search_cache
+
+    cache = get_search_cache()
+    results = cache.get_results(query)
+    if results is not None:
+        log.debug("命中搜索缓存: %s", query)
+        return results[:max_results]
+
+    results = get_searcher().search(query, max_results, cancel, deadline)
+    cache.put_results(query, results)
+    return results
 
-            return image_data
 
+def parse_search_results(html: str, max_results: int = 20) -> list[dict[str, Any]]:
+    """
+    Parse a Google Images (udm=2) results page
+
+    Returns:
+        List of dicts with keys: url, thumbnail, title, source
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Extract image data - Google Images with udm=2 uses img tags with class DS1iW
+    results = []
+
+    # Find all image result containers (divs that contain the images)
+    # Google's structure: div containers with img.DS1iW inside
+    image_tags = soup.find_all("img", class_="DS1iW")
+
+    for img_tag in image_tags[:max_results]:
+        try:
+            # Get image URL from src attribute
+            img_url = img_tag.get("src")
+
+            if (
+                not img_url
+                or img_url.startswith("data:")
+                or img_url.startswith("/images/branding")
+            ):
+                # Skip base64 thumbnails and Google logos
+                continue
+
+            # For Google Images, the src is already a valid thumbnail URL
+            thumbnail_url = img_url
+
+            # Get title/alt text
+            title = img_tag.get("alt", "")
+
+            # Try to find the parent link to get source URL
+            parent_link = img_tag.find_parent("a")
+            source_url = ""
+            if parent_link:
+                href = parent_link.get("href", "")
+                # Extract the actual image URL from Google's redirect link
+                if href and "imgurl=" in href:
+                    # Parse the imgurl parameter from Google's link
+                    parsed = urllib.parse.parse_qs(urllib.parse.urlparse(href).query)
+                    if "imgurl" in parsed:
+                        source_url = parsed["imgurl"][0]
+                else:
+                    source_url = href
+
+            # Use the high-res source URL if available, otherwise use thumbnail
+            final_url = (
+                source_url if source_url and source_url.startswith("http") else img_url
+            )
+
+            results.append(
+                {
+                    "url": final_url,
+                    "thumbnail": thumbnail_url,
+                    "title": title or "Image",
+                    "source": source_url,
+                }
+            )
         except Exception as e:
-            print(f"[ImageSearch] 下载异常: {e}")
-            import traceback
+            log.warning("Error parsing image element: %s", e)
+            continue
 
-            traceback.print_exc()
-            return None
+    return results
 
 
 def _detect_image_format(data: bytes) -> str | None:
@@ -191,6 +440,11 @@ def _detect_image_format(data: bytes) -> str | None:
     Returns:
         Format string (e.g., 'jpg', 'png', 'gif', 'webp') or None if unknown
     """
+    if not dependencies_available():
+        return None
+
+    import filetype
+
     try:
         kind = filetype.image_match(data)
         if kind:
@@ -203,159 +457,305 @@ def _detect_image_format(data: bytes) -> str | None:
     return None
 
 
-def save_image_to_media(image_data: bytes, url: str, note=None) -> str | None:
+def prepare_image(
+    image_data: bytes, url: str, reservation: Reservation | None = None
+) -> tuple[str, bytes]:
     """
-    Save image to Anki media folder and return filename
+    Convert image bytes as configured and choose their media filename
+
+    Does not touch the collection, so it is safe to run in a background
+    thread ahead of the actual media write.
 
     Args:
         image_data: Image bytes
         url: Original image URL
-        note: Anki note object (optional, for context)
+        reservation: Memory budget reservation for image_data (optional);
+            resized to the returned bytes, released if conversion raises
 
     Returns:
-        Filename in media folder, or None if failed
+        Tuple of (filename, image bytes to write)
     """
-    print("[SaveImage] 开始保存图片到媒体文件夹")
-    print(f"[SaveImage] 图片大小: {len(image_data)} 字节")
-    print(f"[SaveImage] URL: {url[:100]}")
+    from .state import get_config
+
+    config = get_config()
+    save_log.debug(
+        "格式转换: %s, 输出格式: %s", config.convert_format, config.output_format.value
+    )
+
+    # Convert format if enabled
+    if config.convert_format and config.output_format.value != "original":
+        from .ffmpeg_utils import get_converter
+
+        converter = get_converter()
+        if converter.is_available():
+            # Room for the converted copy, sized like the original. The
+            # original is counted here too unless the caller reserved it;
+            # then the copy is tracked, as waiting while holding could stall
+            budget = get_memory_budget()
+            try:
+                if reservation is None:
+                    room = budget.reserve(2 * len(image_data))
+                else:
+                    room = budget.track(len(image_data))
+                # ffmpeg runs as a child process
+                with room, span("convert", children=True) as current:
+                    converted_data, error = converter.convert_image(
+                        image_data, config.output_format.value, config.ffmpeg_quality
+                    )
+                    if not converted_data:
+                        current.fail()
+            except BaseException:
+                if reservation is not None:
+                    reservation.release()
+                raise
+            if converted_data:
+                image_data = converted_data
+                if reservation is not None:
+                    # The caller trades the original for the converted bytes
+                    reservation.resize(len(image_data))
+                save_log.debug(
+                    "Image converted to %s using ffmpeg", config.output_format.value
+                )
+            else:
+                save_log.warning("Format conversion failed: %s, using original", error)
+                # Continue with original image if conversion fails
+        else:
+            save_log.warning("FFmpeg not available, using original image format")
+
+    # Generate unique filename
+    save_log.debug("生成唯一文件名...")
+    url_hash = hashlib.md5(url.encode()).hexdigest()[:12]
+    save_log.debug("URL哈希: %s", url_hash)
+
+    # Determine extension
+    if config.convert_format and config.output_format.value != "original":
+        # Use configured output format
+        save_log.debug("使用配置的输出格式")
+        from .ffmpeg_utils import get_converter
+
+        converter = get_converter()
+        ext = converter.get_format_extension(config.output_format.value)
+        save_log.debug("FFmpeg扩展名: %s", ext)
+    else:
+        # Try to get extension from URL
+        save_log.debug("从URL提取扩展名...")
+        parsed_url = urllib.parse.urlparse(url)
+        path = parsed_url.path
+        ext = Path(path).suffix.lower()
+        save_log.debug("URL扩展名: %s", ext)
+
+        # If no extension, try to guess from content
+        if not ext or ext not in SUPPORTED_IMAGE_FORMATS:
+            # Try to detect from image data using magic bytes
+            save_log.debug("从图片数据检测格式...")
+            detected = _detect_image_format(image_data)
+            if detected:
+                ext = f".{detected}"
+                save_log.debug("检测到格式: %s", detected)
+            else:
+                ext = ".jpg"  # Default fallback
+                save_log.debug("使用默认扩展名: .jpg")
+
+    filename = f"image_search_{url_hash}{ext}"
+    save_log.debug("最终文件名: %s", filename)
+    return filename, image_data
 
+
+def write_prepared_image(
+    filename: str, image_data: bytes, reservation: Reservation | None = None
+) -> str | None:
+    """
+    Write prepared image bytes to the media folder
+
+    The memory budget reservation for the bytes, if given, is released
+    once the write has finished or failed.
+
+    Returns:
+        Filename actually used by the media folder, or None if failed
+    """
     try:
         from aqt import mw
 
         if not mw or not mw.col:
-            print("[SaveImage] 错误：Anki主窗口或集合不可用")
+            save_log.warning("错误：Anki主窗口或集合不可用")
             return None
 
-        print("[SaveImage] Anki集合已就绪")
-
-        # Get configuration
-        from .state import get_config
-
-        config = get_config()
-        print(
-            f"[SaveImage] 格式转换: {config.convert_format}, 输出格式: {config.output_format.value}"
-        )
+        save_log.debug("写入到媒体文件夹...")
+        with span("media_write"):
+            filename = mw.col.media.write_data(filename, image_data)
+        save_log.debug("写入成功")
+        return filename
 
-        # Convert format if enabled
-        original_data = image_data
-        if config.convert_format and config.output_format.value != "original":
-            from .ffmpeg_utils import get_converter
+    except Exception as e:
+        save_log.exception("保存异常: %s", e)
+        return None
+    finally:
+        if reservation is not None:
+            reservation.release()
 
-            converter = get_converter()
-            if converter.is_available():
-                converted_data, error = converter.convert_image(
-                    image_data, config.output_format.value, config.ffmpeg_quality
-                )
-                if converted_data:
-                    image_data = converted_data
-                    print(
-                        f"Image converted to {config.output_format.value} using ffmpeg"
-                    )
-                else:
-                    print(f"Format conversion failed: {error}, using original")
-                    # Continue with original image if conversion fails
-            else:
-                print("FFmpeg not available, using original image format")
-
-        # Generate unique filename
-        print("[SaveImage] 生成唯一文件名...")
-        url_hash = hashlib.md5(url.encode()).hexdigest()[:12]
-        print(f"[SaveImage] URL哈希: {url_hash}")
-
-        # Determine extension
-        if config.convert_format and config.output_format.value != "original":
-            # Use configured output format
-            print("[SaveImage] 使用配置的输出格式")
-            from .ffmpeg_utils import get_converter
-
-            converter = get_converter()
-            ext = converter.get_format_extension(config.output_format.value)
-            print(f"[SaveImage] FFmpeg扩展名: {ext}")
-        else:
-            # Try to get extension from URL
-            print("[SaveImage] 从URL提取扩展名...")
-            parsed_url = urllib.parse.urlparse(url)
-            path = parsed_url.path
-            ext = Path(path).suffix.lower()
-            print(f"[SaveImage] URL扩展名: {ext}")
-
-            # If no extension, try to guess from content
-            if not ext or ext not in SUPPORTED_IMAGE_FORMATS:
-                # Try to detect from image data using magic bytes
-                print("[SaveImage] 从图片数据检测格式...")
-                detected = _detect_image_format(image_data)
-                if detected:
-                    ext = f".{detected}"
-                    print(f"[SaveImage] 检测到格式: {detected}")
-                else:
-                    ext = ".jpg"  # Default fallback
-                    print("[SaveImage] 使用默认扩展名: .jpg")
 
-        filename = f"image_search_{url_hash}{ext}"
-        print(f"[SaveImage] 最终文件名: {filename}")
+def save_image_to_media(
+    image_data: bytes, url: str, note=None, reservation: Reservation | None = None
+) -> str | None:
+    """
+    Save image to Anki media folder and return filename
 
-        # Write to media folder
-        print("[SaveImage] 写入到媒体文件夹...")
-        mw.col.media.write_data(filename, image_data)
-        print("[SaveImage] 写入成功")
+    Args:
+        image_data: Image bytes
+        url: Original image URL
+        note: Anki note object (optional, for context)
+        reservation: Memory budget reservation for image_data (optional);
+            released once the image is saved or dropped
 
-        return filename
+    Returns:
+        Filename in media folder, or None if failed
+    """
+    save_log.debug("开始保存图片到媒体文件夹")
+    save_log.debug("图片大小: %s 字节", len(image_data))
+    save_log.debug("URL: %s", url[:100])
 
+    try:
+        filename, image_data = prepare_image(image_data, url, reservation)
     except Exception as e:
-        print(f"[SaveImage] 保存异常: {e}")
-        import traceback
-
-        traceback.print_exc()
+        save_log.exception("保存异常: %s", e)
         return None
 
+    return write_prepared_image(filename, image_data, reservation)
+
 
 def insert_image_to_field(editor, field_name: str, filename: str):
     """Insert image into note field"""
-    print("[InsertImage] 开始插入图片到字段")
-    print(f"[InsertImage] 字段名: {field_name}")
-    print(f"[InsertImage] 文件名: {filename}")
+    return insert_images_to_field(editor, field_name, [filename])
 
-    try:
-        note = editor.note
-        if not note:
-            print("[InsertImage] 错误：笔记对象为空")
-            return False
 
-        if field_name not in note:
-            print(f"[InsertImage] 错误：字段 '{field_name}' 不存在于笔记中")
-            print(f"[InsertImage] 可用字段: {list(note.keys())}")
-            return False
+def insert_images_to_field(editor, field_name: str, filenames: list[str]):
+    """Insert images into note field with a single editor update"""
+    with span("insert") as current:
+        insert_log.debug("开始插入图片到字段")
+        insert_log.debug("字段名: %s", field_name)
+        insert_log.debug("文件名: %s", filenames)
 
-        print("[InsertImage] 笔记和字段验证通过")
+        try:
+            note = editor.note
+            if not note:
+                insert_log.warning("错误：笔记对象为空")
+                current.fail()
+                return False
+
+            if field_name not in note:
+                insert_log.warning("错误：字段 '%s' 不存在于笔记中", field_name)
+                insert_log.debug("可用字段: %s", list(note.keys()))
+                current.fail()
+                return False
+
+            insert_log.debug("笔记和字段验证通过")
+
+            # Create image HTML
+            img_html = "<br>".join(f'<img src="{filename}">' for filename in filenames)
+            insert_log.debug("生成的HTML: %s", img_html)
+
+            # Get current field content
+            current_content = note[field_name]
+            insert_log.debug("当前字段内容长度: %s 字符", len(current_content))
+
+            # Append or replace image
+            if current_content.strip():
+                # Append to existing content
+                note[field_name] = f"{current_content}<br>{img_html}"
+                insert_log.debug("图片追加到现有内容")
+            else:
+                # Set as new content
+                note[field_name] = img_html
+                insert_log.debug("图片设置为新内容")
 
-        # Create image HTML
-        img_html = f'<img src="{filename}">'
-        print(f"[InsertImage] 生成的HTML: {img_html}")
+            # Update editor
+            refresh_editor_field(editor, field_name)
 
-        # Get current field content
-        current_content = note[field_name]
-        print(f"[InsertImage] 当前字段内容长度: {len(current_content)} 字符")
+            return True
+
+        except Exception as e:
+            insert_log.exception("插入异常: %s", e)
+            current.fail()
+            return False
 
-        # Append or replace image
-        if current_content.strip():
-            # Append to existing content
-            note[field_name] = f"{current_content}<br>{img_html}"
-            print("[InsertImage] 图片追加到现有内容")
-        else:
-            # Set as new content
-            note[field_name] = img_html
-            print("[InsertImage] 图片设置为新内容")
 
-        # Update editor
-        print("[InsertImage] 更新编辑器...")
-        editor.loadNoteKeepingFocus()
-        print("[InsertImage] 编辑器更新完成")
+# JavaScript setting one field's HTML in the editor webview; the editor then
+# syncs the field back to the note like a normal edit
+UPDATE_FIELD_JS = """
+(function() {
+    try {
+        const noteEditor = require("anki/NoteEditor").instances[0];
+        const field = noteEditor && noteEditor.fields[%d];
+        if (!field) return false;
+        field.editingArea.content.set(%s);
+        return true;
+    } catch (e) {
+        return false;
+    }
+})();
+"""
+
+
+def record_field_update(mode: str, seconds: float):
+    """Record how long an editor update took and log the mode's median"""
+    stage = f"editor_{mode}"
+    metrics = get_metrics()
+    metrics.record(stage, seconds)
+    summary = metrics.stage_summary(stage)
+    insert_log.debug(
+        "编辑器更新 %s: %.0fms, p50 %.0fms (%s 次)",
+        mode,
+        seconds * 1000,
+        summary["wall_p50_ms"],
+        summary["window"],
+    )
+
+
+def refresh_editor_field(editor, field_name: str):
+    """Show the note's current field content in the editor (as configured)"""
+    from .state import get_config
+
+    if get_config().incremental_field_update:
+        update_editor_field(editor, field_name, editor.note[field_name])
+    else:
+        reload_editor_note(editor)
+
+
+def reload_editor_note(editor):
+    """Re-render the whole note in the editor and time it"""
+    from aqt import gui_hooks
+
+    insert_log.debug("更新编辑器 (重新加载笔记)...")
+    start = time.perf_counter()
+
+    def on_loaded(loaded_editor):
+        if loaded_editor is not editor:
+            return
+        gui_hooks.editor_did_load_note.remove(on_loaded)
+        record_field_update("reload", time.perf_counter() - start)
+
+    gui_hooks.editor_did_load_note.append(on_loaded)
+    editor.loadNoteKeepingFocus()
+
+
+def update_editor_field(editor, field_name: str, html: str):
+    """
+    Show new field content in the editor without reloading the whole note
 
-        return True
+    The note itself must already hold html. Falls back to a full reload
+    when the editor's field API is not available.
+    """
+    insert_log.debug("更新编辑器 (仅目标字段)...")
+    start = time.perf_counter()
+    field_index = list(editor.note.keys()).index(field_name)
 
-    except Exception as e:
-        print(f"[InsertImage] 插入异常: {e}")
-        import traceback
+    def on_done(updated):
+        if updated:
+            record_field_update("field", time.perf_counter() - start)
+        else:
+            insert_log.warning("字段更新不可用，回退到重新加载")
+            reload_editor_note(editor)
 
-        traceback.print_exc()
-        return False
+    editor.web.evalWithCallback(
+        UPDATE_FIELD_JS % (field_index, json.dumps(html)), on_done
+    )
@@ -0,0 +1,82 @@
+# log.py - Leveled logging to Anki's console and a rotating file
+
+import logging
+import logging.handlers
+import sys
+
+LOGGER_NAME = "image_search"
+CONSOLE_FORMAT = "[%(tag)s] %(message)s"
+FILE_FORMAT = "%(asctime)s %(levelname)s [%(tag)s] %(message)s"
+
+
+class _TagFilter(logging.Filter):
+    """Expose the last part of the logger name as %(tag)s"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.tag = record.name.rpartition(".")[2]
+        return True
+
+
+def _configure() -> logging.Logger:
+    """Attach the console and file handlers to the add-on's root logger"""
+    # Imported here: the config package itself logs, so importing it may
+    # re-enter this function; the handler check below must come after it
+    from .config.constants import (
+        DEFAULT_LOG_LEVEL,
+        LOG_BACKUP_COUNT,
+        LOG_FILE_PATH,
+        LOG_MAX_BYTES,
+        USER_FILES_DIR,
+    )
+
+    root = logging.getLogger(LOGGER_NAME)
+    if root.handlers:
+        return root
+
+    # Anki's own logging configuration must not duplicate or swallow ours
+    root.propagate = False
+    root.setLevel(DEFAULT_LOG_LEVEL.upper())
+    tag_filter = _TagFilter()
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    console.addFilter(tag_filter)
+    root.addHandler(console)
+
+    try:
+        USER_FILES_DIR.mkdir(parents=True, exist_ok=True)
+        # delay: the file is only opened once something is logged
+        file_handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE_PATH,
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding="utf-8",
+            delay=True,
+        )
+    except OSError as e:
+        root.warning("无法创建日志文件: %s", e)
+    else:
+        file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+        file_handler.addFilter(tag_filter)
+        root.addHandler(file_handler)
+
+    return root
+
+
+def get_logger(tag: str) -> logging.Logger:
+    """
+    Get the logger for one part of the add-on
+
+    Messages use %-style arguments (log.debug("size: %d", n)) so that they
+    are only formatted when the level is enabled.
+
+    Args:
+        tag: Short component name shown in brackets, e.g. "ImageSearch"
+    """
+    _configure()
+    return logging.getLogger(f"{LOGGER_NAME}.{tag}")
+
+
+def set_log_level(level: str):
+    """Set the minimum level for all add-on loggers ("debug", "info", ...)"""
+    _configure().setLevel(str(level).upper())
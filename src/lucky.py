@@ -0,0 +1,200 @@
+# lucky.py - "I'm feeling lucky" one-keystroke image insert
+
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+from aqt.editor import Editor
+from aqt.utils import tooltip
+
+from .activity import run_in_background
+from .config.constants import (
+    LUCKY_CANDIDATES,
+    LUCKY_DEADLINE,
+    LUCKY_LATENCY_TARGET_MS,
+    SUPPORTED_IMAGE_FORMATS,
+)
+from .config.enums import ImageQuality
+from .log import get_logger
+from .memory_budget import Reservation, get_memory_budget
+from .state import get_config
+from .translator import _
+
+log = get_logger("Lucky")
+
+
+def rank_results(
+    results: list[dict[str, Any]], query: str, quality: ImageQuality
+) -> list[dict[str, Any]]:
+    """
+    Order search results by how likely they are to be a good pick
+
+    Google's own ranking is kept as the base score; results with a direct
+    full-resolution URL, a known image extension, or a title matching the
+    query are moved up.
+
+    Args:
+        results: Results from GoogleImageSearch.search
+        query: The search query
+        quality: Configured image quality
+
+    Returns:
+        New list, best candidate first
+    """
+    words = [w for w in query.lower().split() if w]
+
+    def score(item: tuple[int, dict[str, Any]]) -> float:
+        index, result = item
+        value = -float(index)
+
+        has_full = result["url"] != result["thumbnail"]
+        if has_full and quality != ImageQuality.LOW:
+            value += 5
+
+        ext = Path(urlparse(result["url"]).path).suffix.lower()
+        if ext in SUPPORTED_IMAGE_FORMATS:
+            value += 2
+
+        title = (result.get("title") or "").lower()
+        if words and all(w in title for w in words):
+            value += 3
+
+        return value
+
+    ranked = sorted(enumerate(results), key=score, reverse=True)
+    return [result for _index, result in ranked]
+
+
+def _fetch_best_image(
+    query: str, max_results: int, quality: ImageQuality, timings: dict[str, float]
+) -> tuple[bytes, Reservation, str, str | None] | None:
+    """
+    Background task: search, rank and download the first usable image
+
+    A thumbnail warmed by the prefetcher is used for any quality; the
+    full-resolution URL it stands in for is returned so that it can be
+    upgraded in the background after the insert.
+
+    Returns:
+        Tuple of (image bytes, their memory budget reservation, their URL,
+        URL to upgrade to or None)
+    """
+    from .image_search import get_searcher, order_candidates, search_cached
+    from .thumbnail_cache import get_thumbnail_cache
+
+    start = time.perf_counter()
+    deadline = time.monotonic() + LUCKY_DEADLINE
+
+    # The search shares the lucky budget instead of its own SEARCH_DEADLINE
+    results = search_cached(query, max_results, deadline=LUCKY_DEADLINE)
+    timings["search"] = time.perf_counter() - start
+    if not results:
+        return None
+
+    cache = get_thumbnail_cache()
+    searcher = get_searcher()
+    candidates = rank_results(results, query, quality)[:LUCKY_CANDIDATES]
+
+    # Thumbnails warmed by the prefetcher cost nothing
+    for result in candidates:
+        data = cache.get_bytes(result["thumbnail"]) if result["thumbnail"] else None
+        if data:
+            log.debug("使用缓存的缩略图: %s", result["thumbnail"][:100])
+            upgrade_url = None
+            if quality != ImageQuality.LOW and result["url"] != result["thumbnail"]:
+                upgrade_url = result["url"]
+            reservation = get_memory_budget().track(len(data))
+            return data, reservation, result["thumbnail"], upgrade_url
+
+    download_start = time.perf_counter()
+    try:
+        for result in candidates:
+            for url in order_candidates(result["url"], result["thumbnail"], quality):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    log.warning("超出时间预算")
+                    return None
+
+                fetched = searcher.fetch_image(url, deadline=remaining)
+                if fetched:
+                    return *fetched, url, None
+    finally:
+        timings["download"] = time.perf_counter() - download_start
+
+    return None
+
+
+def lucky_insert(editor: Editor, search_query: str, target_field: str):
+    """Search, download and insert the top result without opening the picker"""
+    from .image_search import (
+        insert_image_to_field,
+        prepare_image,
+        write_prepared_image,
+    )
+    from .upgrade import schedule_upgrade
+
+    config = get_config()
+    note = editor.note
+    start = time.perf_counter()
+    timings: dict[str, float] = {}
+
+    tooltip(_("正在搜索图片..."), period=1000)
+
+    def task() -> tuple[tuple[str, bytes, Reservation], str | None] | None:
+        fetched = _fetch_best_image(
+            search_query, config.max_results, config.image_quality, timings
+        )
+        if not fetched:
+            return None
+        image_data, reservation, url, upgrade_url = fetched
+
+        prepare_start = time.perf_counter()
+        filename, data = prepare_image(image_data, url, reservation)
+        timings["prepare"] = time.perf_counter() - prepare_start
+        return (filename, data, reservation), upgrade_url
+
+    def on_done(future):
+        try:
+            prepared, upgrade_url = future.result() or (None, None)
+        except Exception as e:
+            log.warning("异常: %s", e)
+            prepared, upgrade_url = None, None
+
+        # Only write to the media folder once the note is known to still be
+        # current, so switching notes leaves no orphaned file behind
+        if editor.note is not note:
+            log.info("笔记已切换，放弃插入")
+            if prepared:
+                _filename, _data, reservation = prepared
+                reservation.release()
+            return
+
+        filename = None
+        if prepared:
+            save_start = time.perf_counter()
+            filename = write_prepared_image(*prepared)
+            timings["save"] = time.perf_counter() - save_start
+        if not filename:
+            tooltip(_("未找到可用的图片"))
+            return
+
+        insert_start = time.perf_counter()
+        if not insert_image_to_field(editor, target_field, filename):
+            tooltip(_("插入图片失败"))
+            return
+        timings["insert"] = time.perf_counter() - insert_start
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        breakdown = ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in timings.items())
+        log.info("端到端耗时 %.0fms (%s)", elapsed_ms, breakdown)
+        if elapsed_ms > LUCKY_LATENCY_TARGET_MS:
+            log.warning("超出延迟目标 %sms", LUCKY_LATENCY_TARGET_MS)
+
+        tooltip(_("图片已插入到 {} ({} 毫秒)").format(target_field, int(elapsed_ms)))
+
+        # A prefetched thumbnail went in first; swap in the original quietly
+        if upgrade_url:
+            schedule_upgrade(editor, target_field, filename, upgrade_url)
+
+    run_in_background(task, on_done)
@@ -0,0 +1,155 @@
+# memory_budget.py - Global budget for image bytes between download and media write
+
+import threading
+import time
+
+from .config.constants import DOWNLOAD_MEMORY_BUDGET
+from .log import get_logger
+from .retry import CancelToken
+
+log = get_logger("Memory")
+
+# How often a waiting reservation re-checks its cancel token
+WAIT_POLL_INTERVAL = 0.1  # seconds
+
+
+class BudgetTimeout(Exception):
+    """Raised when a reservation could not be made before its timeout"""
+
+
+class Reservation:
+    """Bytes reserved from a MemoryBudget; released when the block exits"""
+
+    def __init__(self, budget: "MemoryBudget", nbytes: int):
+        self._budget = budget
+        self.nbytes = nbytes
+
+    def resize(self, nbytes: int):
+        """Change the reserved size without waiting
+
+        Growing may take the budget past its limit (the bytes already
+        exist); new reservations then wait until enough is released.
+        """
+        self._budget._adjust(nbytes - self.nbytes)
+        self.nbytes = nbytes
+
+    def release(self):
+        if self.nbytes:
+            self._budget._adjust(-self.nbytes)
+            self.nbytes = 0
+
+    def __enter__(self) -> "Reservation":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class MemoryBudget:
+    """Caps image bytes in flight across all threads
+
+    reserve() blocks while the budget is exhausted, which holds back new
+    downloads and conversions until earlier images are written. A reservation
+    is always granted when nothing else is reserved, so a single image
+    larger than the limit still goes through on its own.
+
+    A download hands its reservation on with the bytes (see
+    GoogleImageSearch.fetch_image()), and the media write releases it.
+    Work that already holds a reservation grows it with resize() or
+    track(), never reserve(): waiting for room while holding bytes could
+    block other threads holding theirs. Images the browser picker
+    prepares speculatively are not counted once prepared, since they may
+    wait on the user indefinitely.
+    """
+
+    def __init__(self, limit: int = DOWNLOAD_MEMORY_BUDGET):
+        self.limit = limit
+        self._cond = threading.Condition()
+        self.in_use = 0
+        self.peak = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.spills = 0  # downloads buffered on disk
+
+    def reserve(
+        self,
+        nbytes: int,
+        cancel: CancelToken | None = None,
+        timeout: float | None = None,
+    ) -> Reservation:
+        """
+        Reserve nbytes, waiting for running work to release enough
+
+        Raises:
+            OperationCancelled: The cancel token was set while waiting
+            BudgetTimeout: The budget stayed exhausted for timeout seconds
+        """
+        start = time.monotonic()
+        waited = False
+        with self._cond:
+            while self.in_use and self.in_use + nbytes > self.limit:
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                remaining = WAIT_POLL_INTERVAL
+                if timeout is not None:
+                    remaining = min(remaining, start + timeout - time.monotonic())
+                    if remaining <= 0:
+                        raise BudgetTimeout(f"内存预算已满: {self.in_use} 字节")
+                if not waited:
+                    waited = True
+                    self.waits += 1
+                    log.debug(
+                        "等待内存预算: %s + %s > %s", self.in_use, nbytes, self.limit
+                    )
+                self._cond.wait(remaining)
+            if waited:
+                self.wait_time += time.monotonic() - start
+            self._adjust_locked(nbytes)
+        return Reservation(self, nbytes)
+
+    def track(self, nbytes: int) -> Reservation:
+        """Count bytes that are already in memory, without waiting"""
+        self._adjust(nbytes)
+        return Reservation(self, nbytes)
+
+    def _adjust(self, delta: int):
+        with self._cond:
+            self._adjust_locked(delta)
+
+    def _adjust_locked(self, delta: int):
+        self.in_use += delta
+        if self.in_use > self.peak:
+            self.peak = self.in_use
+        if delta < 0:
+            self._cond.notify_all()
+
+    def record_spill(self):
+        with self._cond:
+            self.spills += 1
+
+    def reset_peak(self):
+        with self._cond:
+            self.peak = self.in_use
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_use": self.in_use,
+                "peak": self.peak,
+                "waits": self.waits,
+                "wait_time": round(self.wait_time, 3),
+                "spills": self.spills,
+            }
+
+
+# Global instance
+_memory_budget = None
+
+
+def get_memory_budget() -> MemoryBudget:
+    """Get or create global MemoryBudget instance"""
+    global _memory_budget
+    if _memory_budget is None:
+        _memory_budget = MemoryBudget()
+    return _memory_budget
@@ -0,0 +1,278 @@
+# metrics.py - Timing spans and rolling per-stage histograms
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from .activity import get_activity
+from .config.constants import (
+    METRICS_FILE_PATH,
+    METRICS_SAVE_DELAY,
+    METRICS_WINDOW,
+    USER_FILES_DIR,
+)
+from .log import get_logger
+
+log = get_logger("Metrics")
+trace_log = get_logger("Trace")
+
+PERCENTILES = (50, 95, 99)
+
+
+class RollingHistogram:
+    """The most recent samples of one measurement, for percentiles"""
+
+    def __init__(self, window: int = METRICS_WINDOW, samples: list[float] = ()):
+        self._samples: deque[float] = deque(samples, maxlen=window)
+
+    def add(self, value: float):
+        self._samples.append(value)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def samples(self) -> list[float]:
+        return list(self._samples)
+
+    def total(self) -> float:
+        """Sum of the samples in the window"""
+        return sum(self._samples)
+
+    def percentile(self, p: float) -> float | None:
+        """Nearest-rank percentile of the window, or None if it is empty"""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+
+class StageMetrics:
+    """Wall and CPU time histograms of one stage, plus lifetime counters"""
+
+    def __init__(self, window: int = METRICS_WINDOW, data: dict | None = None):
+        data = data or {}
+        self.wall = RollingHistogram(window, data.get("wall", []))
+        self.cpu = RollingHistogram(window, data.get("cpu", []))
+        self.count = data.get("count", 0)
+        self.errors = data.get("errors", 0)
+
+    def record(self, wall: float, cpu: float | None, ok: bool):
+        self.wall.add(wall)
+        if cpu is not None:
+            self.cpu.add(cpu)
+        self.count += 1
+        if not ok:
+            self.errors += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "wall": self.wall.samples(),
+            "cpu": self.cpu.samples(),
+        }
+
+    def summary(self) -> dict[str, Any]:
+        """Counters, p50/p95/p99 and window totals in milliseconds"""
+        result: dict[str, Any] = {
+            "count": self.count,
+            "errors": self.errors,
+            "window": len(self.wall),
+        }
+        for label, histogram in (("wall", self.wall), ("cpu", self.cpu)):
+            for p in PERCENTILES:
+                value = histogram.percentile(p)
+                result[f"{label}_p{p}_ms"] = (
+                    None if value is None else round(value * 1000, 2)
+                )
+            result[f"{label}_total_ms"] = round(histogram.total() * 1000, 2)
+        return result
+
+
+class MetricsStore:
+    """Thread-safe per-stage timings, persisted to user_files
+
+    Stages are recorded from any thread. Changes are written to disk
+    METRICS_SAVE_DELAY seconds after the first unsaved record (and on
+    flush()), so a burst of spans causes a single write.
+    """
+
+    def __init__(self, path: Path = METRICS_FILE_PATH, window: int = METRICS_WINDOW):
+        self.path = path
+        self.window = window
+        self._stages: dict[str, StageMetrics] = {}
+        self._lock = threading.Lock()
+        # Serializes file writes between the timer thread and flush()
+        self._write_lock = threading.Lock()
+        self._save_timer: threading.Timer | None = None
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            for stage, stage_data in data.get("stages", {}).items():
+                self._stages[stage] = StageMetrics(self.window, stage_data)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            log.warning("读取统计失败，重新开始: %s", e)
+            self._stages.clear()
+
+    def record(self, stage: str, wall: float, cpu: float | None = None, ok=True):
+        """Record one run of stage (durations in seconds)"""
+        with self._lock:
+            metrics = self._stages.get(stage)
+            if metrics is None:
+                metrics = self._stages[stage] = StageMetrics(self.window)
+            metrics.record(wall, cpu, ok)
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(METRICS_SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """p50/p95/p99 and counters for every stage"""
+        with self._lock:
+            return {
+                stage: metrics.summary()
+                for stage, metrics in sorted(self._stages.items())
+            }
+
+    def stage_summary(self, stage: str) -> dict[str, Any] | None:
+        """p50/p95/p99 and counters for one stage, or None if never recorded"""
+        with self._lock:
+            metrics = self._stages.get(stage)
+            return None if metrics is None else metrics.summary()
+
+    def export_json(self, path: Path):
+        """Write the per-stage summary to path as JSON"""
+        report = {"exported_at": time.time(), "stages": self.summary()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    def flush(self):
+        """Write pending changes to disk now"""
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                data = {
+                    "stages": {
+                        stage: metrics.to_dict()
+                        for stage, metrics in self._stages.items()
+                    }
+                }
+                self._dirty = False
+
+            USER_FILES_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".json.tmp")
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                log.warning("保存统计失败: %s", e)
+
+    def clear(self):
+        """Forget all recorded timings"""
+        with self._lock:
+            self._stages.clear()
+            self._dirty = True
+        self.flush()
+
+
+# Global instance
+_metrics = None
+
+
+def get_metrics() -> MetricsStore:
+    """Get or create global MetricsStore instance"""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsStore()
+    return _metrics
+
+
+class Span:
+    """Handle of a running span; call fail() if the stage did not succeed"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.ok = True
+        self.nbytes = 0  # payload size, for throughput in the status bar
+
+    def fail(self):
+        self.ok = False
+
+
+def children_cpu_time() -> float:
+    """
+    CPU seconds used by finished child processes (e.g. ffmpeg)
+
+    Always 0 where the resource module is missing (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+@contextlib.contextmanager
+def span(stage: str, children: bool = False) -> Iterator[Span]:
+    """
+    Time the enclosed block as one run of stage
+
+    Records wall time and the CPU time of the current thread. With
+    children=True the CPU time of child processes that exit during the
+    block is added; it is process-wide, so overlapping blocks may count
+    each other's children. A block that raises is recorded as an error
+    and the exception propagates. While the block runs the stage counts
+    as in flight in get_activity().
+    """
+    current = Span(stage)
+    activity = get_activity()
+    activity.stage_started(stage)
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    if children:
+        cpu_start -= children_cpu_time()
+    try:
+        yield current
+    except BaseException:
+        current.fail()
+        raise
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        if children:
+            cpu += children_cpu_time()
+        get_metrics().record(stage, wall, cpu, current.ok)
+        activity.stage_finished(stage, current.ok, current.nbytes)
+        trace_log.debug(
+            "%s: %.0fms (CPU %.0fms)%s",
+            stage,
+            wall * 1000,
+            cpu * 1000,
+            "" if current.ok else " 失败",
+        )
+
+
+def flush_metrics():
+    """Persist recorded timings, if the store was ever used"""
+    if _metrics is not None:
+        _metrics.flush()
@@ -0,0 +1,153 @@
+# prefetch.py - Speculative search prefetching when a note is loaded
+
+from aqt import mw
+from aqt.editor import Editor
+from aqt.qt import QTimer
+
+from .activity import THUMBNAIL_DOWNLOAD_STAGE, run_in_background
+from .config.constants import PREFETCH_DELAY_MS
+from .log import get_logger
+from .retry import CancelToken
+from .state import get_config, get_fields_for_note_type
+
+log = get_logger("Prefetch")
+
+
+class SearchPrefetcher:
+    """Runs the search for the current note in the background
+
+    Prefetches are throttled with a single-shot timer so that quickly
+    stepping through notes does not fire a request per note, and every
+    new note cancels the job started for the previous one.
+    """
+
+    def __init__(self):
+        self._timer: QTimer | None = None
+        self._pending_query: str | None = None
+        self._cancel_token: CancelToken | None = None
+        self._active_query: str | None = None
+
+    def on_note_loaded(self, editor: Editor):
+        """Schedule a prefetch for the note shown in the editor"""
+        config = get_config()
+        if not config.enabled or not config.prefetch_enabled:
+            return
+
+        query = self._query_for_note(editor)
+        if query and query in (self._pending_query, self._active_query):
+            # Same note reloaded (e.g. after an insert); keep the running job
+            return
+
+        self.cancel()
+        if not query:
+            return
+
+        from .search_cache import get_search_cache
+
+        if get_search_cache().has_results(query):
+            return
+
+        self._pending_query = query
+        if self._timer is None:
+            self._timer = QTimer(mw)
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(self._start_pending)
+        self._timer.start(PREFETCH_DELAY_MS)
+
+    def cancel(self):
+        """Stop the pending timer and abandon any running prefetch"""
+        if self._timer is not None:
+            self._timer.stop()
+        self._pending_query = None
+        self._active_query = None
+        if self._cancel_token is not None:
+            self._cancel_token.cancel()
+            self._cancel_token = None
+
+    def _query_for_note(self, editor: Editor) -> str:
+        """Return the cleaned search query for the editor's note"""
+        note = editor.note
+        if not note or not mw.col:
+            return ""
+
+        search_field, _target_field = get_fields_for_note_type(note.note_type())
+        if search_field not in note:
+            return ""
+
+        return mw.col.media.strip(note[search_field]).strip()
+
+    def _start_pending(self):
+        query = self._pending_query
+        self._pending_query = None
+        if not query:
+            return
+
+        cancel_token = CancelToken()
+        self._cancel_token = cancel_token
+        self._active_query = query
+        thumbnail_count = get_config().prefetch_thumbnails
+        max_results = get_config().max_results
+
+        log.debug("开始预取: %s", query)
+        run_in_background(
+            lambda: _prefetch(query, max_results, thumbnail_count, cancel_token),
+            on_done=lambda _future: self._on_done(cancel_token),
+        )
+
+    def _on_done(self, cancel_token: CancelToken):
+        if self._cancel_token is cancel_token:
+            self._cancel_token = None
+            self._active_query = None
+
+
+def _prefetch(
+    query: str, max_results: int, thumbnail_count: int, cancel_token: CancelToken
+):
+    """Background task: search and warm the first few thumbnails
+
+    The token stops the search retries and any thumbnail download in
+    progress as soon as the user moves to another note.
+    """
+    from .image_search import get_searcher, search_cached
+    from .thumbnail_cache import get_thumbnail_cache
+
+    results = search_cached(query, max_results, cancel_token)
+    if cancel_token.cancelled:
+        log.debug("已取消: %s", query)
+        return
+
+    cache = get_thumbnail_cache()
+    searcher = get_searcher()
+    warmed = 0
+    for result in results[:thumbnail_count]:
+        if cancel_token.cancelled:
+            log.debug("已取消: %s", query)
+            return
+        thumbnail_url = result["thumbnail"]
+        if cache.get_bytes(thumbnail_url) is not None:
+            continue
+        data = searcher.download_image(
+            thumbnail_url, cancel=cancel_token, stage=THUMBNAIL_DOWNLOAD_STAGE
+        )
+        if data:
+            cache.put_bytes(thumbnail_url, data)
+            warmed += 1
+
+    log.debug("预取完成: %s, %s 个结果, %s 张缩略图", query, len(results), warmed)
+
+
+# Global instance
+_prefetcher = None
+
+
+def get_prefetcher() -> SearchPrefetcher:
+    """Get or create global SearchPrefetcher instance"""
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = SearchPrefetcher()
+    return _prefetcher
+
+
+def on_editor_did_load_note(editor: Editor):
+    """editor_did_load_note hook"""
+    get_prefetcher().on_note_loaded(editor)
@@ -0,0 +1,223 @@
+# retry.py - Deadline-aware Retry Policy
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from .config.constants import (
+    REQUEST_TIMEOUT,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY,
+    RETRYABLE_STATUS_CODES,
+)
+
+# Attempts are not started when less than this much budget is left
+MIN_ATTEMPT_TIME = 0.5  # seconds
+
+
+class NonRetryableError(Exception):
+    """Raised by an operation to stop retrying immediately"""
+
+
+class OperationCancelled(NonRetryableError):
+    """Raised when the caller cancelled the operation"""
+
+
+class CancelToken:
+    """Flag shared with background work that should stop early"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelled("已取消")
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to seconds; returns True if cancelled meanwhile"""
+        return self._event.wait(seconds)
+
+
+@dataclass
+class RetryPolicy:
+    """Retry settings for a single operation"""
+
+    deadline: float
+    max_attempts: int = RETRY_MAX_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+    attempt_timeout: float = REQUEST_TIMEOUT
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before the next attempt"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+@dataclass
+class AttemptRecord:
+    """Timing and outcome of a single attempt"""
+
+    attempt: int
+    duration: float
+    error: str | None = None
+    retryable: bool = False
+
+
+@dataclass
+class RetryReport:
+    """Summary of all attempts made for one operation"""
+
+    label: str
+    attempts: list[AttemptRecord] = field(default_factory=list)
+    elapsed: float = 0.0
+    succeeded: bool = False
+    error: Exception | None = None
+
+    def summary(self) -> str:
+        """One-line description suitable for logs"""
+        parts = [
+            f"#{a.attempt} {a.duration * 1000:.0f}ms"
+            + (f" ({a.error})" if a.error else "")
+            for a in self.attempts
+        ]
+        status = "ok" if self.succeeded else "failed"
+        return (
+            f"{self.label}: {status} after {len(self.attempts)} attempt(s), "
+            f"{self.elapsed * 1000:.0f}ms total [{'; '.join(parts)}]"
+        )
+
+
+def _status_code(error: Exception) -> int | None:
+    """Extract an HTTP status code from a requests exception, if any"""
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Parse a Retry-After header given in seconds"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _describe(error: Exception) -> str:
+    """Short error description for attempt records"""
+    status = _status_code(error)
+    if status is not None:
+        return f"HTTP {status}"
+    if isinstance(error, NonRetryableError):
+        return str(error)[:100]
+    return type(error).__name__
+
+
+def is_retryable(error: Exception) -> bool:
+    """Decide whether an error is transient and worth another attempt"""
+    if isinstance(error, NonRetryableError):
+        return False
+
+    try:
+        import requests
+    except ImportError:
+        return False
+
+    if isinstance(error, requests.HTTPError):
+        return _status_code(error) in RETRYABLE_STATUS_CODES
+
+    return isinstance(
+        error,
+        (
+            requests.ConnectionError,
+            requests.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ),
+    )
+
+
+def run_with_retry(
+    operation: Callable[[float], Any],
+    policy: RetryPolicy,
+    label: str,
+    cancel: CancelToken | None = None,
+) -> tuple[Any, RetryReport]:
+    """
+    Run operation until it succeeds, fails permanently or the deadline expires
+
+    Args:
+        operation: Callable receiving the timeout for the current attempt
+        policy: Retry policy with the total deadline budget
+        label: Name used in the report
+        cancel: Optional token; no further attempts start once it is set
+
+    Returns:
+        Tuple of (result, report); result is None if every attempt failed
+    """
+    report = RetryReport(label=label)
+    start = time.monotonic()
+    deadline = start + policy.deadline
+
+    attempt = 0
+    while attempt < policy.max_attempts:
+        attempt += 1
+        if cancel is not None and cancel.cancelled:
+            report.error = OperationCancelled("已取消")
+            break
+        remaining = deadline - time.monotonic()
+        timeout = min(policy.attempt_timeout, remaining)
+
+        attempt_start = time.monotonic()
+        try:
+            result = operation(timeout)
+        except Exception as e:
+            retryable = is_retryable(e)
+            report.attempts.append(
+                AttemptRecord(
+                    attempt=attempt,
+                    duration=time.monotonic() - attempt_start,
+                    error=_describe(e),
+                    retryable=retryable,
+                )
+            )
+            report.error = e
+            if not retryable or attempt >= policy.max_attempts:
+                break
+
+            delay = policy.backoff(attempt)
+            retry_after = _retry_after(e)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+
+            # Give up if sleeping would leave no room for a useful attempt
+            if time.monotonic() + delay + MIN_ATTEMPT_TIME > deadline:
+                break
+
+            if cancel is not None:
+                cancel.wait(delay)
+            else:
+                time.sleep(delay)
+            continue
+
+        report.attempts.append(
+            AttemptRecord(attempt=attempt, duration=time.monotonic() - attempt_start)
+        )
+        report.succeeded = True
+        report.error = None
+        report.elapsed = time.monotonic() - start
+        return result, report
+
+    report.elapsed = time.monotonic() - start
+    return None, report
@@ -0,0 +1,92 @@
+# search_cache.py - In-memory cache for search results
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from .config.constants import SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL
+
+
+class SearchCache:
+    """Thread-safe LRU cache of search results"""
+
+    def __init__(
+        self,
+        max_queries: int = SEARCH_CACHE_SIZE,
+        ttl: float = SEARCH_CACHE_TTL,
+    ):
+        self.max_queries = max_queries
+        self.ttl = ttl
+        self._results: OrderedDict[str, tuple[float, list[dict[str, Any]]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return " ".join(query.split()).lower()
+
+    def get_results(self, query: str) -> list[dict[str, Any]] | None:
+        """Return cached results for query, or None if missing or expired"""
+        key = self._key(query)
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, results = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._results[key]
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def has_results(self, query: str) -> bool:
+        """Whether fresh results for query are cached (not counted as a lookup)"""
+        with self._lock:
+            entry = self._results.get(self._key(query))
+            return entry is not None and time.monotonic() - entry[0] <= self.ttl
+
+    def put_results(self, query: str, results: list[dict[str, Any]]):
+        """Store results for query, evicting the least recently used entry"""
+        if not results:
+            return
+        key = self._key(query)
+        with self._lock:
+            self._results[key] = (time.monotonic(), results)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_queries:
+                self._results.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        """Entry count and hit ratio"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._results),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._results.clear()
+
+
+# Global instance
+_search_cache = None
+
+
+def get_search_cache() -> SearchCache:
+    """Get or create global SearchCache instance"""
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchCache()
+    return _search_cache
@@ -2,8 +2,15 @@
 
 from __future__ import annotations
 
+import threading
+import time
 from dataclasses import replace
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+
+from .config.constants import CONFIG_FILE_PATH, CONFIG_RELOAD_CHECK_INTERVAL
+from .log import get_logger
+
+log = get_logger("State")
 
 if TYPE_CHECKING:
     from .config.types import AppConfig
@@ -12,18 +19,94 @@ if TYPE_CHECKING:
 _app_state: AppState | None = None
 
 
+def _config_mtime() -> int | None:
+    """Modification time of the config file, or None if it is missing"""
+    try:
+        return CONFIG_FILE_PATH.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
 class AppState:
-    """Singleton class to manage application state"""
+    """Singleton class to manage application state
+
+    Holds the configuration loaded once from disk, reloads it when the
+    file's mtime changes (checked at most every CONFIG_RELOAD_CHECK_INTERVAL
+    seconds), and keeps an index from note type id/name to fields.
+    """
+
+    def __init__(self, config: AppConfig, mtime: int | None = None):
+        self._lock = threading.Lock()
+        self._apply(config, mtime)
+
+    def _apply(self, config: AppConfig, mtime: int | None):
+        from .log import set_log_level
 
-    def __init__(self, config: AppConfig):
+        set_log_level(config.log_level)
         self.config = config
+        self.config_mtime = mtime
+        self.field_index = config.build_field_index()
+        self._checked_at = time.monotonic()
 
     def update_and_save_config(self, new_config: AppConfig):
         """Update configuration and save to file"""
-        self.config = new_config
         from .config.config import save_config
 
-        save_config(new_config)
+        with self._lock:
+            save_config(new_config)
+            self._apply(new_config, self.config_mtime)
+
+    def reload_if_changed(self):
+        """Reload the config if the file was changed outside the add-on
+
+        Only runs on the main thread: a reload changes the log level and
+        may reload the translator. Worker threads keep reading the current
+        config until the main thread picks up the change. A file that
+        does not parse is skipped and the current config kept.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        if time.monotonic() - self._checked_at < CONFIG_RELOAD_CHECK_INTERVAL:
+            return
+
+        from .config.config import get_config_writer, read_config_file
+
+        writer = get_config_writer()
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if writer.pending:
+                return  # our own change has not been written yet
+            mtime = _config_mtime()
+            if mtime is None or mtime == self.config_mtime:
+                return
+            if mtime == writer.last_written_mtime:
+                self.config_mtime = mtime  # written by us
+                return
+
+            log.info("配置文件已更改，重新加载")
+            try:
+                config = read_config_file()
+            except (OSError, ValueError) as e:
+                # Possibly caught mid-write; only the initial load falls back
+                # to defaults, which would then be saved over the user's file
+                log.warning("配置文件无法解析，保留当前配置: %s", e)
+                self.config_mtime = mtime
+                return
+            old_language = self.config.language
+            self._apply(config, mtime)
+
+        if self.config.language != old_language:
+            from .translator import reload_translator
+
+            reload_translator()
+
+    def fields_for_note_type(
+        self, note_type_id: int | None, note_type_name: str
+    ) -> tuple[str, str]:
+        """Search and target fields for a note type, via the cached index"""
+        return self.config.fields_from_index(
+            self.field_index, note_type_name, note_type_id
+        )
 
 
 def get_app_state() -> AppState:
@@ -33,13 +116,32 @@ def get_app_state() -> AppState:
         from .config.config import load_config
 
         config = load_config()
-        _app_state = AppState(config)
+        _app_state = AppState(config, _config_mtime())
     return _app_state
 
 
 def get_config() -> AppConfig:
     """Get current configuration"""
-    return get_app_state().config
+    app_state = get_app_state()
+    app_state.reload_if_changed()
+    return app_state.config
+
+
+def get_fields_for_note_type(note_type: dict[str, Any] | None) -> tuple[str, str]:
+    """
+    Get search and target fields for a note type
+
+    Args:
+        note_type: Note type dict (e.g. note.note_type()), or None
+
+    Returns:
+        Tuple of (search_field, target_field)
+    """
+    app_state = get_app_state()
+    app_state.reload_if_changed()
+    if not note_type:
+        return app_state.fields_for_note_type(None, "")
+    return app_state.fields_for_note_type(note_type.get("id"), note_type["name"])
 
 
 def update_config_value(key: str, value):
@@ -0,0 +1,217 @@
+# thumbnail_cache.py - Two-tier (memory + disk) thumbnail cache
+
+import contextlib
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from .config.constants import (
+    THUMBNAIL_CACHE_DIR,
+    THUMBNAIL_DISK_BUDGET,
+    THUMBNAIL_MEMORY_BUDGET,
+)
+from .log import get_logger
+
+log = get_logger("ThumbnailCache")
+
+
+class ThumbnailCache:
+    """Thumbnail cache keyed by thumbnail URL and target size
+
+    The memory tier holds decoded, scaled images (e.g. QPixmap) keyed by
+    (url, width, height) within a byte budget, evicting least recently
+    used entries. The disk tier holds the compressed thumbnail bytes keyed
+    by URL, so any target size can be decoded from it without a network
+    round-trip.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = THUMBNAIL_CACHE_DIR,
+        memory_budget: int = THUMBNAIL_MEMORY_BUDGET,
+        disk_budget: int = THUMBNAIL_DISK_BUDGET,
+    ):
+        self.cache_dir = cache_dir
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+
+        self._memory: OrderedDict[tuple[str, int, int], tuple[Any, int]] = (
+            OrderedDict()
+        )
+        self._memory_bytes = 0
+        self._disk_bytes: int | None = None  # computed on first disk access
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.memory_misses = 0
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+    # Memory tier
+
+    def get_image(self, url: str, width: int, height: int) -> Any | None:
+        """Return a decoded image for url at the given size, if cached"""
+        key = (url, width, height)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                self.memory_misses += 1
+                return None
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return entry[0]
+
+    def put_image(self, url: str, width: int, height: int, image: Any, cost: int):
+        """Store a decoded image costing `cost` bytes in the memory tier"""
+        if cost > self.memory_budget:
+            return
+
+        key = (url, width, height)
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= old[1]
+
+            self._memory[key] = (image, cost)
+            self._memory_bytes += cost
+
+            while self._memory_bytes > self.memory_budget:
+                _key, (_image, evicted_cost) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_cost
+                self.memory_evictions += 1
+
+    # Disk tier
+
+    def _path_for(self, url: str) -> Path:
+        digest = hashlib.sha1(url.encode()).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.bin"
+
+    def get_bytes(self, url: str) -> bytes | None:
+        """Return compressed thumbnail bytes for url from disk"""
+        path = self._path_for(url)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            with self._lock:
+                self.disk_misses += 1
+            return None
+
+        # Touch for LRU eviction by modification time
+        with contextlib.suppress(OSError):
+            os.utime(path)
+
+        with self._lock:
+            self.disk_hits += 1
+        return data
+
+    def put_bytes(self, url: str, data: bytes):
+        """Store compressed thumbnail bytes for url on disk"""
+        if not data or len(data) > self.disk_budget:
+            return
+
+        path = self._path_for(url)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            existed = path.stat().st_size if path.exists() else 0
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log.warning("写入失败: %s", e)
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_usage()
+            else:
+                self._disk_bytes += len(data) - existed
+            over_budget = self._disk_bytes > self.disk_budget
+
+        if over_budget:
+            self._evict_disk()
+
+    def _scan_disk_usage(self) -> int:
+        total = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*/*.bin"):
+                with contextlib.suppress(OSError):
+                    total += path.stat().st_size
+        return total
+
+    def _evict_disk(self):
+        """Remove least recently used files until below 90% of the budget"""
+        entries = []
+        for path in self.cache_dir.glob("*/*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _mtime, size, _path in entries)
+        target = int(self.disk_budget * 0.9)
+        evicted = 0
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self._disk_bytes = total
+            self.disk_evictions += evicted
+
+    # Stats
+
+    def stats(self) -> dict[str, Any]:
+        """Hit ratios and memory use of both tiers"""
+        with self._lock:
+            memory_lookups = self.memory_hits + self.memory_misses
+            disk_lookups = self.disk_hits + self.disk_misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_budget": self.memory_budget,
+                "memory_hits": self.memory_hits,
+                "memory_misses": self.memory_misses,
+                "memory_hit_ratio": (
+                    self.memory_hits / memory_lookups if memory_lookups else 0.0
+                ),
+                "memory_evictions": self.memory_evictions,
+                "disk_bytes": self._disk_bytes,
+                "disk_budget": self.disk_budget,
+                "disk_hits": self.disk_hits,
+                "disk_misses": self.disk_misses,
+                "disk_hit_ratio": (
+                    self.disk_hits / disk_lookups if disk_lookups else 0.0
+                ),
+                "disk_evictions": self.disk_evictions,
+            }
+
+    def clear_memory(self):
+        """Drop all decoded images (disk tier is kept)"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+
+# Global instance
+_thumbnail_cache = None
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Get or create global ThumbnailCache instance"""
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        _thumbnail_cache = ThumbnailCache()
+    return _thumbnail_cache
@@ -20,9 +20,9 @@ def get_translator():
 
 def setup_translator():
     """Setup gettext translator based on config"""
-    from .config.config import load_config
+    from .state import get_config
 
-    config = load_config()
+    config = get_config()
     lang_code = config.language
 
     # Auto-detect language if set to AUTO
@@ -1,18 +1,58 @@
 # ui/browser_picker.py - Browser-based Image Picker Dialog
 
+import json
+import time
+
+from aqt import mw
 from aqt.qt import (
     QDialog,
     QHBoxLayout,
+    QLabel,
+    QProgressBar,
     QPushButton,
-    QVBoxLayout,
-    QWebEngineView,
     Qt,
+    QTimer,
+    QUrl,
+    QVBoxLayout,
+    QWebEnginePage,
+    QWebEngineProfile,
 )
 from aqt.utils import showWarning, tooltip
 
-from ..config.constants import GOOGLE_IMAGE_SEARCH_URL
-from ..image_search import insert_image_to_field, save_image_to_media
+from ..activity import run_in_background
+from ..config.constants import (
+    EXTRACT_BYTES_TIMEOUT_MS,
+    GOOGLE_IMAGE_SEARCH_URL,
+    PAGE_CAPTURE_DELAY_MS,
+    PAGE_REFRESH_AGE,
+)
+from ..image_search import (
+    decode_data_uri,
+    insert_images_to_field,
+    order_candidates,
+    write_prepared_image,
+)
+from ..log import get_logger
+from ..retry import CancelToken
+from ..state import get_config
 from ..translator import _
+from ..upgrade import schedule_upgrade
+from .page_cache import CAPTURE_PAGE_JS, get_page_cache
+from .picker_page import BRIDGE_PREFIX, EXTRACT_BYTES_JS
+from .speculative import (
+    STAGE_CONVERT,
+    STAGE_FAILED,
+    STAGE_FETCH,
+    STAGE_READY,
+    SpeculativeImage,
+)
+from .web_pool import FIRST_PAINT_JS, create_picker_view, get_web_view_pool
+
+log = get_logger("BrowserPicker")
+
+# Insert stages after all selected images are prepared
+STAGE_WRITE = "write"
+STAGE_INSERT = "insert"
 
 
 class BrowserImagePickerDialog(QDialog):
@@ -20,18 +60,32 @@ class BrowserImagePickerDialog(QDialog):
 
     def __init__(self, editor, search_query: str, target_field: str):
         super().__init__()
-        print("[BrowserPicker] 初始化对话框")
-        print(f"[BrowserPicker] 搜索词: {search_query}")
-        print(f"[BrowserPicker] 目标字段: {target_field}")
+        log.debug("初始化对话框")
+        log.debug("搜索词: %s", search_query)
+        log.debug("目标字段: %s", target_field)
 
         self.editor = editor
         self.search_query = search_query
         self.target_field = target_field
-        self.selected_image_url = None
+        # Selected images in pick order: url, alt, thumbnail, full, width, height
+        self.selection: list[dict] = []
+        # Background preparation per selected image, keyed by page URL
+        self.speculations: dict[str, SpeculativeImage] = {}
+        self.insert_batch: list[SpeculativeImage] | None = None
+        self.inserting = False
+        # Set once the insert batch's media write has started
+        self.insert_writing = False
+        self.extract_request_id = 0
+        # request id -> (url, callback, cancel token)
+        self.pending_extracts: dict[int, tuple] = {}
+        self.opened_at = time.perf_counter()
+        self.first_paint_recorded = False
+        self.replayed = False
+        self.browser_released = False
         self.init_ui()
 
     def init_ui(self):
-        print("[BrowserPicker] 开始初始化UI")
+        log.debug("开始初始化UI")
         self.setWindowTitle(_("搜索图片 - {}").format(self.search_query))
         self.resize(1000, 700)
 
@@ -41,16 +95,31 @@ class BrowserImagePickerDialog(QDialog):
         layout.setSpacing(0)  # spacing between widgets
 
         # Instructions label
-        from aqt.qt import QLabel
-
         instructions = QLabel(_("在下方浏览器中浏览图片，右键点击图片选择「插入图片」"))
         # Make label more compact - remove background to adapt to system theme
         instructions.setStyleSheet("QLabel { padding: 5px 8px; font-size: 11px; }")
         layout.addWidget(instructions)
 
         # Browser view
-        print("[BrowserPicker] 创建QWebEngineView")
-        self.browser = QWebEngineView()
+        if get_config().reuse_browser_view:
+            self.browser, self.browser_warm = get_web_view_pool().acquire()
+            log.debug("使用视图池 (预热: %s)", self.browser_warm)
+        else:
+            log.debug("创建QWebEngineView")
+            self.browser = create_picker_view(QWebEngineProfile.defaultProfile())
+            self.browser_warm = False
+
+        # Drop fonts, pings, trackers etc. that the picker does not need
+        config = get_config()
+        if config.block_resources:
+            from .request_filter import get_resource_blocker
+
+            self.resource_blocker = get_resource_blocker(config)
+            self.resource_blocker.reset_stats()
+            self.browser.page().setUrlRequestInterceptor(self.resource_blocker)
+        else:
+            self.resource_blocker = None
+            self.browser.page().setUrlRequestInterceptor(None)
 
         # Build Google Images URL
         import urllib.parse
@@ -60,12 +129,24 @@ class BrowserImagePickerDialog(QDialog):
             "udm": "2",  # Image search mode
         }
         url = f"{GOOGLE_IMAGE_SEARCH_URL}?{urllib.parse.urlencode(params)}"
-        print(f"[BrowserPicker] Google Images URL: {url}")
-
-        from aqt.qt import QUrl
-
-        self.browser.setUrl(QUrl(url))
-        print("[BrowserPicker] 已设置浏览器URL")
+        log.debug("Google Images URL: %s", url)
+
+        self.search_url = url
+        self.navigation_started_at = time.perf_counter() - self.opened_at
+        cached = None
+        if config.replay_cached_pages:
+            cached = get_page_cache().get_page(self.search_query)
+        if cached:
+            html, age = cached
+            log.debug("使用缓存的结果页 (%s KB, %.0fs 前)", len(html) // 1024, age)
+            self.replayed = True
+            self.browser.setHtml(html, QUrl(url))
+            if age > PAGE_REFRESH_AGE:
+                QTimer.singleShot(0, self.refresh_cached_page)
+        else:
+            self.replayed = False
+            self.browser.setUrl(QUrl(url))
+        log.debug("已设置浏览器URL")
 
         # Enable custom context menu
         self.setup_context_menu()
@@ -76,13 +157,32 @@ class BrowserImagePickerDialog(QDialog):
         # Bottom buttons
         button_layout = QHBoxLayout()
 
+        # Insert progress, shown while a confirmed insert is in flight
+        self.progress_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setMaximumWidth(160)
+        self.cancel_insert_button = QPushButton(_("取消插入"))
+        self.cancel_insert_button.clicked.connect(self.on_cancel_insert_clicked)
+        button_layout.addWidget(self.progress_label)
+        button_layout.addWidget(self.progress_bar)
+        button_layout.addWidget(self.cancel_insert_button)
+        for widget in (
+            self.progress_label,
+            self.progress_bar,
+            self.cancel_insert_button,
+        ):
+            widget.hide()
+
         self.insert_button = QPushButton(_("插入选中的图片"))
         self.insert_button.clicked.connect(self.on_insert_clicked)
         self.insert_button.setEnabled(False)
-        self.insert_button.setToolTip(_("右键点击图片后，点击此按钮插入"))
+        self.insert_button.setToolTip(
+            _("点击或右键点击图片后插入；按住 Ctrl 点击可选择多张")
+        )
 
         refresh_button = QPushButton(_("刷新"))
-        refresh_button.clicked.connect(lambda: self.browser.reload())
+        refresh_button.clicked.connect(self.on_refresh_clicked)
 
         close_button = QPushButton(_("关闭"))
         close_button.clicked.connect(self.reject)
@@ -97,42 +197,154 @@ class BrowserImagePickerDialog(QDialog):
 
     def setup_context_menu(self):
         """Setup JavaScript to handle image clicks"""
-        print("[BrowserPicker] 设置上下文菜单")
+        log.debug("设置上下文菜单")
 
         # Disable default context menu and use custom one
         self.browser.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.browser.customContextMenuRequested.connect(
             self.on_custom_context_menu_requested
         )
-        print("[BrowserPicker] 已禁用默认右键菜单，启用自定义菜单")
+        log.debug("已禁用默认右键菜单，启用自定义菜单")
 
         # Connect multiple signals to debug page loading
         self.browser.loadStarted.connect(self.on_load_started)
         self.browser.loadProgress.connect(self.on_load_progress)
         self.browser.loadFinished.connect(self.inject_javascript)
+        self.browser.loadFinished.connect(self.measure_first_paint)
+        self.browser.loadFinished.connect(self.schedule_page_capture)
+        self.browser.page().bridge_message.connect(self.on_bridge_message)
 
-        print("[BrowserPicker] 已连接页面加载信号")
+        log.debug("已连接页面加载信号")
 
     def on_load_started(self):
         """Called when page starts loading"""
-        print("[BrowserPicker] ⏳ 页面开始加载")
+        log.debug("⏳ 页面开始加载")
 
     def on_load_progress(self, progress):
         """Called during page loading"""
-        print(f"[BrowserPicker] ⏳ 页面加载进度: {progress}%")
+        log.debug("⏳ 页面加载进度: %s%%", progress)
+
+    def measure_first_paint(self, success):
+        """Record time from dialog open to first contentful paint"""
+        if not success or self.first_paint_recorded:
+            return
+        self.first_paint_recorded = True
+        load_time = time.perf_counter() - self.opened_at
+
+        def on_result(paint_ms):
+            # The page's paint time is relative to its own navigation start;
+            # without it fall back to the time at which loading finished
+            if paint_ms is None:
+                seconds = load_time
+            else:
+                seconds = min(load_time, self.navigation_started_at + paint_ms / 1000)
+            log.debug("首次绘制: %.0fms (预热: %s)", seconds * 1000, self.browser_warm)
+            get_web_view_pool().record_paint(self.browser_warm, seconds)
+
+        self.browser.page().runJavaScript(FIRST_PAINT_JS, on_result)
+
+    def on_refresh_clicked(self):
+        """Reload the page; a replayed page is replaced by the live one"""
+        if self.replayed:
+            log.debug("从缓存页切换到实时页面")
+            self.replayed = False
+            self.browser.setUrl(QUrl(self.search_url))
+        else:
+            self.browser.reload()
+
+    def schedule_page_capture(self, success):
+        """Snapshot the live results page for replay once it has rendered"""
+        if success and not self.replayed and get_config().replay_cached_pages:
+            QTimer.singleShot(
+                PAGE_CAPTURE_DELAY_MS, lambda: self.capture_page(self.browser.page())
+            )
+
+    def capture_page(self, page):
+        """Store the page's rendered HTML in the page cache"""
+        if self.browser_released:
+            return
+        # Only result pages of this search, not pages the user navigated to
+        if page.url().path() != QUrl(self.search_url).path():
+            return
+
+        query = self.search_query
+
+        def on_html(html):
+            if not isinstance(html, str):
+                return
+            if get_page_cache().put_page(query, html):
+                log.debug("已缓存结果页: %s KB", len(html) // 1024)
+            else:
+                log.debug("结果页过大，不缓存: %s KB", len(html) // 1024)
+
+        page.runJavaScript(CAPTURE_PAGE_JS, on_html)
+
+    def refresh_cached_page(self):
+        """Load the live results page off-screen to refresh a stale snapshot"""
+        page = QWebEnginePage(self.browser.page().profile(), self)
+        if self.resource_blocker is not None:
+            page.setUrlRequestInterceptor(self.resource_blocker)
+
+        def on_loaded(success):
+            if success:
+                QTimer.singleShot(PAGE_CAPTURE_DELAY_MS, lambda: capture(page))
+            else:
+                page.deleteLater()
+
+        def capture(page):
+            self.capture_page(page)
+            page.deleteLater()
+
+        page.loadFinished.connect(on_loaded)
+        page.load(QUrl(self.search_url))
+        log.debug("后台刷新缓存的结果页")
+
+    def release_browser(self):
+        """Disconnect from the browser view and hand it back to the pool"""
+        self.browser_released = True
+        browser = self.browser
+        browser.loadStarted.disconnect(self.on_load_started)
+        browser.loadProgress.disconnect(self.on_load_progress)
+        browser.loadFinished.disconnect(self.inject_javascript)
+        browser.loadFinished.disconnect(self.measure_first_paint)
+        browser.loadFinished.disconnect(self.schedule_page_capture)
+        browser.customContextMenuRequested.disconnect(
+            self.on_custom_context_menu_requested
+        )
+        browser.page().bridge_message.disconnect(self.on_bridge_message)
+        if self.resource_blocker is not None:
+            stats = self.resource_blocker.stats()
+            log.debug(
+                "已拦截 %s 个请求 (约 %s KB), 放行 %s 个, 明细: %s",
+                stats["blocked"],
+                stats["estimated_blocked_bytes"] // 1024,
+                stats["allowed"],
+                stats["by_reason"],
+            )
+
+        if get_config().reuse_browser_view:
+            get_web_view_pool().release(browser)
+
+    def done(self, result):
+        self.cancel_speculation()
+        self.release_browser()
+        super().done(result)
 
     def on_custom_context_menu_requested(self, position):
         """Handle custom context menu request"""
-        print(f"[BrowserPicker] 自定义右键菜单请求，位置: {position}")
+        log.debug("自定义右键菜单请求，位置: %s", position)
 
-        # Check if an image was selected via JavaScript
+        # Ask the page for the current selection and the right-clicked image
         js_code = """
         (function() {
-            if (window.selectedImageUrl) {
+            const selected = window.ankiSelectedImages || [];
+            if (selected.length && window.ankiDescribeImage) {
                 console.log('[AnkiImageSearch] 检测到选中的图片');
                 return {
-                    url: window.selectedImageUrl,
-                    alt: window.selectedImageAlt || '',
+                    items: selected.map(window.ankiDescribeImage),
+                    context: window.ankiContextImage
+                        ? window.ankiDescribeImage(window.ankiContextImage)
+                        : null,
                     hasSelection: true
                 };
             }
@@ -147,36 +359,30 @@ class BrowserImagePickerDialog(QDialog):
 
     def show_context_menu_at_position(self, position, result):
         """Show context menu at the specified position"""
-        print(f"[BrowserPicker] 在位置 {position} 显示上下文菜单，结果: {result}")
+        log.debug("在位置 %s 显示上下文菜单，结果: %s", position, result)
         from aqt.qt import QAction, QMenu
 
         menu = QMenu(self)
 
         if result and result.get("hasSelection"):
-            # Image was selected
-            self.selected_image_url = result.get("url")
-            image_alt = result.get("alt", _("图片"))[:30]
-            print(f"[BrowserPicker] 图片已选中: {self.selected_image_url}")
-            print(f"[BrowserPicker] 图片描述: {image_alt}")
+            # Image(s) selected
+            self.set_selection(result.get("items") or [])
+            log.debug("图片描述: %s", self.insert_button.text())
 
-            insert_action = QAction(_("插入图片: {}").format(image_alt), self)
+            insert_action = QAction(self.insert_button.text(), self)
             insert_action.triggered.connect(self.on_insert_from_context_menu)
             menu.addAction(insert_action)
 
             menu.addSeparator()
 
+            context = result.get("context") or self.selection[-1]
+            copy_url = context.get("full") or context.get("url")
             copy_action = QAction(_("复制图片URL"), self)
-            copy_action.triggered.connect(
-                lambda: self.copy_to_clipboard(self.selected_image_url)
-            )
+            copy_action.triggered.connect(lambda: self.copy_to_clipboard(copy_url))
             menu.addAction(copy_action)
-
-            # Enable the insert button
-            self.insert_button.setEnabled(True)
-            self.insert_button.setText(_("插入图片: {}").format(image_alt))
         else:
             # No image selected, show browser actions
-            print("[BrowserPicker] 未选中图片，显示浏览器操作菜单")
+            log.debug("未选中图片，显示浏览器操作菜单")
             back_action = QAction(_("后退"), self)
             back_action.triggered.connect(self.browser.back)
             menu.addAction(back_action)
@@ -186,7 +392,7 @@ class BrowserImagePickerDialog(QDialog):
             menu.addAction(forward_action)
 
             reload_action = QAction(_("刷新"), self)
-            reload_action.triggered.connect(self.browser.reload)
+            reload_action.triggered.connect(self.on_refresh_clicked)
             menu.addAction(reload_action)
 
         # Show menu at the cursor position in browser widget
@@ -194,50 +400,114 @@ class BrowserImagePickerDialog(QDialog):
 
     def inject_javascript(self, success):
         """Inject JavaScript to handle image clicks"""
-        print(f"[BrowserPicker] 页面加载完成，成功: {success}")
+        log.debug("页面加载完成，成功: %s", success)
         if not success:
-            print("[BrowserPicker] 页面加载失败，跳过JavaScript注入")
+            log.warning("页面加载失败，跳过JavaScript注入")
             return
 
-        print("[BrowserPicker] 开始注入JavaScript")
+        log.debug("开始注入JavaScript")
         js_code = """
         (function() {
+            if (window.ankiDescribeImage) return;
             console.log('[AnkiImageSearch] JavaScript 注入成功');
 
-            // Add click listener to all images
+            // Selected <img> elements in the order they were picked
+            window.ankiSelectedImages = [];
+
+            // Walk up to the enclosing result link and read the original
+            // image URL and size from Google's imgres parameters
+            window.ankiDescribeImage = function(img) {
+                const info = {url: img.src, alt: img.alt || 'Image',
+                              thumbnail: img.currentSrc || img.src,
+                              full: null, width: null, height: null};
+                const link = img.closest('a[href]');
+                if (!link) return info;
+                try {
+                    const params = new URL(link.href, location.href).searchParams;
+                    const full = params.get('imgurl');
+                    if (full && /^https?:/.test(full)) {
+                        info.full = full;
+                        info.width = parseInt(params.get('w'), 10) || null;
+                        info.height = parseInt(params.get('h'), 10) || null;
+                    }
+                } catch (err) {}
+                return info;
+            };
+
+            // Outline every selected image; number them when there are several
+            function renderHighlights() {
+                document.querySelectorAll('.anki-image-search-badge')
+                    .forEach(badge => badge.remove());
+                document.querySelectorAll('img').forEach(img => {
+                    img.style.outline = '';
+                });
+                const selected = window.ankiSelectedImages;
+                selected.forEach((img, i) => {
+                    img.style.outline = '3px solid #0066cc';
+                    if (selected.length < 2) return;
+                    const rect = img.getBoundingClientRect();
+                    const badge = document.createElement('div');
+                    badge.className = 'anki-image-search-badge';
+                    badge.textContent = String(i + 1);
+                    badge.style.cssText =
+                        'position:absolute;z-index:2147483647;pointer-events:none;' +
+                        'min-width:18px;height:18px;line-height:18px;' +
+                        'border-radius:9px;text-align:center;' +
+                        'background:#0066cc;color:#fff;font:bold 12px sans-serif;' +
+                        'left:' + (rect.left + window.scrollX + 4) + 'px;' +
+                        'top:' + (rect.top + window.scrollY + 4) + 'px;';
+                    document.body.appendChild(badge);
+                });
+            }
+
+            // Tell Python about the selection so it can start fetching
+            function postSelection() {
+                console.log('__PREFIX__' + JSON.stringify({
+                    type: 'selection',
+                    items: window.ankiSelectedImages.map(window.ankiDescribeImage)
+                }));
+            }
+
+            // Click selects one image; Ctrl/Cmd/Shift+click adds or removes
             document.addEventListener('click', function(e) {
-                if (e.target.tagName === 'IMG') {
-                    // Store clicked image info
-                    window.selectedImageUrl = e.target.src;
-                    window.selectedImageAlt = e.target.alt || 'Image';
-
-                    // Highlight the selected image
-                    document.querySelectorAll('img').forEach(img => {
-                        img.style.outline = '';
-                    });
-                    e.target.style.outline = '3px solid #0066cc';
-
-                    // Notify that an image was selected
-                    console.log('[AnkiImageSearch] 图片已选中:', window.selectedImageUrl);
+                if (e.target.tagName !== 'IMG') return;
+                const selected = window.ankiSelectedImages;
+                if (e.ctrlKey || e.metaKey || e.shiftKey) {
+                    e.preventDefault();
+                    const index = selected.indexOf(e.target);
+                    if (index >= 0) {
+                        selected.splice(index, 1);
+                    } else {
+                        selected.push(e.target);
+                    }
+                } else {
+                    window.ankiSelectedImages = [e.target];
                 }
-            });
+                renderHighlights();
+                postSelection();
+                console.log('[AnkiImageSearch] 已选中图片数:',
+                            window.ankiSelectedImages.length);
+            }, true);
 
-            // Add right-click listener
+            // Right-click keeps a multi-selection that contains the image
             document.addEventListener('contextmenu', function(e) {
-                if (e.target.tagName === 'IMG') {
-                    window.selectedImageUrl = e.target.src;
-                    window.selectedImageAlt = e.target.alt || 'Image';
-                    console.log('[AnkiImageSearch] 图片被右键:', window.selectedImageUrl);
+                if (e.target.tagName !== 'IMG') return;
+                window.ankiContextImage = e.target;
+                if (!window.ankiSelectedImages.includes(e.target)) {
+                    window.ankiSelectedImages = [e.target];
+                    renderHighlights();
+                    postSelection();
                 }
+                console.log('[AnkiImageSearch] 图片被右键:', e.target.src);
             });
+
+            window.addEventListener('resize', renderHighlights);
         })();
-        """
+        """.replace("__PREFIX__", BRIDGE_PREFIX)
 
         self.browser.page().runJavaScript(js_code)
-        print("[BrowserPicker] JavaScript注入完成")
-
-        # Poll for selected image
-        self.check_selection_timer = None
+        self.browser.page().runJavaScript(EXTRACT_BYTES_JS)
+        log.debug("JavaScript注入完成")
 
     def copy_to_clipboard(self, text):
         """Copy text to clipboard"""
@@ -250,73 +520,347 @@ class BrowserImagePickerDialog(QDialog):
         """Insert image from context menu"""
         self.on_insert_clicked()
 
+    def set_selection(self, items: list[dict]):
+        """Remember the selected images (in pick order) and start preparing them"""
+        selection = []
+        for item in items:
+            if not item.get("url"):
+                continue
+            alt = (item.get("alt") or _("图片"))[:30]
+            if item.get("width") and item.get("height"):
+                alt += f" ({item['width']}×{item['height']})"
+            selection.append(
+                {
+                    "url": item["url"],
+                    "alt": alt,
+                    "thumbnail": item.get("thumbnail") or item["url"],
+                    "full": item.get("full"),
+                    "width": item.get("width"),
+                    "height": item.get("height"),
+                }
+            )
+
+        if selection == self.selection:
+            return
+        if self.inserting:
+            self.cancel_insert()
+
+        self.selection = selection
+        log.debug("已选中 %s 张图片", len(selection))
+        for item in selection:
+            log.debug("  %s (原图: %s)", item["url"][:80], item["full"])
+
+        # Drop work for images that are no longer selected
+        urls = {item["url"] for item in selection}
+        for url in list(self.speculations):
+            if url not in urls:
+                self.speculations.pop(url).cancel()
+
+        if get_config().speculative_download:
+            for item in selection:
+                if item["url"] not in self.speculations:
+                    self.start_speculation(item)
+
+        if not selection:
+            self.insert_button.setEnabled(False)
+            self.insert_button.setText(_("插入选中的图片"))
+        elif len(selection) == 1:
+            self.insert_button.setEnabled(True)
+            self.insert_button.setText(_("插入图片: {}").format(selection[0]["alt"]))
+        else:
+            self.insert_button.setEnabled(True)
+            self.insert_button.setText(_("插入 {} 张图片").format(len(selection)))
+
+    def start_speculation(self, item: dict) -> SpeculativeImage:
+        """Fetch and convert one selected image in the background"""
+        upgrade_url = None
+        if get_config().thumbnail_first and item["full"]:
+            # Insert the thumbnail the page already has; the original
+            # replaces it in the background after the insert
+            candidates = list(dict.fromkeys([item["thumbnail"], item["full"]]))
+            upgrade_url = item["full"]
+        else:
+            candidates = order_candidates(
+                item["full"], item["thumbnail"], get_config().image_quality
+            )
+        speculation = SpeculativeImage(
+            candidates, item["full"], self.request_image_bytes, upgrade_url
+        )
+        self.speculations[item["url"]] = speculation
+        speculation.start()
+        return speculation
+
+    def cancel_speculation(self):
+        """Discard all work for the current selection"""
+        for speculation in self.speculations.values():
+            speculation.cancel()
+        self.speculations.clear()
+        self.pending_extracts.clear()
+        self.insert_batch = None
+        self.finish_insert()
+
     def on_insert_clicked(self):
-        """Download and insert the selected image"""
-        print("[BrowserPicker] 开始插入图片")
-        if not self.selected_image_url:
-            print("[BrowserPicker] 错误：未选择图片")
+        """Insert the selected images once all their bytes are prepared"""
+        log.debug("开始插入图片")
+        if not self.selection:
+            log.warning("错误：未选择图片")
             showWarning(_("请先右键点击一张图片"))
             return
+        if self.inserting:
+            return
 
-        print(f"[BrowserPicker] 选中的图片URL: {self.selected_image_url}")
+        batch = [
+            self.speculations.get(item["url"]) or self.start_speculation(item)
+            for item in self.selection
+        ]
+        ready = sum(1 for speculation in batch if speculation.finished)
+        log.debug("插入 %s 张图片，已准备好 %s 张", len(batch), ready)
+
+        self.inserting = True
+        self.insert_batch = batch
+        self.insert_started_at = time.perf_counter()
+        self.progress_bar.setRange(0, 2 * len(batch) + 2)
+        for speculation in batch:
+            speculation.on_stage = lambda _stage: self.update_insert_progress()
+        self.update_insert_progress()
+        for speculation in batch:
+            speculation.when_finished(self.on_item_prepared)
+
+    def on_cancel_insert_clicked(self):
+        """Abort the insert in flight and keep the picker open"""
+        log.info("用户取消插入")
+        self.cancel_insert()
+        tooltip(_("已取消"))
+
+    def cancel_insert(self):
+        """Cancel the images of the running insert; they are refetched on retry"""
+        for speculation in self.insert_batch or []:
+            speculation.cancel()
+            for url, candidate in list(self.speculations.items()):
+                if candidate is speculation:
+                    del self.speculations[url]
+        self.insert_batch = None
+        self.finish_insert()
+
+    def update_insert_progress(self, stage: str | None = None):
+        """Show insert progress; stage overrides it once all images are prepared"""
+        batch = self.insert_batch
+        if not self.inserting or not batch:
+            return
 
-        # Show progress
-        tooltip(_("正在下载图片..."))
+        steps = {STAGE_FETCH: 0, STAGE_CONVERT: 1, STAGE_READY: 2, STAGE_FAILED: 2}
+        value = sum(steps.get(speculation.stage, 0) for speculation in batch)
+        finished = sum(1 for speculation in batch if speculation.finished)
+
+        if stage == STAGE_WRITE:
+            value, label = 2 * len(batch), _("正在写入媒体文件夹...")
+        elif stage == STAGE_INSERT:
+            value, label = 2 * len(batch) + 1, _("正在插入到字段...")
+        elif len(batch) > 1:
+            label = _("正在下载图片 ({}/{})...").format(finished, len(batch))
+        elif batch[0].stage == STAGE_CONVERT:
+            label = _("正在转换格式...")
+        else:
+            label = _("正在下载图片...")
 
-        try:
-            # Download image
-            from ..image_search import GoogleImageSearch
+        self.progress_bar.setValue(value)
+        self.progress_label.setText(label)
+        self.progress_label.show()
+        self.progress_bar.show()
+        self.cancel_insert_button.show()
+        self.insert_button.setEnabled(False)
 
-            print("[BrowserPicker] 开始下载图片...")
-            searcher = GoogleImageSearch()
-            image_data = searcher.download_image(self.selected_image_url)
+    def request_image_bytes(
+        self, url: str, callback, cancel: CancelToken | None = None
+    ):
+        """
+        Get image bytes with as few network round-trips as possible
 
-            if not image_data:
-                print("[BrowserPicker] 下载失败：未获取到图片数据")
-                showWarning(_("下载图片失败"))
-                return
+        data: URIs are decoded locally; other images are read from the
+        page (HTTP cache or canvas) through the JS bridge. Only when that
+        fails is the image downloaded again.
 
-            print(f"[BrowserPicker] 下载成功，大小: {len(image_data)} 字节")
+        Args:
+            url: Image URL as seen by the page
+            callback: Called with (image_data or None, url)
+            cancel: Optional token that aborts the fallback download
+        """
+        if url.startswith("data:"):
+            log.debug("本地解码 data: URI")
+            callback(decode_data_uri(url), url)
+            return
 
-            # Save to media folder
-            print("[BrowserPicker] 保存到媒体文件夹...")
-            filename = save_image_to_media(
-                image_data, self.selected_image_url, self.editor.note
-            )
+        self.extract_request_id += 1
+        request_id = self.extract_request_id
+        self.pending_extracts[request_id] = (url, callback, cancel)
 
-            if not filename:
-                print("[BrowserPicker] 保存失败：未获取到文件名")
-                showWarning(_("保存图片失败"))
-                return
+        self.browser.page().runJavaScript(
+            f"window.ankiImageSearchExtract && "
+            f"window.ankiImageSearchExtract({request_id}, {json.dumps(url)});"
+        )
+        QTimer.singleShot(
+            EXTRACT_BYTES_TIMEOUT_MS, lambda: self.on_extract_failed(request_id)
+        )
 
-            print(f"[BrowserPicker] 保存成功，文件名: {filename}")
+    def on_bridge_message(self, payload: dict):
+        """Handle a message posted by the injected JavaScript"""
+        if payload.get("type") == "selection":
+            self.set_selection(payload.get("items") or [])
+            return
+        if payload.get("type") != "bytes":
+            return
 
-            # Insert into field
-            print(f"[BrowserPicker] 插入到字段: {self.target_field}")
-            success = insert_image_to_field(self.editor, self.target_field, filename)
+        request_id = payload.get("id")
+        if request_id not in self.pending_extracts:
+            return  # Stale or timed-out request
 
-            if success:
-                print("[BrowserPicker] 插入成功")
-                tooltip(_("图片已插入到 {}").format(self.target_field))
-                self.accept()
-            else:
-                print("[BrowserPicker] 插入失败")
-                showWarning(_("插入图片失败"))
+        data = decode_data_uri(payload.get("data") or "")
+        if not data:
+            log.warning("页面内提取失败: %s", payload.get("error"))
+            self.on_extract_failed(request_id)
+            return
+
+        url, callback, _cancel = self.pending_extracts.pop(request_id)
+        log.debug("从页面提取图片 (%s), %s 字节", payload.get("source"), len(data))
+        callback(data, url)
 
+    def on_extract_failed(self, request_id: int):
+        """Fall back to downloading the image"""
+        pending = self.pending_extracts.pop(request_id, None)
+        if pending is None:
+            return
+        url, callback, cancel = pending
+
+        from ..image_search import get_searcher
+
+        log.debug("回退到重新下载图片")
+
+        def on_done(future):
+            try:
+                image_data = future.result()
+            except Exception as e:
+                log.warning("下载异常: %s", e)
+                image_data = None
+            callback(image_data, url)
+
+        run_in_background(
+            lambda: get_searcher().download_image(url, cancel=cancel),
+            on_done,
+        )
+
+    def on_item_prepared(self, speculation: SpeculativeImage):
+        """Write all images to the media folder once the whole batch is ready"""
+        batch = self.insert_batch
+        if batch is None or speculation not in batch:
+            return
+        if not all(candidate.finished for candidate in batch):
+            return
+        # Items prepared before the click all report finished synchronously;
+        # a second write would return the same filenames and then trash them
+        if self.insert_writing:
+            return
+
+        ready = [s for s in batch if s.prepared is not None]
+        prepared = [s.prepared for s in ready]
+        failed = len(batch) - len(prepared)
+        if not prepared:
+            log.warning("下载失败：未获取到图片数据")
+            self.cancel_insert()  # allow a retry
+            showWarning(_("下载图片失败"))
+            return
+        if failed:
+            log.warning("%s 张图片下载失败，跳过", failed)
+
+        total_bytes = sum(len(p.data) for p in prepared)
+        log.debug("获取成功，%s 张，共 %s 字节", len(prepared), total_bytes)
+        self.update_insert_progress(STAGE_WRITE)
+        self.insert_writing = True
+        run_in_background(
+            lambda: [write_prepared_image(p.filename, p.data) for p in prepared],
+            lambda future: self.on_media_written(batch, ready, failed, future),
+            uses_collection=True,
+        )
+
+    def on_media_written(
+        self,
+        batch: list[SpeculativeImage],
+        ready: list[SpeculativeImage],
+        failed: int,
+        future,
+    ):
+        """Insert the written files into the note in one update (main thread)"""
+        try:
+            written = list(zip(future.result(), ready, strict=True))
         except Exception as e:
-            print(f"[BrowserPicker] 异常: {str(e)}")
-            import traceback
+            log.warning("保存异常: %s", e)
+            written = []
+        filenames = [name for name, _speculation in written if name]
+
+        if batch is not self.insert_batch:
+            # Cancelled while writing: don't leave unused files behind
+            if filenames and mw.col:
+                mw.col.media.trash_files(filenames)
+            return
+
+        if not filenames:
+            log.warning("保存失败：未获取到文件名")
+            self.cancel_insert()
+            showWarning(_("保存图片失败"))
+            return
 
-            traceback.print_exc()
+        log.debug("保存成功，文件名: %s", filenames)
+
+        # Insert into field: the only step that touches the note
+        log.debug("插入到字段: %s", self.target_field)
+        self.update_insert_progress(STAGE_INSERT)
+        try:
+            success = insert_images_to_field(self.editor, self.target_field, filenames)
+        except Exception as e:
+            log.exception("异常: %s", e)
+            self.cancel_insert()
             showWarning(_("错误: {}").format(str(e)))
+            return
+
+        elapsed_ms = (time.perf_counter() - self.insert_started_at) * 1000
+        self.insert_batch = None
+        self.finish_insert()
+        if success:
+            # Swap inserted thumbnails for their originals in the background
+            for name, speculation in written:
+                upgrade_url = speculation.upgrade_url
+                if name and upgrade_url and speculation.prepared.url != upgrade_url:
+                    schedule_upgrade(self.editor, self.target_field, name, upgrade_url)
+
+            log.info("插入成功: %s 张 (确认后 %.0fms)", len(filenames), elapsed_ms)
+            if failed:
+                tooltip(
+                    _("已插入 {} 张图片到 {}，{} 张下载失败").format(
+                        len(filenames), self.target_field, failed
+                    )
+                )
+            else:
+                tooltip(_("图片已插入到 {}").format(self.target_field))
+            self.accept()
+        else:
+            log.warning("插入失败")
+            showWarning(_("插入图片失败"))
+
+    def finish_insert(self):
+        """Leave the inserting state and hide the progress row"""
+        self.inserting = False
+        self.insert_writing = False
+        self.progress_label.hide()
+        self.progress_bar.hide()
+        self.cancel_insert_button.hide()
+        self.insert_button.setEnabled(bool(self.selection))
 
 
 def show_browser_image_picker(editor, search_query: str, target_field: str):
     """Show browser-based image picker dialog"""
-    print("[BrowserPicker] show_browser_image_picker 被调用")
-    print(f"[BrowserPicker] 参数 - 搜索词: {search_query}, 目标字段: {target_field}")
+    log.debug("show_browser_image_picker 被调用")
+    log.debug("参数 - 搜索词: %s, 目标字段: %s", search_query, target_field)
     dialog = BrowserImagePickerDialog(editor, search_query, target_field)
-    print("[BrowserPicker] 显示对话框")
+    log.debug("显示对话框")
 
     # 使用show()而不是exec()，避免阻塞事件循环
     # 这样页面加载信号才能正常触发
@@ -325,4 +869,4 @@ def show_browser_image_picker(editor, search_query: str, target_field: str):
     # 可选：设置为模态对话框（阻止用户操作其他窗口，但不阻塞事件循环）
     dialog.setModal(True)
 
-    print("[BrowserPicker] 对话框已显示（非阻塞模式）")
+    log.debug("对话框已显示（非阻塞模式）")
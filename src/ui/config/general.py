@@ -16,7 +16,13 @@ from aqt.qt import (
     Qt,
 )
 
-from ...config.enums import ImageFormat, ImageQuality
+from ...config.enums import (
+    ImageFormat,
+    ImageQuality,
+    LogLevel,
+    PickerMode,
+    StatusBarFormat,
+)
 from ...config.languages import LanguageCode
 from ...config.types import AppConfig
 from ...translator import _
@@ -59,6 +65,52 @@ class GeneralSettings(QWidget):
 
         general_layout.addRow(_("语言:"), self.language_combo)
 
+        # Log level
+        self.log_level_combo = QComboBox()
+        log_level_options = {
+            LogLevel.DEBUG: _("调试 (详细)"),
+            LogLevel.INFO: _("信息"),
+            LogLevel.WARNING: _("警告"),
+            LogLevel.ERROR: _("错误"),
+        }
+        for level, label in log_level_options.items():
+            self.log_level_combo.addItem(label, level)
+
+        current_level_index = self.log_level_combo.findData(self.config.log_level)
+        if current_level_index >= 0:
+            self.log_level_combo.setCurrentIndex(current_level_index)
+        self.log_level_combo.setToolTip(
+            _("写入控制台和 user_files/image_search.log 的诊断信息级别")
+        )
+
+        general_layout.addRow(_("日志级别:"), self.log_level_combo)
+
+        # Status bar indicator
+        self.status_bar_checkbox = QCheckBox(_("在主窗口状态栏显示后台任务"))
+        self.status_bar_checkbox.setChecked(self.config.status_bar_enabled)
+        self.status_bar_checkbox.setToolTip(
+            _("显示排队和进行中的下载/转换、吞吐量和缓存命中率")
+        )
+        self.status_bar_checkbox.toggled.connect(self.on_status_bar_toggled)
+        general_layout.addRow(_("状态栏:"), self.status_bar_checkbox)
+
+        self.status_bar_format_combo = QComboBox()
+        status_bar_format_options = {
+            StatusBarFormat.ICON_ONLY: _("仅图标"),
+            StatusBarFormat.ICON_STATUS: _("图标和状态"),
+            StatusBarFormat.FULL: _("图标、状态和图片数"),
+        }
+        for bar_format, label in status_bar_format_options.items():
+            self.status_bar_format_combo.addItem(label, bar_format)
+
+        current_format_index = self.status_bar_format_combo.findData(
+            self.config.status_bar_format
+        )
+        if current_format_index >= 0:
+            self.status_bar_format_combo.setCurrentIndex(current_format_index)
+        general_layout.addRow(_("状态栏格式:"), self.status_bar_format_combo)
+        self.on_status_bar_toggled(self.config.status_bar_enabled)
+
         general_group.setLayout(general_layout)
         layout.addWidget(general_group)
 
@@ -89,11 +141,71 @@ class GeneralSettings(QWidget):
 
         search_layout.addRow(_("图片质量:"), self.quality_combo)
 
+        # Picker mode
+        self.picker_mode_combo = QComboBox()
+        picker_options = {
+            PickerMode.BROWSER: _("内置浏览器 (Google 页面)"),
+            PickerMode.NATIVE: _("缩略图网格 (快速)"),
+        }
+        for mode, label in picker_options.items():
+            self.picker_mode_combo.addItem(label, mode)
+
+        current_mode_index = self.picker_mode_combo.findData(self.config.picker_mode)
+        if current_mode_index >= 0:
+            self.picker_mode_combo.setCurrentIndex(current_mode_index)
+
+        search_layout.addRow(_("选图界面:"), self.picker_mode_combo)
+
+        # Browser view reuse
+        self.reuse_view_checkbox = QCheckBox(_("预热并复用浏览器 (更快打开)"))
+        self.reuse_view_checkbox.setChecked(self.config.reuse_browser_view)
+        search_layout.addRow(_("浏览器:"), self.reuse_view_checkbox)
+
+        self.block_resources_checkbox = QCheckBox(
+            _("拦截字体、跟踪和预取等非必要请求")
+        )
+        self.block_resources_checkbox.setChecked(self.config.block_resources)
+        search_layout.addRow("", self.block_resources_checkbox)
+
+        self.speculative_checkbox = QCheckBox(_("点击图片时提前开始下载"))
+        self.speculative_checkbox.setChecked(self.config.speculative_download)
+        search_layout.addRow("", self.speculative_checkbox)
+
+        self.replay_pages_checkbox = QCheckBox(_("重新打开相同搜索时显示缓存的结果页"))
+        self.replay_pages_checkbox.setChecked(self.config.replay_cached_pages)
+        search_layout.addRow("", self.replay_pages_checkbox)
+
         # Auto download
         self.auto_download_checkbox = QCheckBox(_("自动下载并插入"))
         self.auto_download_checkbox.setChecked(self.config.auto_download)
         search_layout.addRow(_("下载方式:"), self.auto_download_checkbox)
 
+        self.incremental_update_checkbox = QCheckBox(
+            _("插入时只刷新目标字段 (不重新加载整个笔记)")
+        )
+        self.incremental_update_checkbox.setChecked(
+            self.config.incremental_field_update
+        )
+        search_layout.addRow(_("编辑器:"), self.incremental_update_checkbox)
+
+        self.thumbnail_first_checkbox = QCheckBox(
+            _("先插入缩略图，后台替换为原图")
+        )
+        self.thumbnail_first_checkbox.setChecked(self.config.thumbnail_first)
+        search_layout.addRow("", self.thumbnail_first_checkbox)
+
+        # Prefetch
+        self.prefetch_checkbox = QCheckBox(_("打开笔记时预取搜索结果"))
+        self.prefetch_checkbox.setChecked(self.config.prefetch_enabled)
+        self.prefetch_checkbox.toggled.connect(self.on_prefetch_toggled)
+        search_layout.addRow(_("预取:"), self.prefetch_checkbox)
+
+        self.prefetch_thumbnails_spin = QSpinBox()
+        self.prefetch_thumbnails_spin.setRange(0, 20)
+        self.prefetch_thumbnails_spin.setValue(self.config.prefetch_thumbnails)
+        search_layout.addRow(_("预取缩略图数:"), self.prefetch_thumbnails_spin)
+        self.on_prefetch_toggled(self.config.prefetch_enabled)
+
         search_group.setLayout(search_layout)
         layout.addWidget(search_group)
 
@@ -172,6 +284,14 @@ class GeneralSettings(QWidget):
         self.quality_slider.setEnabled(checked)
         self.quality_label.setEnabled(checked)
 
+    def on_status_bar_toggled(self, checked: bool):
+        """Handle status bar checkbox toggle"""
+        self.status_bar_format_combo.setEnabled(checked)
+
+    def on_prefetch_toggled(self, checked: bool):
+        """Handle prefetch checkbox toggle"""
+        self.prefetch_thumbnails_spin.setEnabled(checked)
+
     def on_quality_changed(self, value: int):
         """Update quality label when slider changes"""
         self.quality_label.setText(f"{value}%")
@@ -182,9 +302,21 @@ class GeneralSettings(QWidget):
             self.config,
             enabled=self.enabled_checkbox.isChecked(),
             language=self.language_combo.currentData(),
+            log_level=self.log_level_combo.currentData(),
+            status_bar_enabled=self.status_bar_checkbox.isChecked(),
+            status_bar_format=self.status_bar_format_combo.currentData(),
             max_results=self.max_results_spin.value(),
             image_quality=self.quality_combo.currentData(),
+            picker_mode=self.picker_mode_combo.currentData(),
+            reuse_browser_view=self.reuse_view_checkbox.isChecked(),
+            block_resources=self.block_resources_checkbox.isChecked(),
+            speculative_download=self.speculative_checkbox.isChecked(),
+            replay_cached_pages=self.replay_pages_checkbox.isChecked(),
             auto_download=self.auto_download_checkbox.isChecked(),
+            incremental_field_update=self.incremental_update_checkbox.isChecked(),
+            thumbnail_first=self.thumbnail_first_checkbox.isChecked(),
+            prefetch_enabled=self.prefetch_checkbox.isChecked(),
+            prefetch_thumbnails=self.prefetch_thumbnails_spin.value(),
             convert_format=self.convert_format_checkbox.isChecked(),
             output_format=self.output_format_combo.currentData(),
             ffmpeg_quality=self.quality_slider.value(),
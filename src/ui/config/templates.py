@@ -129,11 +129,14 @@ class TemplateDialog(QDialog):
 
     def get_template(self) -> NoteTypeTemplate:
         """Get the edited template"""
+        note_type_name = self.note_type_combo.currentText()
+        note_type = mw.col.models.by_name(note_type_name) if mw and mw.col else None
         return NoteTypeTemplate(
-            note_type_name=self.note_type_combo.currentText(),
+            note_type_name=note_type_name,
             search_field=self.search_field_combo.currentText(),
             target_field=self.target_field_combo.currentText(),
             enabled=self.enabled_checkbox.isChecked(),
+            note_type_id=note_type["id"] if note_type else None,
         )
 
 
@@ -0,0 +1,390 @@
+# ui/grid_picker.py - Native thumbnail-grid Image Picker Dialog
+
+from typing import Any
+
+from aqt.qt import (
+    QAbstractListModel,
+    QBuffer,
+    QByteArray,
+    QDialog,
+    QHBoxLayout,
+    QImage,
+    QImageReader,
+    QIODevice,
+    QLabel,
+    QListView,
+    QModelIndex,
+    QObject,
+    QPixmap,
+    QPushButton,
+    QRunnable,
+    QSize,
+    Qt,
+    QThreadPool,
+    QVBoxLayout,
+    pyqtSignal,
+)
+from aqt.utils import showWarning, tooltip
+
+from ..activity import THUMBNAIL_DOWNLOAD_STAGE, run_in_background
+from ..config.constants import (
+    GRID_COLUMNS,
+    IMAGE_PICKER_HEIGHT,
+    IMAGE_PICKER_WIDTH,
+    THUMBNAIL_SIZE,
+    THUMBNAIL_WORKERS,
+)
+from ..log import get_logger
+from ..thumbnail_cache import get_thumbnail_cache
+from ..translator import _
+
+log = get_logger("GridPicker")
+
+
+def decode_thumbnail(data: bytes, size: QSize) -> QImage | None:
+    """Decode image bytes directly at (at most) the given size"""
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+
+    reader = QImageReader(buffer)
+    original = reader.size()
+    if original.isValid():
+        # Let the decoder downscale (much cheaper than decoding full size)
+        reader.setScaledSize(
+            original.scaled(size, Qt.AspectRatioMode.KeepAspectRatio)
+            if original.width() > size.width() or original.height() > size.height()
+            else original
+        )
+
+    image = reader.read()
+    if image.isNull():
+        return None
+    if image.width() > size.width() or image.height() > size.height():
+        image = image.scaled(
+            size,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+    return image
+
+
+class _ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+    failed = pyqtSignal(str)
+
+
+class _ThumbnailTask(QRunnable):
+    """Fetch and decode one thumbnail on the thread pool"""
+
+    def __init__(self, url: str, size: QSize, signals: _ThumbnailSignals):
+        super().__init__()
+        self.url = url
+        self.size = size
+        self.signals = signals
+
+    def run(self):
+        from ..image_search import get_searcher
+        from ..thumbnail_cache import get_thumbnail_cache
+
+        cache = get_thumbnail_cache()
+        data = cache.get_bytes(self.url)
+        if data is None:
+            data = get_searcher().download_image(
+                self.url, stage=THUMBNAIL_DOWNLOAD_STAGE
+            )
+            if data:
+                cache.put_bytes(self.url, data)
+
+        image = decode_thumbnail(data, self.size) if data else None
+        try:
+            if image is None:
+                self.signals.failed.emit(self.url)
+            else:
+                self.signals.loaded.emit(self.url, image)
+        except RuntimeError:
+            # Dialog closed while the task was running
+            pass
+
+
+class ThumbnailModel(QAbstractListModel):
+    """List model over search results with lazily loaded thumbnails
+
+    Thumbnails are only requested from data(), which the view calls for
+    visible cells. Decoded pixmaps live in the shared, memory-budgeted
+    ThumbnailCache, so reopening a query or scrolling back is free.
+    """
+
+    def __init__(self, thumbnail_size: QSize, parent=None):
+        super().__init__(parent)
+        self.results: list[dict[str, Any]] = []
+        self.thumbnail_size = thumbnail_size
+        self._pending: set[str] = set()
+        self._failed: set[str] = set()
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(THUMBNAIL_WORKERS)
+        self._signals = _ThumbnailSignals(self)
+        self._signals.loaded.connect(self._on_loaded)
+        self._signals.failed.connect(self._on_failed)
+
+    def set_results(self, results: list[dict[str, Any]]):
+        self.beginResetModel()
+        self.results = results
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex | None = None):
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self.results)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        result = self.results[index.row()]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._pixmap_for(result["thumbnail"])
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{result['title']}\n{result['url']}"
+        if role == Qt.ItemDataRole.UserRole:
+            return result
+        return None
+
+    def shutdown(self):
+        """Drop queued thumbnail loads (running ones finish on their own)"""
+        self._pool.clear()
+
+    def _pixmap_for(self, url: str) -> QPixmap | None:
+        size = self.thumbnail_size
+        pixmap = get_thumbnail_cache().get_image(url, size.width(), size.height())
+        if pixmap is not None:
+            return pixmap
+
+        if url not in self._pending and url not in self._failed:
+            self._pending.add(url)
+            self._pool.start(_ThumbnailTask(url, self.thumbnail_size, self._signals))
+        return None
+
+    def _on_loaded(self, url: str, image: QImage):
+        self._pending.discard(url)
+        pixmap = QPixmap.fromImage(image)
+        cost = pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+        size = self.thumbnail_size
+        get_thumbnail_cache().put_image(
+            url, size.width(), size.height(), pixmap, cost
+        )
+        self._emit_changed(url)
+
+    def _on_failed(self, url: str):
+        self._pending.discard(url)
+        self._failed.add(url)
+
+    def _emit_changed(self, url: str):
+        for row, result in enumerate(self.results):
+            if result["thumbnail"] == url:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+
+class GridImagePickerDialog(QDialog):
+    """Dialog showing search() results as a native thumbnail grid"""
+
+    def __init__(self, editor, search_query: str, target_field: str):
+        super().__init__(editor.parentWindow)
+        log.debug("初始化对话框")
+        self.editor = editor
+        self.search_query = search_query
+        self.target_field = target_field
+        self.init_ui()
+        self.start_search()
+
+    def init_ui(self):
+        self.setWindowTitle(_("搜索图片 - {}").format(self.search_query))
+        self.resize(IMAGE_PICKER_WIDTH, IMAGE_PICKER_HEIGHT)
+
+        layout = QVBoxLayout()
+
+        self.status_label = QLabel(_("正在搜索..."))
+        self.status_label.setStyleSheet("QLabel { padding: 5px 8px; font-size: 11px; }")
+        layout.addWidget(self.status_label)
+
+        # Cells are sized so that GRID_COLUMNS fit the default dialog width
+        thumb_w, thumb_h = THUMBNAIL_SIZE
+        cell_w = max(thumb_w, IMAGE_PICKER_WIDTH // GRID_COLUMNS - 12)
+        thumbnail_size = QSize(thumb_w, thumb_h)
+
+        self.model = ThumbnailModel(thumbnail_size, self)
+
+        self.view = QListView()
+        self.view.setViewMode(QListView.ViewMode.IconMode)
+        self.view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.view.setMovement(QListView.Movement.Static)
+        self.view.setUniformItemSizes(True)
+        self.view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.view.setBatchSize(GRID_COLUMNS * 4)
+        self.view.setIconSize(thumbnail_size)
+        self.view.setGridSize(QSize(cell_w, thumb_h + 12))
+        self.view.setSpacing(4)
+        self.view.setModel(self.model)
+        self.view.doubleClicked.connect(self.on_insert_clicked)
+        self.view.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        layout.addWidget(self.view, stretch=1)
+
+        button_layout = QHBoxLayout()
+
+        self.insert_button = QPushButton(_("插入选中的图片"))
+        self.insert_button.clicked.connect(self.on_insert_clicked)
+        self.insert_button.setEnabled(False)
+
+        close_button = QPushButton(_("关闭"))
+        close_button.clicked.connect(self.reject)
+
+        button_layout.addStretch()
+        button_layout.addWidget(self.insert_button)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def start_search(self):
+        """Run the search (through the shared cache) in the background"""
+        from ..image_search import search_cached
+        from ..state import get_config
+
+        max_results = get_config().max_results
+
+        def on_done(future):
+            try:
+                results = future.result()
+            except Exception as e:
+                log.warning("搜索异常: %s", e)
+                results = []
+
+            if not results:
+                self.status_label.setText(_("未找到图片"))
+                return
+
+            self.status_label.setText(_("双击图片插入"))
+            self.model.set_results(results)
+
+        run_in_background(
+            lambda: search_cached(self.search_query, max_results),
+            on_done,
+        )
+
+    def selected_result(self) -> dict[str, Any] | None:
+        indexes = self.view.selectionModel().selectedIndexes()
+        if not indexes:
+            return None
+        return indexes[0].data(Qt.ItemDataRole.UserRole)
+
+    def on_selection_changed(self, *_args):
+        self.insert_button.setEnabled(self.selected_result() is not None)
+
+    def on_insert_clicked(self, *_args):
+        """Download the selected image in the background and insert it"""
+        from ..image_search import (
+            get_searcher,
+            insert_image_to_field,
+            prepare_image,
+            write_prepared_image,
+        )
+        from ..memory_budget import Reservation, get_memory_budget
+        from ..state import get_config
+        from ..upgrade import schedule_upgrade
+
+        result = self.selected_result()
+        if not result:
+            return
+
+        self.insert_button.setEnabled(False)
+        tooltip(_("正在下载图片..."))
+
+        # Thumbnail first: insert the cached thumbnail, upgrade it afterwards
+        thumbnail_first = (
+            get_config().thumbnail_first and result["url"] != result["thumbnail"]
+        )
+        urls = [result["url"], result["thumbnail"]]
+        if thumbnail_first:
+            urls.reverse()
+
+        def fail(message: str):
+            self.insert_button.setEnabled(True)
+            showWarning(message, parent=self)
+
+        # Download and conversion stay off Anki's (serialized) collection
+        # executor; only the media write runs there. The bytes count against
+        # the memory budget until written.
+        def prepare() -> tuple[tuple[str, bytes, Reservation], str] | None:
+            searcher = get_searcher()
+            for url in dict.fromkeys(urls):
+                fetched = None
+                if url == result["thumbnail"]:
+                    data = get_thumbnail_cache().get_bytes(url)
+                    if data:
+                        fetched = data, get_memory_budget().track(len(data))
+                fetched = fetched or searcher.fetch_image(url)
+                if fetched:
+                    image_data, reservation = fetched
+                    filename, data = prepare_image(image_data, url, reservation)
+                    return (filename, data, reservation), url
+            return None
+
+        def on_prepared(future):
+            try:
+                prepared, url = future.result() or (None, None)
+            except Exception as e:
+                log.warning("异常: %s", e)
+                prepared, url = None, None
+
+            if not prepared:
+                fail(_("下载图片失败"))
+                return
+
+            run_in_background(
+                lambda: write_prepared_image(*prepared),
+                lambda future: on_written(future, url),
+                uses_collection=True,
+            )
+
+        def on_written(future, url: str):
+            try:
+                filename = future.result()
+            except Exception as e:
+                log.warning("异常: %s", e)
+                filename = None
+
+            if not filename:
+                fail(_("保存图片失败"))
+                return
+
+            if insert_image_to_field(self.editor, self.target_field, filename):
+                if thumbnail_first and url == result["thumbnail"]:
+                    schedule_upgrade(
+                        self.editor, self.target_field, filename, result["url"]
+                    )
+                tooltip(_("图片已插入到 {}").format(self.target_field))
+                self.accept()
+            else:
+                fail(_("插入图片失败"))
+
+        run_in_background(prepare, on_prepared)
+
+    def done(self, result: int):
+        self.model.shutdown()
+        stats = get_thumbnail_cache().stats()
+        log.debug(
+            "缩略图缓存: 内存命中率 %.0f%%, 磁盘命中率 %.0f%%, 内存占用 %s KB",
+            stats["memory_hit_ratio"] * 100,
+            stats["disk_hit_ratio"] * 100,
+            stats["memory_bytes"] // 1024,
+        )
+        super().done(result)
+
+
+def show_grid_image_picker(editor, search_query: str, target_field: str):
+    """Show native thumbnail-grid image picker dialog"""
+    dialog = GridImagePickerDialog(editor, search_query, target_field)
+    dialog.setModal(True)
+    dialog.show()
@@ -0,0 +1,105 @@
+# ui/page_cache.py - Recently rendered Google result pages for instant re-opens
+
+import threading
+import time
+from collections import OrderedDict
+
+from ..config.constants import (
+    PAGE_CACHE_MAX_BYTES,
+    PAGE_CACHE_MAX_PAGE_BYTES,
+    PAGE_CACHE_SIZE,
+    PAGE_CACHE_TTL,
+)
+
+# JavaScript returning a static snapshot of the rendered page: scripts are
+# dropped (the replay must not re-run Google's JS) and the picker's own
+# highlights are removed. Images keep the src the page's scripts gave them.
+CAPTURE_PAGE_JS = """
+(function() {
+    const root = document.documentElement.cloneNode(true);
+    root.querySelectorAll(
+        'script, noscript, link[rel=preload], link[rel=prefetch], ' +
+        '.anki-image-search-badge'
+    ).forEach(e => e.remove());
+    root.querySelectorAll('img').forEach(img => { img.style.outline = ''; });
+    return '<!DOCTYPE html>' + root.outerHTML;
+})();
+"""
+
+
+class PageCache:
+    """Thread-safe LRU cache of result-page HTML keyed by query
+
+    Bounded by entry count and total size. Pages larger than
+    PAGE_CACHE_MAX_PAGE_BYTES are not stored because setHtml() cannot
+    display content over 2 MB.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = PAGE_CACHE_SIZE,
+        max_bytes: int = PAGE_CACHE_MAX_BYTES,
+        ttl: float = PAGE_CACHE_TTL,
+    ):
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._pages: OrderedDict[str, tuple[float, str, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return " ".join(query.split()).lower()
+
+    def get_page(self, query: str) -> tuple[str, float] | None:
+        """Return (html, age in seconds) for query, or None if missing or expired"""
+        key = self._key(query)
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is None:
+                return None
+            stored_at, html, size = entry
+            age = time.monotonic() - stored_at
+            if age > self.ttl:
+                del self._pages[key]
+                self._bytes -= size
+                return None
+            self._pages.move_to_end(key)
+            return html, age
+
+    def put_page(self, query: str, html: str) -> bool:
+        """Store html for query; returns False if the page is too large"""
+        size = len(html.encode("utf-8"))
+        if not html or size > PAGE_CACHE_MAX_PAGE_BYTES:
+            return False
+
+        key = self._key(query)
+        with self._lock:
+            old = self._pages.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._pages[key] = (time.monotonic(), html, size)
+            self._bytes += size
+            while len(self._pages) > self.max_pages or self._bytes > self.max_bytes:
+                _key, (_stored_at, _html, evicted) = self._pages.popitem(last=False)
+                self._bytes -= evicted
+        return True
+
+    def clear(self):
+        """Drop all cached pages"""
+        with self._lock:
+            self._pages.clear()
+            self._bytes = 0
+
+
+# Global instance
+_page_cache = None
+
+
+def get_page_cache() -> PageCache:
+    """Get or create global PageCache instance"""
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = PageCache()
+    return _page_cache
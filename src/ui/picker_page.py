@@ -0,0 +1,79 @@
+# ui/picker_page.py - Web page with a console-based bridge back to Python
+
+import json
+
+from aqt.qt import QWebEnginePage, pyqtSignal
+
+from ..log import get_logger
+
+log = get_logger("PickerPage")
+
+# Console messages starting with this prefix carry JSON for Python
+BRIDGE_PREFIX = "__anki_image_search__:"
+
+# Defines window.ankiImageSearchExtract(requestId, src): posts the bytes of
+# an image the page has already loaded, as a data: URI, through the bridge.
+# The page's HTTP cache is tried first (exact original bytes), then a
+# canvas export of the rendered <img> (works for same-origin/CORS images).
+EXTRACT_BYTES_JS = """
+(function() {
+    if (window.ankiImageSearchExtract) return;
+    const PREFIX = '__BRIDGE_PREFIX__';
+    function post(payload) {
+        console.log(PREFIX + JSON.stringify(payload));
+    }
+    function fromCanvas(src) {
+        const img = Array.from(document.images).find(
+            i => i.src === src && i.complete && i.naturalWidth > 0);
+        if (!img) return null;
+        try {
+            const canvas = document.createElement('canvas');
+            canvas.width = img.naturalWidth;
+            canvas.height = img.naturalHeight;
+            canvas.getContext('2d').drawImage(img, 0, 0);
+            return canvas.toDataURL('image/png');
+        } catch (e) {
+            return null;  // tainted canvas (cross-origin image)
+        }
+    }
+    window.ankiImageSearchExtract = function(requestId, src) {
+        fetch(src, {cache: 'force-cache', credentials: 'omit'})
+            .then(r => {
+                if (!r.ok) throw new Error('HTTP ' + r.status);
+                return r.blob();
+            })
+            .then(blob => new Promise((resolve, reject) => {
+                const reader = new FileReader();
+                reader.onload = () => resolve(reader.result);
+                reader.onerror = reject;
+                reader.readAsDataURL(blob);
+            }))
+            .then(dataUrl => post({type: 'bytes', id: requestId,
+                                   source: 'cache', data: dataUrl}))
+            .catch(err => {
+                const dataUrl = fromCanvas(src);
+                post(dataUrl
+                    ? {type: 'bytes', id: requestId, source: 'canvas', data: dataUrl}
+                    : {type: 'bytes', id: requestId, error: String(err)});
+            });
+    };
+})();
+""".replace("__BRIDGE_PREFIX__", BRIDGE_PREFIX)
+
+
+class PickerPage(QWebEnginePage):
+    """QWebEnginePage that turns prefixed console messages into a signal"""
+
+    bridge_message = pyqtSignal(dict)
+
+    def javaScriptConsoleMessage(self, level, message, line_number, source_id):
+        if message and message.startswith(BRIDGE_PREFIX):
+            try:
+                payload = json.loads(message[len(BRIDGE_PREFIX) :])
+            except ValueError:
+                log.warning("无法解析桥接消息")
+                return
+            if isinstance(payload, dict):
+                self.bridge_message.emit(payload)
+            return
+        super().javaScriptConsoleMessage(level, message, line_number, source_id)
@@ -0,0 +1,153 @@
+# ui/request_filter.py - Blocks non-essential requests in the embedded browser
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+from aqt import mw
+from aqt.qt import QWebEngineUrlRequestInfo, QWebEngineUrlRequestInterceptor
+
+# Resource type names used in the config, mapped to Qt's enum member names
+RESOURCE_TYPE_NAMES = {
+    "font": "ResourceTypeFontResource",
+    "ping": "ResourceTypePing",
+    "prefetch": "ResourceTypePrefetch",
+    "media": "ResourceTypeMedia",
+    "favicon": "ResourceTypeFavicon",
+    "csp_report": "ResourceTypeCspReport",
+    "object": "ResourceTypeObject",
+    "plugin": "ResourceTypePluginResource",
+    "service_worker": "ResourceTypeServiceWorker",
+    "shared_worker": "ResourceTypeSharedWorker",
+    "worker": "ResourceTypeWorker",
+    "subframe": "ResourceTypeSubFrame",
+    "stylesheet": "ResourceTypeStylesheet",
+    "script": "ResourceTypeScript",
+    "xhr": "ResourceTypeXhr",
+}
+_TYPE_KEYS = {qt_name: key for key, qt_name in RESOURCE_TYPE_NAMES.items()}
+
+# Never blocked: the results page itself and the images the user picks from
+ALWAYS_ALLOWED_TYPES = ("ResourceTypeMainFrame", "ResourceTypeImage")
+
+# Typical transfer sizes used to estimate the bytes saved per blocked
+# request; the real size is unknown because the request is never made
+ESTIMATED_BYTES = {
+    "font": 30_000,
+    "ping": 500,
+    "prefetch": 40_000,
+    "media": 200_000,
+    "favicon": 2_000,
+    "csp_report": 500,
+    "script": 60_000,
+    "stylesheet": 15_000,
+    "xhr": 5_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+
+@dataclass
+class BlockRules:
+    """Compiled allow/block rules"""
+
+    blocked_types: dict[Any, str] = field(default_factory=dict)
+    blocked_hosts: tuple[str, ...] = ()
+    blocked_url_patterns: tuple[str, ...] = ()
+    allowed_url_patterns: tuple[str, ...] = ()
+
+    @classmethod
+    def from_config(cls, config) -> "BlockRules":
+        resource_type = QWebEngineUrlRequestInfo.ResourceType
+        blocked_types = {}
+        for name in config.blocked_resource_types:
+            member = getattr(resource_type, RESOURCE_TYPE_NAMES.get(name, ""), None)
+            if member is not None and member.name not in ALWAYS_ALLOWED_TYPES:
+                blocked_types[member] = name
+
+        return cls(
+            blocked_types=blocked_types,
+            blocked_hosts=tuple(h.lower() for h in config.blocked_hosts),
+            blocked_url_patterns=tuple(config.blocked_url_patterns),
+            allowed_url_patterns=tuple(config.allowed_url_patterns),
+        )
+
+    def match(self, resource_type, host: str, url: str) -> str | None:
+        """Return the reason for blocking a request, or None to allow it"""
+        if resource_type.name in ALWAYS_ALLOWED_TYPES:
+            return None
+        if any(pattern in url for pattern in self.allowed_url_patterns):
+            return None
+
+        type_name = self.blocked_types.get(resource_type)
+        if type_name:
+            return type_name
+        if any(host == h or host.endswith("." + h) for h in self.blocked_hosts):
+            return "host"
+        if any(pattern in url for pattern in self.blocked_url_patterns):
+            return "url"
+        return None
+
+
+class ResourceBlocker(QWebEngineUrlRequestInterceptor):
+    """Request interceptor that drops requests matching the block rules
+
+    interceptRequest() runs on Chromium's IO thread, so counters are
+    guarded by a lock and rules are swapped as a whole.
+    """
+
+    def __init__(self, rules: BlockRules, parent=None):
+        super().__init__(parent)
+        self.rules = rules
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def interceptRequest(self, info):
+        url = info.requestUrl()
+        resource_type = info.resourceType()
+        reason = self.rules.match(resource_type, url.host().lower(), url.toString())
+
+        with self._lock:
+            if reason is None:
+                self.allowed_count += 1
+                return
+
+            self.blocked_count += 1
+            self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+            type_key = _TYPE_KEYS.get(resource_type.name, "")
+            self.estimated_blocked_bytes += ESTIMATED_BYTES.get(
+                type_key, DEFAULT_ESTIMATED_BYTES
+            )
+
+        info.block(True)
+
+    def reset_stats(self):
+        with self._lock:
+            self.allowed_count = 0
+            self.blocked_count = 0
+            self.estimated_blocked_bytes = 0
+            self.by_reason: dict[str, int] = {}
+
+    def stats(self) -> dict[str, Any]:
+        """Counters since the last reset"""
+        with self._lock:
+            return {
+                "allowed": self.allowed_count,
+                "blocked": self.blocked_count,
+                "estimated_blocked_bytes": self.estimated_blocked_bytes,
+                "by_reason": dict(self.by_reason),
+            }
+
+
+# Global instance
+_blocker = None
+
+
+def get_resource_blocker(config) -> ResourceBlocker:
+    """Get the global ResourceBlocker with rules refreshed from config"""
+    global _blocker
+    rules = BlockRules.from_config(config)
+    if _blocker is None:
+        _blocker = ResourceBlocker(rules, mw)
+    else:
+        _blocker.rules = rules
+    return _blocker
@@ -0,0 +1,153 @@
+# ui/speculative.py - Prepares a picker selection before the user confirms it
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from ..activity import run_in_background
+from ..log import get_logger
+from ..retry import CancelToken
+
+log = get_logger("Speculative")
+
+# (url, callback(image_data or None, url), cancel) - reads bytes the page
+# already has, downloading them only as a fallback
+PageFetcher = Callable[[str, Callable[[bytes | None, str], None], CancelToken], None]
+
+# Preparation stages reported through SpeculativeImage.on_stage
+STAGE_FETCH = "fetch"
+STAGE_CONVERT = "convert"
+STAGE_READY = "ready"
+STAGE_FAILED = "failed"
+
+
+@dataclass
+class PreparedImage:
+    """Converted image bytes ready to be written to the media folder"""
+
+    filename: str
+    data: bytes
+    url: str
+
+
+class SpeculativeImage:
+    """Fetches and converts one selected image in the background
+
+    Started when the user clicks an image, so that confirming the
+    selection usually only has to write bytes that are already prepared.
+    Candidate URLs are tried in order; the full-resolution image is
+    downloaded in a background thread, other URLs are read from the page.
+    Results arriving after cancel() are dropped.
+
+    upgrade_url is the original to swap in after a thumbnail was inserted.
+    """
+
+    def __init__(
+        self,
+        candidates: list[str],
+        full_url: str | None,
+        fetch_from_page: PageFetcher,
+        upgrade_url: str | None = None,
+    ):
+        self.candidates = list(candidates)
+        self.full_url = full_url
+        self.fetch_from_page = fetch_from_page
+        self.upgrade_url = upgrade_url
+        self.token = CancelToken()
+
+        self.prepared: PreparedImage | None = None
+        self.stage = STAGE_FETCH
+        self.on_stage: Callable[[str], None] | None = None
+        self.finished = False
+        self.started_at = time.perf_counter()
+        self.finished_at: float | None = None
+        self._callbacks: list[Callable[[SpeculativeImage], None]] = []
+
+    def start(self):
+        self._next_candidate()
+
+    def cancel(self):
+        self.token.cancel()
+        self.on_stage = None
+        self._callbacks.clear()
+
+    def when_finished(self, callback: Callable[["SpeculativeImage"], None]):
+        """Call callback (on the main thread) once preparation has ended"""
+        if self.finished:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def _set_stage(self, stage: str):
+        self.stage = stage
+        if self.on_stage is not None:
+            self.on_stage(stage)
+
+    def _next_candidate(self):
+        if self.token.cancelled:
+            return
+        if not self.candidates:
+            self._finish(None)
+            return
+
+        self._set_stage(STAGE_FETCH)
+        url = self.candidates.pop(0)
+        if url == self.full_url:
+            from ..image_search import get_searcher
+
+            log.debug("后台下载原图: %s", url[:100])
+            token = self.token
+            run_in_background(
+                lambda: get_searcher().download_image(url, cancel=token),
+                lambda future: self._on_fetched(_result_or_none(future), url),
+            )
+        else:
+            self.fetch_from_page(url, self._on_fetched, self.token)
+
+    def _on_fetched(self, image_data: bytes | None, url: str):
+        if self.token.cancelled:
+            log.debug("选择已变更，丢弃下载结果")
+            return
+        if not image_data:
+            log.warning("候选图片获取失败: %s", url[:100])
+            self._next_candidate()
+            return
+
+        from ..image_search import prepare_image
+
+        self._set_stage(STAGE_CONVERT)
+        run_in_background(
+            lambda: prepare_image(image_data, url),
+            lambda future: self._on_prepared(_result_or_none(future), url),
+        )
+
+    def _on_prepared(self, prepared: tuple[str, bytes] | None, url: str):
+        if self.token.cancelled:
+            return
+        if prepared is None:
+            self._next_candidate()
+            return
+        filename, data = prepared
+        self._finish(PreparedImage(filename, data, url))
+
+    def _finish(self, prepared: PreparedImage | None):
+        self.prepared = prepared
+        self.finished = True
+        self._set_stage(STAGE_READY if prepared else STAGE_FAILED)
+        self.finished_at = time.perf_counter()
+        log.debug(
+            "准备%s: %.0fms",
+            "完成" if prepared else "失败",
+            (self.finished_at - self.started_at) * 1000,
+        )
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+def _result_or_none(future):
+    try:
+        return future.result()
+    except Exception as e:
+        log.warning("后台任务异常: %s", e)
+        return None
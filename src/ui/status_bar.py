@@ -0,0 +1,81 @@
+# ui/status_bar.py - Live indicator of background image work in the main window
+
+from aqt import mw
+from aqt.qt import QLabel, QStatusBar, Qt, QTimer
+
+from ..activity import get_activity
+from ..config.constants import STATUS_BAR_REFRESH_MS
+from ..log import get_logger
+from ..state import get_config
+
+log = get_logger("StatusBar")
+
+
+class ActivityIndicator(QLabel):
+    """Status bar label showing queue depth, work in flight and throughput
+
+    A timer re-reads the activity counters every STATUS_BAR_REFRESH_MS;
+    the label is only touched when the text actually changes.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+
+    def start(self):
+        self.refresh()
+        self._timer.start(STATUS_BAR_REFRESH_MS)
+
+    def stop(self):
+        self._timer.stop()
+
+    def refresh(self):
+        config = get_config()
+        if not config.enabled or not config.status_bar_enabled:
+            # Turned off (e.g. config.json edited by hand)
+            update_status_indicator()
+            return
+
+        snapshot = get_activity().snapshot()
+        text = snapshot.format(config.status_bar_format)
+        if text != self.text():
+            self.setText(text)
+        details = snapshot.details()
+        if details != self.toolTip():
+            self.setToolTip(details)
+
+
+# Global instance
+_indicator: ActivityIndicator | None = None
+# Anki's main window has no status bar; remove it again if we created it
+_created_status_bar = False
+
+
+def update_status_indicator():
+    """Add or remove the indicator to match the current config"""
+    global _indicator, _created_status_bar
+
+    config = get_config()
+    wanted = config.enabled and config.status_bar_enabled
+
+    if wanted and _indicator is None:
+        existing = mw.findChild(
+            QStatusBar, options=Qt.FindChildOption.FindDirectChildrenOnly
+        )
+        _created_status_bar = existing is None
+        status_bar = mw.statusBar()
+        _indicator = ActivityIndicator(status_bar)
+        status_bar.addPermanentWidget(_indicator)
+        status_bar.show()
+        _indicator.start()
+        log.debug("状态栏指示器已启用")
+    elif not wanted and _indicator is not None:
+        _indicator.stop()
+        mw.statusBar().removeWidget(_indicator)
+        _indicator.deleteLater()
+        _indicator = None
+        if _created_status_bar:
+            mw.setStatusBar(None)
+            _created_status_bar = False
+        log.debug("状态栏指示器已关闭")
@@ -0,0 +1,137 @@
+# ui/web_pool.py - Pre-warmed, reusable QWebEngineView for the image picker
+
+import time
+
+from aqt import mw
+from aqt.qt import QUrl, QWebEngineProfile, QWebEngineView, sip
+
+from ..config.constants import WEB_CACHE_SIZE, WEB_PROFILE_DIR, WEB_PROFILE_NAME
+from ..log import get_logger
+from .picker_page import PickerPage
+
+log = get_logger("WebPool")
+
+# JavaScript returning the page's first-contentful-paint time in ms (or null)
+FIRST_PAINT_JS = """
+(function() {
+    const entries = performance.getEntriesByType('paint')
+        .filter(e => e.name === 'first-contentful-paint');
+    return entries.length ? entries[0].startTime : null;
+})();
+"""
+
+_profile: QWebEngineProfile | None = None
+
+
+def get_picker_profile() -> QWebEngineProfile:
+    """Dedicated profile with a persistent disk HTTP cache and cookies"""
+    global _profile
+    if _profile is None:
+        WEB_PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        _profile = QWebEngineProfile(WEB_PROFILE_NAME, mw)
+        _profile.setPersistentStoragePath(str(WEB_PROFILE_DIR))
+        _profile.setCachePath(str(WEB_PROFILE_DIR / "cache"))
+        _profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+        _profile.setHttpCacheMaximumSize(WEB_CACHE_SIZE)
+        _profile.setPersistentCookiesPolicy(
+            QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies
+        )
+    return _profile
+
+
+def create_picker_view(profile: QWebEngineProfile | None = None) -> QWebEngineView:
+    """Create a view with a PickerPage (picker profile unless one is given)"""
+    view = QWebEngineView()
+    page = PickerPage(profile or get_picker_profile(), view)
+    view.setPage(page)
+    return view
+
+
+class WebViewPool:
+    """Keeps one idle, already initialised view for the next picker
+
+    Creating a QWebEngineView starts a Chromium renderer process, which
+    is the bulk of the picker's startup cost. The pool creates the view
+    ahead of time and takes it back when a picker closes, so subsequent
+    pickers only have to navigate.
+    """
+
+    def __init__(self):
+        self._idle_view: QWebEngineView | None = None
+        # (warm, seconds from dialog open to first contentful paint)
+        self.paint_timings: list[tuple[bool, float]] = []
+
+    def warm_up(self):
+        """Create the idle view if there is none (call at idle time)"""
+        if self._idle_view is not None:
+            return
+        start = time.perf_counter()
+        view = create_picker_view()
+        view.setUrl(QUrl("about:blank"))
+        self._idle_view = view
+        log.info("预热浏览器视图: %.0fms", (time.perf_counter() - start) * 1000)
+
+    def acquire(self) -> tuple[QWebEngineView, bool]:
+        """
+        Take the idle view, or create a new one
+
+        Returns:
+            Tuple of (view, was_warm)
+        """
+        view = self._idle_view
+        self._idle_view = None
+        if view is not None:
+            return view, True
+        return create_picker_view(), False
+
+    def release(self, view: QWebEngineView):
+        """Return a view that is no longer shown; keeps at most one"""
+        view.stop()
+        view.setParent(None)
+        view.hide()
+        if self._idle_view is None:
+            view.setUrl(QUrl("about:blank"))
+            self._idle_view = view
+        else:
+            view.deleteLater()
+
+    def close(self):
+        """Delete the idle view now, before the profile parented to mw
+
+        A released view has no parent, so nothing else would delete it
+        before the profile; Qt warns (and may crash) when a page outlives
+        its profile.
+        """
+        view = self._idle_view
+        self._idle_view = None
+        if view is not None and not sip.isdeleted(view):
+            view.stop()
+            sip.delete(view)
+            log.debug("已释放预热的浏览器视图")
+
+    def record_paint(self, warm: bool, seconds: float):
+        """Record a time-to-first-paint sample and log warm/cold averages"""
+        self.paint_timings.append((warm, seconds))
+        del self.paint_timings[:-50]
+
+        for label, flag in (("warm", True), ("cold", False)):
+            samples = [s for w, s in self.paint_timings if w == flag]
+            if samples:
+                log.debug(
+                    "首次绘制 %s: 平均 %.0fms (%s 次)",
+                    label,
+                    sum(samples) / len(samples) * 1000,
+                    len(samples),
+                )
+
+
+# Global instance
+_pool = None
+
+
+def get_web_view_pool() -> WebViewPool:
+    """Get or create global WebViewPool instance"""
+    global _pool
+    if _pool is None:
+        _pool = WebViewPool()
+    return _pool
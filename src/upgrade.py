@@ -0,0 +1,124 @@
+# upgrade.py - Replaces an inserted thumbnail with the full-resolution image
+
+import time
+
+from aqt import mw
+from aqt.editor import Editor
+
+from .activity import run_in_background
+from .log import get_logger
+
+log = get_logger("Upgrade")
+
+
+def schedule_upgrade(editor: Editor, field_name: str, placeholder: str, full_url: str):
+    """
+    Fetch full_url in the background and swap it in for the placeholder
+
+    The note keeps the thumbnail if the download fails or the user has
+    removed the placeholder from the field in the meantime. After a swap
+    the placeholder file is moved to the trash unless another note uses it.
+
+    Args:
+        editor: Editor the thumbnail was inserted from
+        field_name: Field holding the placeholder <img>
+        placeholder: Media filename of the inserted thumbnail
+        full_url: URL of the full-resolution image
+    """
+    from .image_search import get_searcher, prepare_image, write_prepared_image
+    from .memory_budget import Reservation
+
+    note = editor.note
+    start = time.perf_counter()
+    log.debug("后台获取原图: %s", full_url[:100])
+
+    # Only the media write goes through Anki's (serialized) collection
+    # executor; download and conversion run alongside other work
+    def prepare() -> tuple[str, bytes, Reservation] | None:
+        fetched = get_searcher().fetch_image(full_url)
+        if not fetched:
+            return None
+        image_data, reservation = fetched
+        filename, data = prepare_image(image_data, full_url, reservation)
+        return filename, data, reservation
+
+    def on_prepared(future):
+        try:
+            prepared = future.result()
+        except Exception as e:
+            log.warning("异常: %s", e)
+            prepared = None
+
+        if not prepared:
+            log.warning("原图获取失败，保留缩略图")
+            return
+
+        run_in_background(
+            lambda: write_prepared_image(*prepared), on_done, uses_collection=True
+        )
+
+    def on_done(future):
+        try:
+            filename = future.result()
+        except Exception as e:
+            log.warning("异常: %s", e)
+            filename = None
+
+        if not filename or filename == placeholder:
+            log.warning("原图获取失败，保留缩略图")
+            return
+
+        if not _swap_src(editor, note, field_name, placeholder, filename):
+            log.info("缩略图已不在字段中，放弃替换")
+            mw.col.media.trash_files([filename])
+            return
+
+        log.info(
+            "已替换为原图 %s (%.0fms)", filename, (time.perf_counter() - start) * 1000
+        )
+
+    run_in_background(prepare, on_prepared)
+
+
+def _swap_src(editor: Editor, note, field_name: str, old: str, new: str) -> bool:
+    """Point the <img> for old at new in a single field assignment"""
+    from anki.errors import NotFoundError
+
+    from .image_search import refresh_editor_field
+
+    old_src, new_src = f'src="{old}"', f'src="{new}"'
+
+    if editor.note is note:
+        if field_name not in note or old_src not in note[field_name]:
+            return False
+        note[field_name] = note[field_name].replace(old_src, new_src)
+        refresh_editor_field(editor, field_name)
+        # Only collect the placeholder once the editor has saved the note
+        editor.call_after_note_saved(lambda: trash_if_unused(old))
+        return True
+
+    # The editor moved on: update the stored note if it was saved
+    if not note.id:
+        return False
+    try:
+        stored = mw.col.get_note(note.id)
+    except NotFoundError:
+        return False
+    if field_name not in stored or old_src not in stored[field_name]:
+        return False
+    stored[field_name] = stored[field_name].replace(old_src, new_src)
+    mw.col.update_note(stored)
+    trash_if_unused(old)
+    return True
+
+
+def trash_if_unused(filename: str):
+    """Move a media file to the trash if no note references it any more"""
+    if not mw.col:
+        return
+    # Plain search terms match substrings of field content
+    if mw.col.find_notes(f'"{filename}"'):
+        log.debug("缩略图仍被使用，保留: %s", filename)
+        return
+    mw.col.media.trash_files([filename])
+    log.debug("已清理缩略图: %s", filename)
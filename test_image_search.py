@@ -4,6 +4,7 @@
 测试修复后的图片搜索功能
 """
 
+import os
 import sys
 import io
 from pathlib import Path
@@ -22,7 +23,10 @@ except ImportError:
     sys.exit(1)
 
 # Constants (from config/constants.py)
-GOOGLE_IMAGE_SEARCH_URL = "https://www.google.com/search"
+# Set GOOGLE_IMAGE_SEARCH_URL to run against mock_google_server.py instead
+GOOGLE_IMAGE_SEARCH_URL = os.environ.get(
+    "GOOGLE_IMAGE_SEARCH_URL", "https://www.google.com/search"
+)
 REQUEST_TIMEOUT = 10
 MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
 SUPPORTED_IMAGE_FORMATS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}